@@ -0,0 +1,68 @@
+"""Micro-benchmark: restricted-zone detection against path count and diff size.
+
+Compares the compiled matcher in ``warforge.policy`` with the original nested
+``any()`` scan. Run from the repo root::
+
+    python -m benchmarks.bench_policy
+"""
+from __future__ import annotations
+
+import random
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from warforge.policy import RESTRICTED_PATHS, RESTRICTED_PATTERNS, detect_restricted_zones
+
+WORDS = ["src", "app", "core", "models", "views", "utils", "tests", "static", "handlers", "lib", "api", "docs"]
+
+
+def nested_scan(paths: List[Path], diff_text: str) -> List[str]:
+    zones: List[str] = []
+    for zone, patterns in RESTRICTED_PATHS.items():
+        if any(part in str(path).lower() for path in paths for part in patterns):
+            zones.append(zone)
+    for zone, pattern in RESTRICTED_PATTERNS.items():
+        if pattern.search(diff_text):
+            zones.append(zone)
+    return sorted(set(zones))
+
+
+def synthetic_paths(count: int, rng: random.Random) -> List[Path]:
+    directories = ["/".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) for _ in range(max(1, count // 20))]
+    return [Path(f"{rng.choice(directories)}/file_{index}.py") for index in range(count)]
+
+
+def synthetic_diff(size: int, rng: random.Random) -> str:
+    lines = []
+    total = 0
+    while total < size:
+        line = "+    " + " ".join(rng.choice(WORDS) for _ in range(8))
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def best_of(fn: Callable[[], object], repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    rng = random.Random(7)
+    print(f"{'paths':>8} {'diff KiB':>9} {'nested ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    for count, size in ((1_000, 64 * 1024), (10_000, 512 * 1024), (50_000, 4 * 1024 * 1024)):
+        paths = synthetic_paths(count, rng)
+        diff_text = synthetic_diff(size, rng)
+        assert detect_restricted_zones(paths, diff_text) == nested_scan(paths, diff_text)
+        nested = best_of(lambda: nested_scan(paths, diff_text))
+        compiled = best_of(lambda: detect_restricted_zones(paths, diff_text))
+        print(f"{count:>8} {size // 1024:>9} {nested:>10.1f} {compiled:>12.1f} {nested / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+from pathlib import Path
+
+import pytest
+
+from warforge import storage
+
+
+@pytest.fixture()
+def warforge_db(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "warforge.db")
+    monkeypatch.setattr(storage, "QUEUE_DIR", tmp_path / "queue")
+    return tmp_path
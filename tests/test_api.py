@@ -0,0 +1,152 @@
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from warforge.api import app
+from warforge.events import EVENTS_FILE, EventStream
+from warforge.run_record import RECORD_NAME, RunRecord
+
+
+@pytest.fixture()
+def client(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return TestClient(app)
+
+
+def test_batch_create_and_fetch_tasks(client):
+    response = client.post(
+        "/tasks/batch",
+        json={"tasks": [{"title": "one", "description": "1"}, {"title": "two", "description": "2", "priority": "high"}]},
+    )
+    task_ids = response.json()["task_ids"]
+    assert len(task_ids) == 2
+
+    fetched = client.get("/tasks", params={"ids": ",".join(task_ids + ["task-missing"])}).json()
+    assert [task["title"] for task in fetched["tasks"]] == ["one", "two"]
+    assert fetched["missing"] == ["task-missing"]
+
+
+def test_background_run_reports_progress(client):
+    response = client.post("/runs", json={"title": "api run", "dry_run": True})
+    assert response.status_code == 202
+    run_id = response.json()["run_id"]
+
+    deadline = time.monotonic() + 30
+    status = client.get(f"/runs/{run_id}").json()
+    while status["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.05)
+        status = client.get(f"/runs/{run_id}").json()
+    assert status["status"] == "complete"
+    assert status["progress"]["completed_stages"] == ["plan", "implementation", "verification", "review"]
+    assert client.post(f"/runs/{run_id}/cancel").json()["status"] == "complete"
+    assert client.get("/runs/run-missing").status_code == 404
+
+    history = client.get("/runs", params={"since": "1h", "limit": 10}).json()
+    assert [run["run_id"] for run in history["runs"]] == [run_id]
+    assert history["runs"][0]["status"] == "complete"
+    assert set(history["runs"][0]["stage_durations"]) == {"plan", "implementation", "verification", "review"}
+    assert history["next_cursor"] is None
+    assert client.get("/runs", params={"status": "failed"}).json()["runs"] == []
+    assert client.get("/runs", params={"since": "yesterday"}).status_code == 400
+
+    exposition = client.get("/metrics", headers={"Accept": "application/openmetrics-text"})
+    assert exposition.headers["content-type"].startswith("application/openmetrics-text")
+    assert 'warforge_stage_duration_seconds_count{stage="plan",source="computed"}' in exposition.text
+    assert 'warforge_queue_wait_seconds_count{queue="runs"}' in exposition.text
+    assert "warforge_queue_depth 0" in exposition.text and "warforge_runs_in_flight 0" in exposition.text
+    assert exposition.text.endswith("# EOF\n")
+
+
+def test_artifact_etag_range_and_gzip(client):
+    run_dir = Path("runs") / "run-artifacts"
+    run_dir.mkdir(parents=True)
+    body = ('{"results": [' + ",".join(['{"returncode": 0}'] * 200) + "]}").encode()
+    (run_dir / "test_report.json").write_bytes(body)
+
+    listing = client.get("/runs/run-artifacts/artifacts").json()["artifacts"]
+    assert listing[0]["name"] == "test_report.json" and listing[0]["size"] == len(body)
+
+    plain = client.get("/runs/run-artifacts/artifacts/test_report.json", headers={"Accept-Encoding": "identity"})
+    assert plain.content == body
+    etag = plain.headers["etag"]
+    cached = client.get("/runs/run-artifacts/artifacts/test_report.json", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    partial = client.get("/runs/run-artifacts/artifacts/test_report.json", headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206
+    assert partial.content == body[:10]
+
+    compressed = client.get("/runs/run-artifacts/artifacts/test_report.json", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.content == body
+    assert compressed.headers["etag"] != etag
+
+    assert client.get("/runs/run-artifacts/artifacts/..%2Ftest_report.json").status_code == 404
+    assert client.get("/runs/run-artifacts/artifacts/missing.json").status_code == 404
+
+
+def test_run_ids_cannot_escape_the_runs_directory(client):
+    Path(".env").write_text("SECRET=1\n")
+    Path("runs").mkdir()
+    for run_id in ("%2E%2E", ".", "..%2F.."):
+        assert client.get(f"/runs/{run_id}/artifacts/.env").status_code == 404
+        assert client.get(f"/runs/{run_id}/artifacts").status_code == 404
+        assert client.get(f"/runs/{run_id}/receipt").status_code == 404
+        assert client.get(f"/runs/{run_id}/events").status_code == 404
+    assert client.get("/runs/%2E%2E").status_code == 404
+
+
+def test_artifacts_served_from_run_record(client):
+    run_dir = Path("runs") / "run-record"
+    with RunRecord(run_dir / RECORD_NAME) as record:
+        record.write_json("test_report.json", {"results": [{"returncode": 0}] * 100})
+        record.write_text("receipt.md", "# Receipt\n")
+
+    names = [item["name"] for item in client.get("/runs/run-record/artifacts").json()["artifacts"]]
+    assert names == ["receipt.md", "test_report.json"]
+
+    response = client.get("/runs/run-record/artifacts/test_report.json", headers={"Accept-Encoding": "identity"})
+    assert response.json() == {"results": [{"returncode": 0}] * 100}
+    cached = client.get("/runs/run-record/artifacts/test_report.json", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    compressed = client.get("/runs/run-record/artifacts/test_report.json", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert client.get("/runs/run-record/receipt").json() == {"receipt": "# Receipt\n"}
+
+
+def _sse_events(response):
+    events, current = [], {}
+    for line in response.iter_lines():
+        if not line:
+            if "id" in current:
+                events.append(current)
+            current = {}
+        elif not line.startswith(":"):
+            field, _, value = line.partition(": ")
+            current[field] = value
+    return events
+
+
+def test_run_events_stream_and_resume(client):
+    run_id = client.post("/runs", json={"title": "streamed run", "dry_run": True}).json()["run_id"]
+    with client.stream("GET", f"/runs/{run_id}/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        live = _sse_events(response)
+    assert live[0]["event"] == "run" and live[-1]["event"] == "run"
+    assert '"status": "complete"' in live[-1]["data"]
+    assert {"stage", "agent"} <= {event["event"] for event in live}
+    assert [int(event["id"]) for event in live] == list(range(1, len(live) + 1))
+
+    with client.stream("GET", f"/runs/{run_id}/events", headers={"Last-Event-ID": live[-3]["id"]}) as response:
+        assert [event["id"] for event in _sse_events(response)] == [live[-2]["id"], live[-1]["id"]]
+
+    stream = EventStream("run-logged", path=Path("runs") / "run-logged" / EVENTS_FILE)
+    for step in range(3):
+        stream.emit("progress", {"step": step})
+    stream.close()
+    with client.stream("GET", "/runs/run-logged/events", params={"after": 1}) as response:
+        assert [event["id"] for event in _sse_events(response)] == ["2", "3"]
+    assert client.get("/runs/run-missing/events").status_code == 404
+    assert client.get(f"/runs/{run_id}/events", headers={"Last-Event-ID": "x"}).status_code == 400
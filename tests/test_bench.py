@@ -0,0 +1,37 @@
+from pathlib import Path
+
+import pytest
+
+from warforge.bench import RepoShape, compare, generate_repo, run_bench
+from warforge.policy import detect_path_zones
+
+
+def test_generated_repo_follows_shape(tmp_path: Path):
+    shape = RepoShape(files=200, depth=3, mean_size=512, restricted_density=0.5)
+    paths = generate_repo(tmp_path / "a", shape)
+    again = generate_repo(tmp_path / "b", shape)
+    assert len(paths) == 200
+    assert [path.relative_to(tmp_path / "a") for path in paths] == [path.relative_to(tmp_path / "b") for path in again]
+    assert max(len(path.relative_to(tmp_path / "a").parts) for path in paths) <= 3 + 2
+    assert detect_path_zones([path.relative_to(tmp_path / "a") for path in paths])
+
+
+def test_run_bench_is_isolated_and_compares(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shape = RepoShape(files=20, diff_kib=4, tasks=10)
+    report = run_bench(shape, repeat=1, only=["policy", "queue"])
+    assert set(report.results) == {"policy", "queue_add", "queue_pop"}
+    assert report.results["queue_pop"].ops == 10
+    assert Path.cwd() == tmp_path and not (tmp_path / ".warforge").exists()
+
+    current = report.as_dict()
+    assert compare(current, current) == []
+    slower = {
+        **current,
+        "results": {name: {**result, "seconds": result["seconds"] * 10 + 1} for name, result in current["results"].items()},
+    }
+    assert {regression.name for regression in compare(slower, current)} == {"policy", "queue_add", "queue_pop"}
+    with pytest.raises(ValueError):
+        compare(current, {**current, "shape": {**current["shape"], "files": 21}})
+    with pytest.raises(ValueError):
+        run_bench(shape, only=["nope"])
@@ -0,0 +1,17 @@
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from warforge.cli import app
+
+
+def test_run_demo_uses_plain_option_defaults(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(app, ["run-demo"])
+    assert result.exit_code == 0, result.output
+    [run_dir] = (tmp_path / "runs").iterdir()
+    settings = json.loads((run_dir / "test_report.json").read_text())["settings"]
+    assert settings["shards"] == 1 and settings["cache"] is True
+    # --follow stays off: no live stage lines before the final message.
+    assert "[plan]" not in result.output
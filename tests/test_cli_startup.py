@@ -0,0 +1,55 @@
+import subprocess
+import sys
+
+# Modules `warforge --help` must not import; the pipeline loads when a command runs.
+HEAVY_MODULES = (
+    "warforge.orchestrator",
+    "warforge.runner",
+    "warforge.agents.registry",
+    "warforge.agents.repo_analyst",
+    "warforge.policy",
+    "warforge.verification",
+    "warforge.bench",
+    "warforge.api",
+    "asyncio",
+    "concurrent.futures",
+)
+# Self import time of warforge.cli on top of typer, in microseconds (about 25 ms today).
+IMPORT_BUDGET_US = 50_000
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+
+def test_help_does_not_import_pipeline():
+    script = (
+        "import sys\n"
+        "from warforge.cli import app\n"
+        "try:\n"
+        "    app(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('LOADED', ' '.join(sorted(sys.modules)))\n"
+    )
+    output = _python("-c", script).stdout
+    loaded = set(output.split("LOADED", 1)[1].split())
+    assert "queue" in output
+    assert sorted(loaded.intersection(HEAVY_MODULES)) == []
+
+
+def _cli_import_us() -> int:
+    stderr = _python("-X", "importtime", "-c", "import typer; import warforge.cli").stderr
+    cumulative = {}
+    for line in stderr.splitlines():
+        _, _, timing = line.partition("import time:")
+        parts = [part.strip() for part in timing.split("|")]
+        if len(parts) == 3 and parts[1].isdigit():
+            cumulative[parts[2]] = int(parts[1])
+    return cumulative["warforge.cli"]
+
+
+def test_cli_import_time_budget():
+    # Best of three damps scheduler noise; typer is imported first so only warforge's own cost is measured.
+    best = min(_cli_import_us() for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"import warforge.cli took {best / 1000:.1f} ms"
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+from warforge.agents.base import Agent
+from warforge.events import EventStream, read_events
+from warforge.providers import StubProvider
+
+
+def test_resume_replays_from_history_then_log(tmp_path: Path):
+    stream = EventStream("run-demo", path=tmp_path / "events.jsonl", history=3)
+    for index in range(5):
+        stream.emit("progress", {"step": index}, stage="plan")
+    stream.close()
+    assert stream.emit("progress") is None
+    assert [event.id for event in stream.subscribe(after=1)] == [2, 3, 4, 5]
+    assert [event.data["step"] for event in read_events(tmp_path / "events.jsonl", after=3)] == [3, 4]
+    last = list(read_events(tmp_path / "events.jsonl"))[-1]
+    assert last.to_sse().startswith("id: 5\nevent: progress\ndata: ")
+
+
+def test_slow_subscriber_applies_backpressure_without_losing_events():
+    stream = EventStream("run-demo", buffer=2, emit_timeout_s=0.05)
+    received = []
+
+    def consume():
+        for event in stream.subscribe(heartbeat_s=None):
+            received.append(event.id)
+            # Stall long enough that emitters give up and the reader has to catch up from history.
+            time.sleep(0.2 if event.id == 1 else 0.001)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    for index in range(40):
+        stream.emit("token", {"text": str(index)})
+    blocked_s = time.perf_counter() - started
+    stream.close()
+    consumer.join(timeout=10)
+    assert received == list(range(1, 41))
+    assert blocked_s > 0.02
+
+
+def test_agent_streams_provider_tokens(tmp_path: Path):
+    stream = EventStream("run-demo")
+    agent = Agent()
+    assert agent.stream_tokens(["quiet"]) == "quiet"
+    agent.events = stream.bind(stage="implementation", agent="writer")
+    assert agent.stream_tokens(StubProvider().stream("hello")) == "[stub] hello"
+    agent.emit("progress", message="halfway")
+    stream.close()
+    events = list(stream.subscribe())
+    assert [(event.type, event.stage, event.agent) for event in events] == [
+        ("token", "implementation", "writer"),
+        ("progress", "implementation", "writer"),
+    ]
+    assert events[0].data == {"text": "[stub] hello"}
+
+
+def test_non_blocking_emit_does_not_wait_behind_a_slow_reader():
+    stream = EventStream("run-demo", buffer=1, emit_timeout_s=0.5)
+    reader = stream.subscribe(heartbeat_s=None)
+    stream.emit("progress")
+    assert next(reader).id == 1
+    stream.emit("progress")
+    # The reader's queue is full: a blocking emitter waits on it while the event loop's emit goes straight through.
+    waiting = threading.Thread(target=stream.emit, args=("token",))
+    waiting.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    assert stream.emit("stage", block=False).type == "stage"
+    assert time.perf_counter() - started < 0.1
+    waiting.join()
+    stream.close()
+    assert [event.id for event in reader] == [2, 3, 4]
+
+
+def test_async_subscriber_follows_live_events():
+    stream = EventStream("run-demo")
+    stream.emit("progress", {"step": 0})
+
+    def publish():
+        time.sleep(0.05)
+        stream.emit("progress", {"step": 1})
+        stream.close()
+
+    async def follow():
+        threading.Thread(target=publish).start()
+        return [event.data["step"] async for event in stream.asubscribe(heartbeat_s=0.01) if event is not None]
+
+    assert asyncio.run(follow()) == [0, 1]
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from warforge.impact import apply_selection, build_import_graph, select_tests
+
+
+def _write(root: Path, rel_path: str, text: str) -> str:
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return rel_path
+
+
+def _repo(tmp_path: Path):
+    repo = tmp_path / "repo"
+    files = [
+        _write(repo, "pkg/__init__.py", ""),
+        _write(repo, "pkg/receipts.py", "def render():\n    return 1\n"),
+        _write(repo, "pkg/runner.py", "from .receipts import render\n"),
+        _write(repo, "pkg/policy.py", "import re\n"),
+        _write(repo, "tests/test_runner.py", "from pkg import runner\n"),
+        _write(repo, "tests/test_policy.py", "import pkg.policy\n"),
+        _write(repo, "tests/conftest.py", ""),
+    ]
+    return repo, files
+
+
+def test_selects_tests_that_transitively_import_changed_module(tmp_path: Path):
+    repo, files = _repo(tmp_path)
+    selection = select_tests(repo, files, ["pkg/receipts.py"], cache_dir=tmp_path / "cache")
+    assert selection.mode == "selected"
+    assert selection.tests == ["tests/test_runner.py"]
+    assert selection.reasons["tests/test_runner.py"] == ["pkg/receipts.py", "pkg/runner.py", "tests/test_runner.py"]
+
+    commands, narrowed = apply_selection([["pytest"], ["npm", "test"]], selection)
+    assert narrowed and commands == [["pytest", "tests/test_runner.py"], ["npm", "test"]]
+
+
+def test_falls_back_to_full_suite_for_untraceable_changes(tmp_path: Path):
+    repo, files = _repo(tmp_path)
+    for changed in (["tests/conftest.py"], ["pyproject.toml"], ["data/fixture.yaml"], []):
+        selection = select_tests(repo, files, changed, cache_dir=tmp_path / "cache")
+        assert selection.mode == "full", changed
+        assert selection.fallback_reason
+    assert apply_selection([["pytest"]], selection) == ([["pytest"]], False)
+
+
+def test_deleted_or_unimported_modules_run_full_suite(tmp_path: Path):
+    repo, files = _repo(tmp_path)
+    _write(repo, "pkg/util.py", "from pkg import gone\n")
+    _write(repo, "pkg/broken.py", "def broken(:\n")
+    _write(repo, "scripts/tool.py", "import os\n")
+    files += ["pkg/util.py", "pkg/broken.py", "scripts/tool.py"]
+    for changed in (["pkg/gone.py"], ["pkg/broken.py"], ["scripts/tool.py"]):
+        selection = select_tests(repo, files, changed, cache_dir=tmp_path / "cache")
+        assert selection.mode == "full" and selection.fallback_reason, changed
+        assert apply_selection([["pytest"]], selection) == ([["pytest"]], False)
+    docs_only = select_tests(repo, files, ["README.md"], cache_dir=tmp_path / "cache")
+    assert docs_only.mode == "selected" and docs_only.tests == []
+
+
+def test_import_graph_is_cached_and_refreshed_on_change(tmp_path: Path):
+    repo, files = _repo(tmp_path)
+    cache_dir = tmp_path / "cache"
+    assert build_import_graph(repo, files, cache_dir)["pkg/runner.py"] == ["pkg.receipts", "pkg.receipts.render"]
+    _write(repo, "pkg/runner.py", "import pkg.policy\n# longer file\n")
+    assert build_import_graph(repo, files, cache_dir)["pkg/runner.py"] == ["pkg.policy"]
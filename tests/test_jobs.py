@@ -0,0 +1,81 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from warforge import jobs, storage
+from warforge.jobs import RunManager, TaskLeased
+
+
+def _wait_finished(manager: RunManager, run_id: str) -> dict:
+    deadline = time.monotonic() + 30
+    status = manager.status(run_id)
+    while status["status"] in ("queued", "running", "cancelling") and time.monotonic() < deadline:
+        time.sleep(0.02)
+        status = manager.status(run_id)
+    return status
+
+
+def test_queued_run_can_be_cancelled(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = RunManager(max_workers=1, runs_dir=tmp_path / "runs")
+    first = manager.submit(storage.add_task("first", "first"), dry_run=True)
+    second = manager.submit(storage.add_task("second", "second"), dry_run=True)
+    assert manager.cancel(second.run_id).status == "cancelled"
+    assert _wait_finished(manager, first.run_id)["status"] == "complete"
+    assert _wait_finished(manager, second.run_id)["status"] == "cancelled"
+    manager.shutdown()
+
+
+def test_api_runs_lease_their_task(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = RunManager(max_workers=1, runs_dir=tmp_path / "runs")
+    task = storage.add_task("leased", "leased")
+    job = manager.submit(task, dry_run=True)
+    assert storage.claim_task("worker-1") is None
+    assert _wait_finished(manager, job.run_id)["status"] == "complete"
+    assert storage.claim_task("worker-1") is None
+    status = storage.connection().execute("SELECT status FROM tasks WHERE task_id = ?", (task.task_id,)).fetchone()
+    assert status == ("done",)
+
+    held = storage.add_task("held", "held")
+    assert storage.claim_task("worker-1").task_id == held.task_id
+    with pytest.raises(TaskLeased):
+        manager.submit(held, dry_run=True)
+    manager.shutdown()
+
+
+def test_finished_jobs_are_evicted(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(jobs, "MAX_FINISHED_JOBS", 1)
+    manager = RunManager(max_workers=1, runs_dir=tmp_path / "runs")
+    run_ids = []
+    for index in range(3):
+        job = manager.submit(storage.add_task(f"task {index}", "evict"), dry_run=True)
+        _wait_finished(manager, job.run_id)
+        run_ids.append(job.run_id)
+    assert manager.get(run_ids[0]) is None and manager.get(run_ids[-1]) is not None
+    assert manager.status(run_ids[0])["status"] == "finished"
+    manager.shutdown()
+
+
+def test_concurrent_jobs_share_caches(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for index in range(200):
+        (tmp_path / f"module_{index}.py").write_text(f"VALUE = {index}\n")
+    manager = RunManager(max_workers=4, runs_dir=tmp_path / "runs")
+    submitted = [manager.submit(storage.add_task(f"task {index}", "concurrent"), dry_run=True) for index in range(8)]
+    statuses = [_wait_finished(manager, job.run_id) for job in submitted]
+    manager.shutdown()
+    assert [status["status"] for status in statuses] == ["complete"] * 8, [status["message"] for status in statuses]
+
+
+def test_shutdown_cancels_jobs_that_never_started(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = RunManager(max_workers=1, runs_dir=tmp_path / "runs")
+    submitted = [manager.submit(storage.add_task(f"task {index}", "shutdown"), dry_run=True) for index in range(3)]
+    manager.shutdown()
+    statuses = [manager.status(job.run_id)["status"] for job in submitted]
+    assert "queued" not in statuses and statuses[-1] == "cancelled"
+    # Their leases were handed back, so a worker can pick them up.
+    assert storage.claim_task("worker-1") is not None
@@ -0,0 +1,72 @@
+import os
+import threading
+from pathlib import Path
+
+from warforge.manifest import fingerprint_repo, manifest_path
+
+
+def _age(path: Path) -> None:
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+
+def test_fingerprint_reuses_unchanged_digests(tmp_path: Path):
+    repo = tmp_path / "repo"
+    (repo / "pkg").mkdir(parents=True)
+    for name in ("a.py", "pkg/b.py"):
+        (repo / name).write_text(name)
+        _age(repo / name)
+    cache = tmp_path / "cache"
+
+    first = fingerprint_repo(repo, manifest_dir=cache)
+    assert first.files_hashed == 2
+    assert first.added == ["a.py", "pkg/b.py"]
+    assert manifest_path(repo, cache).exists()
+
+    second = fingerprint_repo(repo, manifest_dir=cache)
+    assert second.files_hashed == 0
+    assert second.repo_hash == first.repo_hash
+    assert second.changed == []
+
+    (repo / "pkg" / "b.py").write_text("changed")
+    _age(repo / "pkg" / "b.py")
+    third = fingerprint_repo(repo, manifest_dir=cache)
+    assert third.files_hashed == 1
+    assert third.modified == ["pkg/b.py"]
+    assert third.directories["pkg"] != first.directories["pkg"]
+    assert third.repo_hash != first.repo_hash
+
+
+def test_fingerprint_reports_removed_files(tmp_path: Path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text("a")
+    (repo / "b.py").write_text("b")
+    cache = tmp_path / "cache"
+    fingerprint_repo(repo, manifest_dir=cache)
+    (repo / "b.py").unlink()
+    result = fingerprint_repo(repo, manifest_dir=cache)
+    assert result.removed == ["b.py"]
+
+
+def test_concurrent_fingerprints_share_the_manifest(tmp_path: Path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for index in range(50):
+        (repo / f"m{index}.py").write_text(str(index))
+    cache = tmp_path / "cache"
+    errors = []
+
+    def fingerprint():
+        for _ in range(30):
+            try:
+                fingerprint_repo(repo, manifest_dir=cache)
+            except OSError as exc:
+                errors.append(exc)
+
+    threads = [threading.Thread(target=fingerprint) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert [path.name for path in cache.iterdir()] == [manifest_path(repo, cache).name]
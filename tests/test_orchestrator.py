@@ -1,7 +1,12 @@
 from pathlib import Path
 
+import pytest
+
+from warforge.agents import registry
+from warforge.agents.router import RouterAgent
 from warforge.core import RunContext, Task
 from warforge.orchestrator import Orchestrator
+from warforge.stage_cache import StageCache
 
 
 def test_orchestrator_runs(tmp_path: Path):
@@ -22,3 +27,64 @@ def test_orchestrator_runs(tmp_path: Path):
     assert "verification" in payload
     assert "repo_map" in payload["plan"]["repo_analyst"]
     assert "restricted_zones" in payload["plan"]["repo_analyst"]
+
+
+def _context(tmp_path: Path, task_id: str, title: str = "demo") -> RunContext:
+    repo = tmp_path / "repo"
+    repo.mkdir(exist_ok=True)
+    (repo / "pyproject.toml").write_text("[project]\n")
+    return RunContext(
+        run_id=f"run-{task_id}",
+        task=Task(task_id=task_id, title=title, description="run", created_at="now"),
+        repo_root=repo,
+        run_dir=tmp_path / "runs" / f"run-{task_id}",
+        mode="fast",
+        safe_mode=True,
+        fast_mode=True,
+        dry_run=True,
+    )
+
+
+def test_stage_cache_is_shared_across_tasks_with_identical_inputs(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = StageCache(tmp_path / "stages")
+    first = Orchestrator(_context(tmp_path, "task-a"), stage_cache=cache)
+    first_payload = first.run()
+    assert not any(stage.get("cached") for stage in first.metrics["stages"].values())
+
+    second = Orchestrator(_context(tmp_path, "task-b"), stage_cache=cache)
+    assert second.run()["plan"] == first_payload["plan"]
+    assert {stage["cached"] for stage in second.metrics["stages"].values()} == {"stage_cache"}
+
+    retitled = Orchestrator(_context(tmp_path, "task-c", title="other"), stage_cache=cache)
+    retitled.run()
+    assert "cached" not in retitled.metrics["stages"]["plan"]
+    assert retitled.metrics["stages"]["implementation"]["cached"] == "stage_cache"
+
+
+def test_resume_reuses_checkpointed_stages(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Orchestrator(_context(tmp_path, "task-r")).run()
+    resumed = Orchestrator(_context(tmp_path, "task-r"), resume=True)
+    resumed.run()
+    assert {stage["cached"] for stage in resumed.metrics["stages"].values()} == {"checkpoint"}
+    assert resumed.completed_stages == ["plan", "implementation", "verification", "review"]
+
+
+class StubRouterAgent(RouterAgent):
+    version = "stub"
+
+
+def test_agents_resolve_lazily_and_are_reused(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(registry.AGENT_REGISTRY, "router", f"{__name__}:StubRouterAgent")
+    monkeypatch.setitem(registry.AGENT_REGISTRY, "dotted", f"{__name__}.StubRouterAgent")
+    monkeypatch.setattr(registry, "_resolved", {})
+    assert registry.resolve_agent("dotted") is StubRouterAgent
+    with pytest.raises(KeyError):
+        registry.resolve_agent("no_such_agent")
+
+    orchestrator = Orchestrator(_context(tmp_path, "task-lazy"))
+    orchestrator.run()
+    assert type(orchestrator._agent("router")) is StubRouterAgent
+    assert orchestrator._agent("planner") is orchestrator._agent("planner")
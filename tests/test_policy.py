@@ -1,6 +1,13 @@
 from pathlib import Path
 
-from warforge.policy import detect_restricted_zones, evaluate_policy
+from warforge.policy import (
+    RESTRICTED_PATHS,
+    RESTRICTED_PATTERNS,
+    detect_restricted_zones,
+    evaluate_policy,
+    scan_chunks,
+    scan_diff,
+)
 
 
 def test_detect_restricted_zones_from_path():
@@ -12,3 +19,68 @@ def test_detect_restricted_zones_from_path():
 def test_evaluate_policy_requires_approval_in_safe_mode():
     result = evaluate_policy([Path("infra/terraform/main.tf")], "", safe_mode=True)
     assert result.requires_approval is True
+
+
+def _legacy_zones(paths, diff_text):
+    zones = {
+        zone
+        for zone, parts in RESTRICTED_PATHS.items()
+        if any(part in str(path).lower() for path in paths for part in parts)
+    }
+    zones |= {zone for zone, pattern in RESTRICTED_PATTERNS.items() if pattern.search(diff_text)}
+    return sorted(zones)
+
+
+def test_compiled_matcher_agrees_with_nested_scan():
+    cases = [
+        ([Path("src/app.py"), Path("docs/Security.md")], ""),
+        ([Path(".github/workflows/ci.yml")], "+ STRIPE_KEY = os.environ['X']"),
+        ([Path("db/Migrations/0001.sql")], "login via OAuth"),
+        ([Path("a/b/c.py")], "nothing restricted here"),
+        ([], "-- schema change\n+ docker build"),
+    ]
+    for paths, diff_text in cases:
+        assert detect_restricted_zones(paths, diff_text) == _legacy_zones(paths, diff_text)
+
+
+def test_overlapping_matches_do_not_shadow_other_zones():
+    # "jwt" (auth) and "token" (secrets) share the "t"; both zones must be reported.
+    assert detect_restricted_zones([], "jwtoken") == ["auth", "secrets"]
+
+
+DIFF = """diff --git a/app/views.py b/app/views.py
+index 1111111..2222222 100644
+--- a/app/views.py
++++ b/app/views.py
+@@ -10,3 +10,4 @@ def index():
+     return render()
+-    user = None
++    user = current_user()
++    api_token = load()
+diff --git a/app/db.py b/app/db.py
+--- a/app/db.py
++++ b/app/db.py
+@@ -1,2 +1,2 @@
+ import sqlite3
+-CREATE = "old"
++CREATE = "new schema"
+"""
+
+
+def test_scan_diff_attributes_zones_to_file_hunk_and_line():
+    scan = scan_diff(DIFF.splitlines(keepends=True))
+    assert scan.zones == {"secrets", "migrations"}
+    assert scan.files == ["app/views.py", "app/db.py"]
+    [secret] = scan.triggers["secrets"]
+    assert (secret["file"], secret["line"]) == ("app/views.py", 12)
+    assert secret["hunk"].startswith("@@ -10,3 +10,4 @@")
+    assert scan.triggers["migrations"][0]["file"] == "app/db.py"
+
+    result = evaluate_policy([Path("app/views.py")], "", safe_mode=True, diff_scan=scan)
+    assert result.restricted_zones == ["migrations", "secrets"]
+    assert result.requires_approval
+
+
+def test_scan_chunks_finds_matches_across_chunk_boundaries():
+    pieces = ["x" * 10 + "sec", "ret" + "y" * 10, "doc", "ker"]
+    assert scan_chunks(pieces, chunk_chars=8) == {"secrets", "infra"}
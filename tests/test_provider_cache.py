@@ -0,0 +1,130 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from warforge.provider_cache import CachingProvider, ProviderResponseStore
+from warforge.providers import get_provider
+
+
+class CountingProvider:
+    name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def stream(self, prompt):
+        self.calls += 1
+        for word in prompt.split():
+            yield word + " "
+
+    def tool_call(self, tool_name, payload):
+        self.calls += 1
+        return {"tool": tool_name, "arguments": payload}
+
+    def cost(self):
+        return {"currency": "usd", "amount": 0.25 * self.calls}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(tmp_path: Path, clock=None, **options):
+    store = ProviderResponseStore(tmp_path / "providers", ttl_s=60, clock=clock or Clock())
+    return CachingProvider(CountingProvider(), store=store, **options)
+
+
+def test_replays_streams_and_tool_calls_and_reports_savings(tmp_path: Path):
+    cache = make_cache(tmp_path)
+    assert list(cache.stream("a b c")) == ["a ", "b ", "c "]
+    assert list(cache.stream("a b c")) == ["a ", "b ", "c "]
+    assert cache.tool_call("lookup", {"q": 1}) == cache.tool_call("lookup", {"q": 1})
+    assert cache.tool_call("lookup", {"q": 2})["arguments"] == {"q": 2}
+    assert cache.provider.calls == 3
+    cost = cache.cost()
+    assert cost["amount"] == 0.75 and cost["cache_hits"] == 2 and cost["cache_misses"] == 3
+    assert cost["saved_amount"] == 0.5
+
+    # A fresh wrapper (new process) hits the disk tier.
+    again = CachingProvider(CountingProvider(), store=cache.store)
+    assert "".join(again.stream("a b c")) == "a b c " and again.provider.calls == 0
+    assert again.cost()["saved_amount"] == 0.25
+
+
+def test_incomplete_streams_are_not_cached(tmp_path: Path):
+    cache = make_cache(tmp_path)
+    stream = cache.stream("a b c")
+    assert next(stream) == "a "
+    stream.close()
+    list(cache.stream("a b c"))
+    assert cache.provider.calls == 2 and cache.cost()["cache_hits"] == 0
+
+
+def test_ttl_memory_bound_and_key_params(tmp_path: Path):
+    clock = Clock()
+    cache = make_cache(tmp_path, clock=clock, memory_entries=1)
+    list(cache.stream("one"))
+    list(cache.stream("two"))
+    assert len(cache._memory) == 1
+    list(cache.stream("one"))
+    assert cache.provider.calls == 2
+
+    clock.now += 61
+    list(cache.stream("one"))
+    assert cache.provider.calls == 3
+
+    other = CachingProvider(cache.provider, store=cache.store, params={"temperature": 0.7})
+    list(other.stream("one"))
+    assert cache.provider.calls == 4
+
+
+def test_disk_tier_is_size_capped(tmp_path: Path):
+    store = ProviderResponseStore(tmp_path / "providers", max_bytes=600)
+    cache = CachingProvider(CountingProvider(), store=store, memory_entries=0)
+    for index in range(10):
+        list(cache.stream(f"prompt {index}"))
+    files = list((tmp_path / "providers").glob("*.json"))
+    assert 0 < len(files) < 10
+    assert sum(path.stat().st_size for path in files) <= 600
+
+
+class EndpointProvider(CountingProvider):
+    def __init__(self, base_url, system):
+        super().__init__()
+        self.config = SimpleNamespace(model="m", base_url=base_url)
+        self.system = system
+
+    def stream_request(self, prompt):
+        messages = [{"role": "system", "content": self.system}, {"role": "user", "content": prompt}]
+        return {"model": "m", "messages": messages}
+
+
+def test_key_covers_endpoint_and_sent_body_and_results_are_copies(tmp_path: Path):
+    store = ProviderResponseStore(tmp_path / "providers")
+    first = CachingProvider(EndpointProvider("http://a/v1", "terse"), store=store)
+    list(first.stream("hi"))
+    for provider in (EndpointProvider("http://b/v1", "terse"), EndpointProvider("http://a/v1", "verbose")):
+        other = CachingProvider(provider, store=store)
+        list(other.stream("hi"))
+        assert provider.calls == 1
+    same = CachingProvider(EndpointProvider("http://a/v1", "terse"), store=store)
+    list(same.stream("hi"))
+    assert same.provider.calls == 0
+
+    cache = make_cache(tmp_path)
+    cache.tool_call("lookup", {"q": 1})["arguments"]["q"] = "changed"
+    assert cache.tool_call("lookup", {"q": 1})["arguments"] == {"q": 1}
+    cache.tool_call("lookup", {"q": 1})["arguments"]["q"] = "changed"
+    assert cache.tool_call("lookup", {"q": 1})["arguments"] == {"q": 1}
+
+
+def test_get_provider_wraps_in_cache():
+    provider = get_provider("stub", cached=True)
+    assert isinstance(provider, CachingProvider) and provider.name == "stub"
+    with pytest.raises(KeyError):
+        get_provider("nope", cached=True)
@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import httpx
+import pytest
+
+from warforge.providers import HTTPProvider, ProviderConfig, ProviderError, parse_retry_after
+
+
+class StandIn(ThreadingHTTPServer):
+    """OpenAI-compatible stand-in: pops a scripted status per request, then streams slowly."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.script: List[tuple] = []
+        self.chunk_delay_s = 0.0
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandIn
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+            status, headers = self.server.script.pop(0) if self.server.script else (200, {})
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        try:
+            if status != 200:
+                payload = b'{"error": "slow down"}'
+                self.send_response(status)
+                for name, value in {**headers, "Content-Length": str(len(payload))}.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+            elif body.get("stream"):
+                self._stream(["Hel", "lo", "!"])
+            else:
+                arguments = json.dumps({"echo": body["tool_choice"]["function"]["name"]})
+                message = {"tool_calls": [{"function": {"name": "x", "arguments": arguments}}]}
+                payload = json.dumps({"choices": [{"message": message}], "usage": {"prompt_tokens": 3, "completion_tokens": 2}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _stream(self, tokens):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        events = [{"choices": [{"delta": {"content": token}}]} for token in tokens]
+        events.append({"choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": len(tokens)}})
+        for data in [json.dumps(event) for event in events] + ["[DONE]"]:
+            time.sleep(self.server.chunk_delay_s)
+            chunk = f"data: {data}\n\n".encode()
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+@pytest.fixture()
+def server():
+    server = StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_provider(server, name, **overrides):
+    config = ProviderConfig(
+        name=name,
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        api_key_env="",
+        input_cost_per_mtok=1_000_000,
+        output_cost_per_mtok=2_000_000,
+        **overrides,
+    )
+    sleeps = []
+    provider = HTTPProvider(config, client=httpx.Client(), sleep=sleeps.append)
+    return provider, sleeps
+
+
+def test_stream_retries_throttling_and_records_stats(server):
+    server.script = [(429, {"Retry-After": "2"}), (503, {})]
+    server.chunk_delay_s = 0.02
+    provider, sleeps = make_provider(server, "throttled", backoff_base_s=0.1)
+    assert "".join(provider.stream("hi")) == "Hello!"
+    assert sleeps[0] == 2.0 and 0 <= sleeps[1] <= 0.2
+    [call] = provider.calls
+    assert call.retries == 2 and call.status == "ok"
+    assert 0 < call.ttft_ms < call.latency_ms
+    assert provider.cost() == {"currency": "usd", "amount": 16.0, "calls": 1, "retries": 2, "input_tokens": 10, "output_tokens": 3}
+    assert provider.stats()["retries"] == 2
+
+
+def test_gives_up_after_max_retries_and_on_long_retry_after(server):
+    server.script = [(503, {})] * 3
+    provider, sleeps = make_provider(server, "flaky", max_retries=2)
+    with pytest.raises(ProviderError) as excinfo:
+        provider.tool_call("lookup", {"prompt": "x"})
+    assert excinfo.value.status == 503 and excinfo.value.attempts == 3 and len(sleeps) == 2
+
+    server.script = [(429, {"Retry-After": "3600"})]
+    with pytest.raises(ProviderError, match="retry after"):
+        list(provider.stream("x"))
+    server.script = [(400, {})]
+    with pytest.raises(ProviderError) as excinfo:
+        provider.tool_call("lookup", {"prompt": "x"})
+    assert excinfo.value.attempts == 1
+    assert provider.tool_call("lookup", {"prompt": "x"})["arguments"] == {"echo": "lookup"}
+    assert [call.status for call in provider.calls] == ["error", "error", "error", "ok"]
+
+
+def test_concurrency_is_capped_per_provider_and_connections_reused(server):
+    server.chunk_delay_s = 0.01
+    provider, _ = make_provider(server, "capped", max_concurrency=2)
+    threads = [threading.Thread(target=lambda: list(provider.stream("x"))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.max_in_flight == 2
+    assert provider.stats()["calls"] == 6
+
+    server.connections.clear()
+    for _ in range(3):
+        list(provider.stream("x"))
+    assert len(server.connections) == 1
+
+
+def test_tool_call_usage_counts_towards_cost(server):
+    provider, _ = make_provider(server, "tools")
+    assert provider.tool_call("lookup", {"prompt": "x"})["arguments"] == {"echo": "lookup"}
+    assert provider.cost() == {"currency": "usd", "amount": 7.0, "calls": 1, "retries": 0, "input_tokens": 3, "output_tokens": 2}
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after("Thu, 01 Jan 1970 00:01:00 GMT", now=0) == 60
+    assert parse_retry_after("soon") is None and parse_retry_after(None) is None
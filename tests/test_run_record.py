@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+from warforge.run_record import (
+    RECORD_NAME,
+    ArtifactStore,
+    RecordReader,
+    RunRecord,
+    export_record,
+    read_artifact,
+    read_artifact_json,
+)
+
+
+def test_record_roundtrip_and_latest_write_wins(tmp_path: Path):
+    path = tmp_path / RECORD_NAME
+    with RunRecord(path) as record:
+        record.write_json("checkpoint.json", {"stage": "plan"})
+        record.write_text("receipt.md", "# Receipt\n")
+        record.write_json("checkpoint.json", {"stage": "verify"})
+    reader = RecordReader(path)
+    assert reader.names() == ["checkpoint.json", "receipt.md"]
+    assert reader.read_json("checkpoint.json") == {"stage": "verify"}
+    assert reader.read_text("receipt.md") == "# Receipt\n"
+    assert reader.read("missing.json") is None
+
+
+def test_torn_tail_is_ignored_and_truncated(tmp_path: Path):
+    path = tmp_path / RECORD_NAME
+    record = RunRecord(path)
+    record.write_json("a.json", {"n": 1})
+    record.write_json("b.json", {"n": 2})
+    # Simulate a crash mid-append: no index, and the last frame is cut short.
+    record._handle.close()
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+
+    reader = RecordReader(path)
+    assert reader.names() == ["a.json"]
+
+    with RunRecord(path) as reopened:
+        reopened.write_text("c.txt", "after crash")
+    reader = RecordReader(path)
+    assert reader.names() == ["a.json", "c.txt"]
+    assert reader.read_text("c.txt") == "after crash"
+
+
+def test_reopen_appends_after_previous_index(tmp_path: Path):
+    path = tmp_path / RECORD_NAME
+    with RunRecord(path) as record:
+        record.write_json("a.json", {"n": 1})
+    with RunRecord(path) as record:
+        assert set(record.entries) == {"a.json"}
+        record.write_json("b.json", {"n": 2})
+    reader = RecordReader(path)
+    assert reader.read_json("a.json") == {"n": 1}
+    assert reader.read_json("b.json") == {"n": 2}
+
+
+def test_artifact_store_and_export(tmp_path: Path):
+    run_dir = tmp_path / "run-1"
+    store = ArtifactStore(run_dir, use_record=True)
+    store.write_json("test_report.json", {"results": []})
+    store.write_text("receipt.md", "done\n")
+    store.close()
+    assert [path.name for path in run_dir.iterdir()] == [RECORD_NAME]
+    assert read_artifact(run_dir, "receipt.md") == b"done\n"
+    assert read_artifact_json(run_dir, "test_report.json") == {"results": []}
+
+    out_dir = tmp_path / "export"
+    written = export_record(run_dir, out_dir)
+    assert sorted(path.name for path in written) == ["receipt.md", "test_report.json"]
+    assert json.loads((out_dir / "test_report.json").read_text()) == {"results": []}
+
+
+def test_read_artifact_falls_back_to_files(tmp_path: Path):
+    store = ArtifactStore(tmp_path)
+    store.write_json("checkpoint.json", {"stage": "plan"})
+    store.close()
+    assert not (tmp_path / RECORD_NAME).exists()
+    assert read_artifact_json(tmp_path, "checkpoint.json") == {"stage": "plan"}
+    assert read_artifact(tmp_path, "missing.md") is None
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from warforge.agents.base import Agent, AgentResult
+from warforge.scheduler import GateFailed, build_dag, critical_path, run_dag
+
+
+class SourceAgent(Agent):
+    name = "source"
+    writes = ("value",)
+
+    def run(self, context):
+        time.sleep(0.05)
+        return AgentResult(self.name, {"value": 2})
+
+
+class SleeperAgent(Agent):
+    name = "sleeper"
+
+    def run(self, context):
+        time.sleep(0.05)
+        return AgentResult(self.name, {"slept": True})
+
+
+class ConsumerAgent(Agent):
+    name = "consumer"
+    reads = ("value",)
+
+    def run(self, context):
+        return AgentResult(self.name, {"double": context["value"] * 2})
+
+
+def test_build_dag_orders_readers_after_writers():
+    dag = build_dag([SourceAgent, SleeperAgent, ConsumerAgent])
+    assert dag == {"source": [], "sleeper": [], "consumer": ["source"]}
+
+
+def test_run_dag_runs_independent_agents_concurrently():
+    context = {}
+    results, timings = run_dag([SourceAgent(), SleeperAgent(), ConsumerAgent()], context, max_workers=2)
+    assert results["consumer"].payload == {"double": 4}
+    assert context["value"] == 2
+    assert timings["sleeper"].start_ms < timings["source"].end_ms
+    assert timings["consumer"].start_ms >= timings["source"].end_ms
+    path = critical_path(build_dag([SourceAgent, SleeperAgent, ConsumerAgent]), {
+        name: timing.duration_ms for name, timing in timings.items()
+    })
+    assert path == ["source", "consumer"]
+
+
+class FlakyAgent(Agent):
+    name = "flaky"
+    retries = 1
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def run(self, context):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("transient")
+        return AgentResult(self.name, {"calls": self.calls})
+
+
+class AsyncSlowAgent(Agent):
+    name = "slow"
+    timeout_s = 0.05
+
+    async def arun(self, context):
+        await asyncio.sleep(1)
+        return AgentResult(self.name, {})
+
+
+def test_run_dag_retries_failed_attempts():
+    _, timings = run_dag([FlakyAgent()], {})
+    assert timings["flaky"].attempts == 2
+    assert timings["flaky"].retries == 1
+
+
+def test_gate_failure_cancels_running_siblings():
+    sleeper = SleeperAgent()
+    with pytest.raises(GateFailed) as excinfo:
+        run_dag([AsyncSlowAgent(), sleeper], {}, max_workers=2)
+    assert excinfo.value.agent_name == "slow"
+    assert "timed out" in excinfo.value.reason
+
+
+class BlockingAgent(Agent):
+    """Sync agent stuck in a blocking call (like a provider stream) that only checks ``cancelled`` between waits."""
+
+    name = "blocking"
+    timeout_s = 0.2
+    retries = 1
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+        self.first_attempt_cancelled = threading.Event()
+
+    def run(self, context):
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(1.0)
+            if self.cancelled:
+                self.first_attempt_cancelled.set()
+            return AgentResult(self.name, {"attempt": 1})
+        return AgentResult(self.name, {"attempt": self.calls})
+
+
+def test_sync_agent_deadline_is_enforced_in_wall_clock_time():
+    agent = BlockingAgent()
+    agent.retries = 0
+    started = time.monotonic()
+    with pytest.raises(GateFailed) as excinfo:
+        run_dag([agent], {})
+    assert time.monotonic() - started < 0.8
+    assert "timed out" in excinfo.value.reason
+
+
+def test_retry_does_not_uncancel_the_abandoned_attempt():
+    agent = BlockingAgent()
+    results, timings = run_dag([agent], {})
+    assert results["blocking"].payload == {"attempt": 2} and timings["blocking"].timeouts == 1
+    assert agent.first_attempt_cancelled.wait(2.0)
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+from warforge import sharding, storage
+from warforge.sharding import junit_key, plan_shards, run_sharded, strip_test_args
+
+
+def test_plan_shards_balances_by_duration():
+    timings = {"a": 90.0, "b": 60.0, "c": 50.0, "d": 40.0, "e": 10.0}
+    shards = plan_shards(list(timings), timings, 2)
+    loads = sorted(sum(timings[test] for test in shard.tests) for shard in shards)
+    assert loads == [120.0, 130.0]
+    assert sorted(test for shard in shards for test in shard.tests) == sorted(timings)
+    assert len(plan_shards(["only"], {}, 8)) == 1
+
+
+def test_junit_key_matches_pytest_classname():
+    assert junit_key("tests/test_api.py::TestRuns::test_get[x-1]") == "tests.test_api.TestRuns::test_get[x-1]"
+
+
+def test_run_sharded_merges_shards_and_records_timings(warforge_db, tmp_path: Path):
+    repo = tmp_path / "repo"
+    (repo / "tests").mkdir(parents=True)
+    (repo / "tests" / "test_sample.py").write_text(
+        "import pytest\n\n@pytest.mark.parametrize('n', range(4))\ndef test_n(n):\n    assert n >= 0\n"
+    )
+    command = [sys.executable, "-m", "pytest"]
+
+    result = run_sharded(command, 2, "repo-key", cwd=repo)
+
+    assert result.status == "passed"
+    assert [shard["tests"] for shard in result.shards] == [2, 2]
+    assert "--- shard 1" in result.output
+    timings = storage.get_test_timings("repo-key")
+    assert sorted(timings) == [f"tests/test_sample.py::test_n[{n}]" for n in range(4)]
+
+
+def test_narrowed_command_runs_each_selected_test_once(warforge_db, tmp_path: Path):
+    repo = tmp_path / "repo"
+    (repo / "tests").mkdir(parents=True)
+    (repo / "tests" / "test_sample.py").write_text(
+        "import pytest\n\n@pytest.mark.parametrize('n', range(4))\ndef test_n(n):\n    assert n >= 0\n"
+    )
+    (repo / "tests" / "test_other.py").write_text("def test_other():\n    assert False\n")
+    command = [sys.executable, "-m", "pytest", "-k", "test_n", "tests/test_sample.py"]
+    assert strip_test_args(command) == [sys.executable, "-m", "pytest", "-k", "test_n"]
+    assert strip_test_args(["pytest", "tests/a.py::test_x", "-x"]) == ["pytest", "-x"]
+
+    result = run_sharded(command, 2, "repo-key", cwd=repo)
+
+    assert result.status == "passed"
+    assert [shard["tests"] for shard in result.shards] == [2, 2]
+    assert result.output.count("2 passed") == 2 and "4 passed" not in result.output
+
+
+def test_slow_collection_falls_back_to_one_run(warforge_db, tmp_path: Path, monkeypatch):
+    repo = tmp_path / "repo"
+    (repo / "tests").mkdir(parents=True)
+    (repo / "conftest.py").write_text("import sys, time\n\nif '--collect-only' in sys.argv:\n    time.sleep(10)\n")
+    (repo / "tests" / "test_sample.py").write_text("def test_a():\n    pass\n\n\ndef test_b():\n    pass\n")
+    monkeypatch.setattr(sharding, "COLLECT_TIMEOUT_S", 0.5)
+
+    result = run_sharded([sys.executable, "-m", "pytest"], 2, "repo-key", cwd=repo)
+
+    assert result.status == "passed" and not result.shards
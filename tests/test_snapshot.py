@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from warforge.snapshot import build_snapshot
+
+
+def test_snapshot_collects_repo_facts_in_one_walk(tmp_path: Path):
+    repo = tmp_path / "repo"
+    (repo / ".github" / "workflows").mkdir(parents=True)
+    (repo / "pyproject.toml").write_text("[project]\n")
+    (repo / ".github" / "workflows" / "ci.yml").write_text("on: push\n")
+    (repo / "app.py").write_text("print('hi')\n")
+
+    snapshot = build_snapshot(repo, manifest_dir=tmp_path / "cache")
+
+    assert snapshot.files == (".github/workflows/ci.yml", "app.py", "pyproject.toml")
+    assert snapshot.stack == "python"
+    assert snapshot.entry_points == ("pyproject.toml",)
+    assert snapshot.workflows == (".github/workflows/ci.yml",)
+    assert snapshot.verification_commands == (("pytest",),)
+    assert snapshot.repo_map(limit=1)["files"] == [".github/workflows/ci.yml"]
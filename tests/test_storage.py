@@ -0,0 +1,112 @@
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from warforge import storage
+from warforge.cli import app
+
+
+def test_claims_are_exclusive(warforge_db):
+    first = storage.add_task("first", "first")
+    second = storage.add_task("second", "second")
+    assert storage.claim_task("worker-a").task_id == first.task_id
+    assert storage.claim_task("worker-b").task_id == second.task_id
+    assert storage.claim_task("worker-c") is None
+
+
+def test_expired_lease_is_redelivered(warforge_db):
+    task = storage.add_task("crashy", "crashy")
+    assert storage.claim_task("worker-a", lease_s=-1).task_id == task.task_id
+    assert storage.heartbeat(task.task_id, "worker-b") is False
+    assert storage.claim_task("worker-b").task_id == task.task_id
+    storage.complete_task(task.task_id, "worker-b")
+    assert storage.claim_task("worker-c") is None
+    assert list(storage.list_queue()) == []
+
+
+def test_priority_classes_age(warforge_db, monkeypatch):
+    clock = iter([1000.0, 1000.0 + 2 * storage.AGING_S + 1, 1000.0 + 2 * storage.AGING_S + 2])
+    monkeypatch.setattr(storage.time, "time", lambda: next(clock, 5000.0))
+    old_low = storage.add_task("old low", "old low", priority="low")
+    fresh_high = storage.add_task("fresh high", "fresh high", priority="high")
+    fresh_normal = storage.add_task("fresh normal", "fresh normal")
+    assert [task.task_id for task in storage.list_queue()] == [
+        old_low.task_id,
+        fresh_high.task_id,
+        fresh_normal.task_id,
+    ]
+
+
+def test_legacy_queue_files_are_imported(warforge_db):
+    queue_dir = warforge_db / "queue"
+    queue_dir.mkdir()
+    (queue_dir / "task-1.json").write_text(
+        '{"task_id": "task-1", "title": "legacy", "description": "legacy", "created_at": "now"}'
+    )
+    assert storage.queue_depth() == 1
+    assert not queue_dir.exists()
+    assert storage.claim_task("worker-a").title == "legacy"
+
+
+def test_bulk_insert_and_lookup(warforge_db):
+    tasks = storage.add_tasks((f"task {index}", "bulk", "normal") for index in range(1200))
+    assert len({task.task_id for task in tasks}) == 1200
+    wanted = [tasks[1100].task_id, tasks[3].task_id]
+    assert [task.task_id for task in storage.get_tasks(wanted)] == wanted
+    assert storage.connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_batches_in_the_same_nanosecond_get_distinct_ids(warforge_db, monkeypatch):
+    monkeypatch.setattr(storage.time, "time_ns", lambda: 1_700_000_000_000_000_000)
+    first = storage.add_tasks([("a", "a", "normal"), ("b", "b", "normal")])
+    second = storage.add_tasks([("c", "c", "normal")])
+    assert len({task.task_id for task in first + second}) == 3
+    assert storage.queue_depth() == 3
+
+
+def test_queue_add_from_file_reports_bad_lines(warforge_db, tmp_path: Path):
+    tasks_file = tmp_path / "tasks.jsonl"
+    tasks_file.write_text('"first"\n{"title": "second"\n')
+    result = CliRunner().invoke(app, ["queue", "add", "--from-file", str(tasks_file)])
+    assert result.exit_code == 1 and f"{tasks_file}:2: invalid JSON" in result.output
+    tasks_file.write_text('"first"\n[1, 2]\n')
+    result = CliRunner().invoke(app, ["queue", "add", "--from-file", str(tasks_file)])
+    assert result.exit_code == 1 and f"{tasks_file}:2: expected a string or an object" in result.output
+    assert storage.queue_depth() == 0
+
+
+def _summary(index: int, status: str = "complete") -> storage.RunSummary:
+    return storage.RunSummary(
+        run_id=f"run-task-{index}",
+        task_id=f"task-{index}",
+        status=status,
+        started_at=1000.0 + index,
+        finished_at=1000.0 + index * 10,
+        total_duration_ms=float((index * 7) % 13),
+        stage_durations={"plan": 1.5},
+        restricted_zones=["auth"] if index % 5 == 0 else [],
+    )
+
+
+def test_run_history_filters_and_pages(warforge_db):
+    storage.record_runs(
+        _summary(index, "verification_failed" if index % 3 == 0 else "complete") for index in range(1, 31)
+    )
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = storage.list_runs(limit=7, cursor=cursor)
+        seen.extend(run.run_id for run in page)
+        if cursor is None:
+            break
+    assert seen == [f"run-task-{index}" for index in range(30, 0, -1)]
+
+    failed, _ = storage.list_runs(status="failed", since=1000.0 + 150)
+    assert [run.run_id for run in failed] == ["run-task-30", "run-task-27", "run-task-24", "run-task-21", "run-task-18", "run-task-15"]
+    assert failed[-1].restricted_zones == ["auth"] and failed[-1].stage_durations == {"plan": 1.5}
+
+    slowest, _ = storage.list_runs(order="slowest", limit=3)
+    assert [run.total_duration_ms for run in slowest] == [12.0, 12.0, 11.0]
+
+    storage.record_run(_summary(30, "complete"))
+    assert storage.list_runs(limit=1)[0][0].status == "complete"
@@ -0,0 +1,47 @@
+import pytest
+
+from warforge import storage
+from warforge.telemetry import Registry, group_samples, histogram_quantile, histogram_summary, render
+
+
+def test_histogram_quantiles_from_buckets():
+    registry = Registry()
+    latency = registry.histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0, 10.0))
+    for value in [0.05] * 50 + [0.5] * 48 + [5.0] * 2:
+        latency.observe(value, stage="plan")
+    series = group_samples(registry.drain())
+    fields = series[("demo_seconds", '[["stage","plan"]]')]
+    assert fields["count"] == 100 and fields["+Inf"] == 100 and fields["0.1"] == 50
+    assert histogram_quantile(0.5, latency, fields) == pytest.approx(0.1)
+    assert 1.0 < histogram_quantile(0.99, latency, fields) <= 10.0
+    [(labels, count, p50, _, mean)] = histogram_summary(series, latency)
+    assert labels == {"stage": "plan"} and count == 100 and mean == pytest.approx(0.365)
+    with pytest.raises(ValueError):
+        latency.observe(1.0, agent="planner")
+
+
+def test_render_openmetrics_and_prometheus_text():
+    registry = Registry()
+    registry.histogram("demo_seconds", "Demo.", ("stage",), buckets=(1.0,)).observe(0.5, stage='say "hi"')
+    registry.counter("demo_lookups", "Lookups.", ("result",)).inc(3, result="hit")
+    series = group_samples(registry.drain())
+    text = render(series, gauges={"demo_depth": ("Depth.", 4)}, registry=registry)
+    assert 'demo_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 1' in text
+    assert 'demo_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 1' in text
+    assert "# TYPE demo_lookups counter" in text and 'demo_lookups_total{result="hit"} 3' in text
+    assert "demo_depth 4" in text and text.endswith("# EOF\n")
+    legacy = render(series, registry=registry, openmetrics=False)
+    assert "# TYPE demo_lookups_total counter" in legacy and "# EOF" not in legacy
+
+
+def test_flush_accumulates_across_processes(warforge_db):
+    first, second = Registry(), Registry()
+    for registry in (first, second):
+        registry.counter("demo_lookups", "Lookups.", ("result",)).inc(result="hit")
+        registry.histogram("demo_seconds", "Demo.").observe(0.2)
+        storage.flush_metrics(registry)
+    assert storage.flush_metrics(first) == 0
+    series = storage.load_metrics()
+    assert series[("demo_lookups", '[["result","hit"]]')]["total"] == 2
+    assert series[("demo_seconds", "[]")]["count"] == 2
+    assert series[("demo_seconds", "[]")]["sum"] == pytest.approx(0.4)
@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+
+from typer.testing import CliRunner
+
+from warforge import verification_cache
+from warforge.cli import app
+from warforge.config import WarforgeConfig, save_config
+from warforge.verification import CommandResult, run_commands
+from warforge.verification_cache import VerificationCache, cache_key, dependency_identity, run_cached_commands
+
+
+def _py(code: str):
+    return [sys.executable, "-c", code]
+
+
+def test_results_keep_input_order_and_drain_large_output():
+    chatty = _py("import sys; sys.stdout.write('x' * 1_000_000)")
+    quick = _py("print('ok')")
+    results = run_commands([chatty, quick], max_workers=2)
+    assert [result.command for result in results] == [chatty, quick]
+    assert len(results[0].output) == 1_000_000
+    assert results[1].output.strip() == "ok"
+    assert all(result.status == "passed" for result in results)
+    assert results[0].cpu_ms >= 0
+
+
+def test_per_command_timeout_kills_process():
+    start = time.monotonic()
+    results = run_commands([_py("import time; time.sleep(30)")], timeout_s=0.3)
+    assert results[0].status == "timeout"
+    assert time.monotonic() - start < 10
+
+
+def test_fail_fast_cancels_siblings_and_skips_pending():
+    slow = _py("import time; time.sleep(30)")
+    failing = _py("import sys; sys.exit(3)")
+    later = _py("print('never')")
+    start = time.monotonic()
+    results = run_commands([slow, failing, later], max_workers=2, fail_fast=True)
+    assert [result.status for result in results] == ["cancelled", "failed", "skipped"]
+    assert results[1].returncode == 3
+    assert time.monotonic() - start < 10
+
+
+def test_worker_limit_bounds_concurrency():
+    sleeper = _py("import time; time.sleep(0.3)")
+    start = time.monotonic()
+    run_commands([sleeper] * 4, max_workers=2)
+    assert time.monotonic() - start >= 0.6
+
+
+def test_cache_replays_passing_results_and_reruns_failures(tmp_path):
+    counter = tmp_path / "count"
+    bump = _py(
+        f"import pathlib; p = pathlib.Path({str(counter)!r}); "
+        "p.write_text(p.read_text() + 'x' if p.exists() else 'x'); print('ran')"
+    )
+    failing = _py("import sys; sys.exit(1)")
+    cache = VerificationCache(tmp_path / "cache")
+
+    first, hits = run_cached_commands([bump, failing], "hash-a", cache=cache)
+    assert hits == 0 and [result.cached for result in first] == [False, False]
+    second, hits = run_cached_commands([bump, failing], "hash-a", cache=cache)
+    assert hits == 1
+    assert second[0].cached and second[0].output.strip() == "ran"
+    assert not second[1].cached and second[1].returncode == 1
+    assert counter.read_text() == "x"
+
+    run_cached_commands([bump], "hash-b", cache=cache)
+    assert counter.read_text() == "xx"
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = VerificationCache(tmp_path)
+    cache.put("first", CommandResult(["true"], 0, 1.0, "a"))
+    cache.put("second", CommandResult(["true"], 0, 1.0, "b"))
+    os.utime(tmp_path / "first.json", (1, 1))
+    os.utime(tmp_path / "second.json", (2, 2))
+    assert cache.get("first") is not None
+
+    cache.max_bytes = (tmp_path / "first.json").stat().st_size
+    assert cache.evict() == 1
+    assert cache.get("second") is None
+    assert cache.get("first").cached
+
+
+def test_cache_key_tracks_tool_interpreter_and_installed_packages(tmp_path, monkeypatch):
+    venv = tmp_path / "venv"
+    site_packages = venv / "lib" / "python3.11" / "site-packages"
+    site_packages.mkdir(parents=True)
+    (venv / "bin").mkdir()
+    (venv / "bin" / "python").symlink_to(sys.executable)
+    tool = venv / "bin" / "checktool"
+    tool.write_text(f"#!{venv / 'bin' / 'python'}\nprint('ok')\n")
+    tool.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{venv / 'bin'}{os.pathsep}{os.environ['PATH']}")
+
+    identity = dependency_identity("checktool", tmp_path)
+    assert identity["interpreter"]["path"] == os.path.realpath(sys.executable)
+    assert str(site_packages) in identity["manifests"]
+
+    before = cache_key("hash-a", ["checktool"], tmp_path)
+    assert cache_key("hash-a", ["checktool"], tmp_path) == before
+    (site_packages / "newdep").mkdir()
+    os.utime(site_packages, ns=(1, 1))
+    assert cache_key("hash-a", ["checktool"], tmp_path) != before
+
+    before = cache_key("hash-a", ["checktool"], tmp_path)
+    (tmp_path / "node_modules").mkdir()
+    assert cache_key("hash-a", ["checktool"], tmp_path) != before
+
+
+def test_verify_cli_falls_back_to_config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text("[project]\nname = 'demo'\n")
+    save_config(WarforgeConfig(verify_workers=3, verify_timeout_s=9.0, verify_total_timeout_s=30.0, fail_fast=True))
+    seen = []
+
+    def fake_run(commands, repo_hash, **options):
+        seen.append(options)
+        return [CommandResult(commands[0], 0, 1.0, "")], 0
+
+    monkeypatch.setattr(verification_cache, "run_cached_commands", fake_run)
+    runner = CliRunner()
+    assert runner.invoke(app, ["verify", "--no-cache"]).exit_code == 0
+    assert runner.invoke(app, ["verify", "--no-cache", "-w", "1", "--timeout", "2", "--no-fail-fast"]).exit_code == 0
+    keys = ("max_workers", "timeout_s", "total_timeout_s", "fail_fast")
+    picked = [{key: options[key] for key in keys} for options in seen]
+    assert picked == [
+        {"max_workers": 3, "timeout_s": 9.0, "total_timeout_s": 30.0, "fail_fast": True},
+        {"max_workers": 1, "timeout_s": 2.0, "total_timeout_s": 30.0, "fail_fast": False},
+    ]
@@ -0,0 +1,54 @@
+from itertools import islice
+from pathlib import Path
+
+from warforge.walker import is_ignored, iter_repo_files, parse_ignore_lines
+
+
+def _touch(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("x")
+
+
+def test_walker_prunes_defaults_and_ignore_files(tmp_path: Path):
+    for name in (
+        "app.py",
+        "pkg/mod.py",
+        "pkg/generated/out.py",
+        "node_modules/dep/index.js",
+        ".git/HEAD",
+        "runs/run-1/receipt.md",
+        "docs/runs/guide.md",
+        "logs/debug.log",
+        "logs/keep.log",
+    ):
+        _touch(tmp_path / name)
+    (tmp_path / ".gitignore").write_text("*.log\n!keep.log\n")
+    (tmp_path / "pkg" / ".warforgeignore").write_text("generated/\n")
+
+    for workers in (1, 4):
+        files = {path.relative_to(tmp_path).as_posix() for path in iter_repo_files(tmp_path, workers=workers)}
+        assert files == {
+            ".gitignore",
+            "app.py",
+            "docs/runs/guide.md",
+            "logs/keep.log",
+            "pkg/.warforgeignore",
+            "pkg/mod.py",
+        }
+
+
+def test_walker_streams_a_stable_prefix(tmp_path: Path):
+    for index in range(20):
+        _touch(tmp_path / f"dir{index % 4}" / f"file{index}.py")
+    first = list(islice(iter_repo_files(tmp_path, workers=4), 5))
+    second = list(islice(iter_repo_files(tmp_path, workers=4), 5))
+    assert first == second == list(islice(iter_repo_files(tmp_path, workers=1), 5))
+
+
+def test_anchored_and_double_star_patterns():
+    rules = parse_ignore_lines(["/build", "**/cache/**", "src/*.tmp"])
+    assert is_ignored(rules, "build", is_dir=True)
+    assert not is_ignored(rules, "lib/build", is_dir=True)
+    assert is_ignored(rules, "a/b/cache/x.bin", is_dir=False)
+    assert is_ignored(rules, "src/a.tmp", is_dir=False)
+    assert not is_ignored(rules, "src/nested/a.tmp", is_dir=False)
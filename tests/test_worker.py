@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from warforge import storage
+from warforge.telemetry import QUEUE_WAIT_SECONDS, REGISTRY
+from warforge.worker import run_worker
+
+
+def test_worker_drains_queue_in_parallel(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    REGISTRY.drain()
+    QUEUE_WAIT_SECONDS.observe(1.0, queue="seed")
+    for index in range(3):
+        storage.add_task(f"task {index}", "worker drain")
+    outcomes = []
+    processed = run_worker(concurrency=2, drain=True, dry_run=True, on_outcome=lambda task, outcome: outcomes.append(outcome))
+    assert processed == 3
+    assert sorted(outcome.status for outcome in outcomes) == ["complete"] * 3
+    assert len(list((tmp_path / "runs").iterdir())) == 3
+    assert storage.claim_task("late-worker") is None
+
+    # The parent flushes its own samples once; pool children do not re-flush copies inherited on fork.
+    metrics = storage.load_metrics()
+    counts = {labels: values["count"] for (name, labels), values in metrics.items() if name == QUEUE_WAIT_SECONDS.name}
+    assert counts == {'[["queue","seed"]]': 1, '[["queue","tasks"]]': 3}
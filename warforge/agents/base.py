@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 
 @dataclass
@@ -10,8 +13,101 @@ class AgentResult:
     payload: Dict[str, Any]
 
 
+def result_key(agent_name: str) -> str:
+    return f"{agent_name}_result"
+
+
+# Cancel event of the attempt running in this context. The scheduler sets a fresh one per
+# attempt, so a timed-out attempt still running in its thread stays cancelled after a retry starts.
+CANCEL_TOKEN: contextvars.ContextVar[threading.Event] = contextvars.ContextVar("warforge_cancel_token")
+
+
+def _settle(future: "asyncio.Future[Any]", result: Any, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+async def run_in_daemon_thread(fn: Callable[..., Any], *args: Any, name: str = "warforge-agent") -> Any:
+    """Await ``fn(*args)`` on a daemon thread that nothing joins.
+
+    Unlike ``asyncio.to_thread``, an abandoned call (its awaiting task timed out
+    or was cancelled) neither holds up ``asyncio.run``'s executor shutdown nor
+    process exit; the thread finishes, or not, on its own.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    context = contextvars.copy_context()
+
+    def target() -> None:
+        try:
+            result, error = context.run(fn, *args), None
+        except BaseException as exc:  # noqa: BLE001 - handed to the awaiting task
+            result, error = None, exc
+        try:
+            loop.call_soon_threadsafe(_settle, future, result, error)
+        except RuntimeError:
+            pass  # the loop already closed; nobody is waiting any more
+
+    threading.Thread(target=target, name=name, daemon=True).start()
+    return await future
+
+
 class Agent:
     name: str = "agent"
+    # context_data keys the agent reads and writes. The payload always lands under
+    # result_key(name); each key in `writes` is also copied from the payload.
+    reads: Tuple[str, ...] = ()
+    writes: Tuple[str, ...] = ()
+    # Per-attempt deadline (None falls back to the orchestrator default) and
+    # how many extra attempts a timeout or error is allowed.
+    timeout_s: Optional[float] = None
+    retries: int = 0
+    # Part of the stage cache key; bump whenever the agent's output changes for the same inputs.
+    version: str = "1"
+
+    def __init__(self) -> None:
+        self.cancel_event = threading.Event()
+        # Set by the orchestrator when the run streams events; see warforge.events.
+        self.events: Optional[Callable[[str, Dict[str, Any]], Any]] = None
+
+    @classmethod
+    def output_keys(cls) -> Tuple[str, ...]:
+        return (result_key(cls.name),) + tuple(cls.writes)
+
+    @property
+    def cancelled(self) -> bool:
+        """Set when the scheduler gives up on this attempt; long sync agents should poll it."""
+        return CANCEL_TOKEN.get(self.cancel_event).is_set()
+
+    def emit(self, type: str, **data: Any) -> None:
+        """Publish a ``token``, ``progress`` or ``partial`` event; a no-op when the run has no event stream.
+
+        May block briefly while a slow client catches up, so async agents should
+        call it from a thread rather than on the event loop.
+        """
+        if self.events is not None:
+            self.events(type, data)
+
+    def stream_tokens(self, chunks: Iterable[str]) -> str:
+        """Emit each chunk of a ``Provider.stream`` as a ``token`` event and return the joined text."""
+        parts = []
+        for chunk in chunks:
+            if self.cancelled:
+                break
+            parts.append(chunk)
+            self.emit("token", text=chunk)
+        return "".join(parts)
 
     def run(self, context: Dict[str, Any]) -> AgentResult:
-        raise NotImplementedError
+        if type(self).arun is Agent.arun:
+            raise NotImplementedError
+        return asyncio.run(self.arun(context))
+
+    async def arun(self, context: Dict[str, Any]) -> AgentResult:
+        if type(self).run is Agent.run:
+            raise NotImplementedError
+        return await run_in_daemon_thread(self.run, context, name=f"warforge-agent-{self.name}")
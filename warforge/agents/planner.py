@@ -5,6 +5,7 @@ from warforge.agents.base import Agent, AgentResult
 
 class PlannerAgent(Agent):
     name = "planner"
+    reads = ("title",)
 
     def run(self, context):
         plan = {
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import Dict, Optional, Type
+
+from warforge.agents.base import Agent
+
+
+ENTRY_POINT_GROUP = "warforge.agents"
+
+# Agent name -> "module:Class" (or "module.Class"). Modules are imported the first
+# time a stage asks for the agent, not when the orchestrator is imported.
+AGENT_REGISTRY: Dict[str, str] = {
+    "router": "warforge.agents.router:RouterAgent",
+    "repo_analyst": "warforge.agents.repo_analyst:RepoAnalystAgent",
+    "orchestration_architect": "warforge.agents.orchestration_architect:OrchestrationArchitectAgent",
+    "planner": "warforge.agents.planner:PlannerAgent",
+    "implementer": "warforge.agents.implementer:ImplementerAgent",
+    "test_engineer": "warforge.agents.test_engineer:TestEngineerAgent",
+    "reviewer": "warforge.agents.reviewer:ReviewerAgent",
+    "ai_integrations": "warforge.agents.ai_integrations:AIIntegrationsAgent",
+    "bots_automation": "warforge.agents.bots_automation:BotsAutomationAgent",
+    "eval_quality": "warforge.agents.eval_quality:EvalQualityAgent",
+    "ops_observability": "warforge.agents.ops_observability:OpsObservabilityAgent",
+}
+
+_resolved: Dict[str, Type[Agent]] = {}
+_lock = threading.Lock()
+
+
+def load_target(target: str) -> object:
+    module_name, sep, attribute = target.partition(":")
+    if not sep:
+        module_name, _, attribute = target.rpartition(".")
+    value: object = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        value = getattr(value, part)
+    return value
+
+
+def _entry_point_target(name: str) -> Optional[str]:
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.name == name:
+            return entry_point.value
+    return None
+
+
+def register_agent(name: str, target: str) -> None:
+    """Point ``name`` at a dotted path; takes effect the next time the agent is resolved."""
+    with _lock:
+        AGENT_REGISTRY[name] = target
+        _resolved.pop(name, None)
+
+
+def resolve_agent(name: str) -> Type[Agent]:
+    """Agent class for ``name``: built-ins first, then ``warforge.agents`` entry points."""
+    agent_class = _resolved.get(name)
+    if agent_class is not None:
+        return agent_class
+    with _lock:
+        target = AGENT_REGISTRY.get(name) or _entry_point_target(name)
+        if target is None:
+            raise KeyError(f"Unknown agent {name!r}")
+        agent_class = load_target(target)
+        if not (isinstance(agent_class, type) and issubclass(agent_class, Agent)):
+            raise TypeError(f"{target} is not an Agent subclass")
+        _resolved[name] = agent_class
+    return agent_class
@@ -5,6 +5,7 @@ from warforge.agents.base import Agent, AgentResult
 
 class RouterAgent(Agent):
     name = "router"
+    reads = ("description", "safe_mode")
 
     def run(self, context):
         description = context.get("description", "").lower()
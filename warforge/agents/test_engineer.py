@@ -4,7 +4,9 @@ from warforge.agents.base import Agent, AgentResult
 
 
 class TestEngineerAgent(Agent):
+    __test__ = False  # keep pytest from collecting this module's class
     name = "test_engineer"
+    reads = ("verification_commands",)
 
     def run(self, context):
         commands = context.get("verification_commands", [])
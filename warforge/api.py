@@ -1,26 +1,93 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import mimetypes
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import iterate_in_threadpool
 
 from pathlib import Path
 
-from warforge.storage import add_task, get_task
+from warforge.artifacts import (
+    artifact_etag,
+    etag_matches,
+    gzip_artifact,
+    gzip_etag,
+    is_plain_name,
+    list_artifacts as scan_artifacts,
+    record_etag,
+    resolve_artifact,
+    should_gzip,
+)
+from warforge.events import EVENTS_FILE, HEARTBEAT_S, read_events
+from warforge.jobs import RunManager, RunQueueFull, TaskLeased
+from warforge.run_record import open_record, read_artifact
+from warforge.core import parse_since
+from warforge.storage import (
+    DEFAULT_RUNS_PAGE,
+    add_task,
+    add_tasks,
+    flush_metrics,
+    get_task,
+    get_tasks,
+    list_runs,
+    load_metrics,
+    queue_depth,
+)
+from warforge.telemetry import OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE, render
+
+MAX_RUNS_PAGE = 500
+# Reconnect delay suggested to EventSource clients.
+SSE_RETRY_MS = 1000
+
+run_manager = RunManager()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    run_manager.shutdown(wait=False)
 
-app = FastAPI(title="Warforge Speed API")
+
+app = FastAPI(title="Warforge Speed API", lifespan=lifespan)
 
 
 class TaskRequest(BaseModel):
     title: str
     description: str
+    priority: Literal["high", "normal", "low"] = "normal"
 
 
 @app.post("/tasks")
 def create_task(request: TaskRequest):
-    task = add_task(request.title, request.description)
+    task = add_task(request.title, request.description, priority=request.priority)
     return {"task_id": task.task_id}
 
 
+class TaskBatchRequest(BaseModel):
+    tasks: List[TaskRequest] = Field(..., min_length=1, max_length=10000)
+
+
+@app.post("/tasks/batch")
+def create_tasks(request: TaskBatchRequest):
+    tasks = add_tasks((item.title, item.description, item.priority) for item in request.tasks)
+    return {"task_ids": [task.task_id for task in tasks]}
+
+
+@app.get("/tasks")
+def fetch_tasks(ids: str = Query(..., description="Comma-separated task ids")):
+    task_ids = [task_id for task_id in ids.split(",") if task_id]
+    tasks = get_tasks(task_ids)
+    found = {task.task_id for task in tasks}
+    return {
+        "tasks": [{"task_id": task.task_id, "title": task.title, "description": task.description} for task in tasks],
+        "missing": [task_id for task_id in task_ids if task_id not in found],
+    }
+
+
 @app.get("/tasks/{task_id}")
 def fetch_task(task_id: str):
     task = get_task(task_id)
@@ -40,18 +107,155 @@ def create_approval(request: ApprovalRequest):
     return {"status": "recorded", "run_id": request.run_id, "approved_by": request.approved_by}
 
 
+class RunRequest(BaseModel):
+    task_id: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    dry_run: bool = False
+
+
+@app.post("/runs", status_code=202)
+def create_run(request: RunRequest):
+    if request.task_id:
+        task = get_task(request.task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+    elif request.title:
+        task = add_task(request.title, request.description or request.title)
+    else:
+        raise HTTPException(status_code=422, detail="Provide task_id or title")
+    try:
+        job = run_manager.submit(task, dry_run=request.dry_run)
+    except RunQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    except TaskLeased as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return {"run_id": job.run_id, "task_id": job.task_id, "status": job.status}
+
+
+@app.get("/metrics")
+def metrics(request: Request):
+    flush_metrics()
+    openmetrics = "application/openmetrics-text" in request.headers.get("accept", "")
+    gauges = {
+        "warforge_queue_depth": ("Tasks waiting in the queue.", queue_depth()),
+        "warforge_runs_in_flight": ("API runs queued or running in this process.", run_manager.active_count()),
+    }
+    body = render(load_metrics(), gauges=gauges, openmetrics=openmetrics)
+    return Response(body, media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/runs")
+def fetch_runs(
+    status: Optional[str] = None,
+    since: Optional[str] = Query(None, description="Age like 1d or 6h, or an ISO timestamp"),
+    order: Literal["recent", "slowest"] = "recent",
+    limit: int = Query(DEFAULT_RUNS_PAGE, ge=1, le=MAX_RUNS_PAGE),
+    cursor: Optional[str] = None,
+):
+    try:
+        runs, next_cursor = list_runs(
+            status=status,
+            since=parse_since(since) if since else None,
+            order=order,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"runs": [run.as_dict() for run in runs], "next_cursor": next_cursor}
+
+
+def run_path(run_id: str, root: Path = Path("runs")) -> Path:
+    """Directory of ``run_id`` under ``root``; 404 for ids that would point outside it."""
+    if not is_plain_name(run_id):
+        raise HTTPException(status_code=404, detail="Run not found")
+    return root / run_id
+
+
+@app.get("/runs/{run_id}")
+def fetch_run(run_id: str):
+    run_path(run_id)
+    status = run_manager.status(run_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return status
+
+
+@app.post("/runs/{run_id}/cancel")
+def cancel_run(run_id: str):
+    job = run_manager.cancel(run_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return {"run_id": job.run_id, "status": job.status}
+
+
+@app.get("/runs/{run_id}/events")
+async def stream_events(run_id: str, request: Request, after: int = Query(0, ge=0, description="Resume after this event id")):
+    """Server-Sent Events for a run; ``Last-Event-ID`` (sent by reconnecting clients) overrides ``after``."""
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        try:
+            after = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an event id")
+    path = run_path(run_id, run_manager.runs_dir) / EVENTS_FILE
+    job = run_manager.get(run_id)
+    if job is not None and job.events is not None:
+        source = job.events.asubscribe(after, heartbeat_s=HEARTBEAT_S)
+    elif path.exists():
+        # Run from another process (worker, CLI) or an earlier server: replay its log. A client that
+        # reconnects with Last-Event-ID picks up whatever was appended since.
+        source = iterate_in_threadpool(read_events(path, after))
+    else:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    async def body():
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        async for event in source:
+            yield ": keep-alive\n\n" if event is None else event.to_sse()
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(body(), media_type="text/event-stream", headers=headers)
+
+
 @app.get("/runs/{run_id}/artifacts")
 def list_artifacts(run_id: str):
-    run_dir = Path("runs") / run_id
+    run_dir = run_path(run_id)
     if not run_dir.exists():
         raise HTTPException(status_code=404, detail="Run not found")
-    return {"artifacts": [path.name for path in run_dir.iterdir() if path.is_file()]}
+    return {"artifacts": scan_artifacts(run_dir)}
+
+
+@app.get("/runs/{run_id}/artifacts/{name}")
+def get_artifact(run_id: str, name: str, request: Request):
+    run_dir = run_path(run_id)
+    reader = open_record(run_dir) if run_dir.exists() else None
+    entry = reader.entries.get(name) if reader is not None else None
+    path = None if entry is not None else resolve_artifact(run_dir, name)
+    if entry is None and path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    stat = path.stat() if path is not None else None
+    etag = record_etag(entry) if entry is not None else artifact_etag(stat)
+    size = entry.length if entry is not None else stat.st_size
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag, gzip_etag(etag)):
+        return Response(status_code=304, headers=headers)
+    load = (lambda: reader.read(name)) if entry is not None else path.read_bytes
+    media_type = mimetypes.guess_type(name)[0] or "text/plain"
+    if should_gzip(name, size, request.headers.get("accept-encoding"), "range" in request.headers):
+        headers.update({"ETag": gzip_etag(etag), "Content-Encoding": "gzip"})
+        return Response(gzip_artifact(f"{run_id}/{name}", etag, load), media_type=media_type, headers=headers)
+    if entry is not None:
+        # Record sections are small and read lazily by offset; serve them whole.
+        return Response(load(), media_type=media_type, headers=headers)
+    # FileResponse answers Range/If-Range itself and uses pathsend/sendfile where the server offers it.
+    return FileResponse(path, stat_result=stat, headers=headers)
 
 
 @app.get("/runs/{run_id}/receipt")
 def get_receipt(run_id: str):
-    run_dir = Path("runs") / run_id
-    receipt_path = run_dir / "receipt.md"
-    if not receipt_path.exists():
+    receipt = read_artifact(run_path(run_id), "receipt.md")
+    if receipt is None:
         raise HTTPException(status_code=404, detail="Receipt not found")
-    return {"receipt": receipt_path.read_text()}
+    return {"receipt": receipt.decode("utf-8", errors="replace")}
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import gzip
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from warforge.run_record import RECORD_NAME, RecordEntry, open_record
+
+
+GZIP_MIN_BYTES = 1024
+GZIP_SUFFIXES = (".json",)
+GZIP_CACHE_BYTES = 32 * 1024 * 1024
+
+_gzip_cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+_gzip_cache_bytes = 0
+_gzip_lock = Lock()
+
+
+def list_artifacts(run_dir: Path) -> List[Dict[str, Any]]:
+    """Name, size and mtime of every artifact from a single scandir pass.
+
+    Sections of a run record are listed alongside plain files and take precedence.
+    """
+    artifacts: Dict[str, Dict[str, Any]] = {}
+    with os.scandir(run_dir) as entries:
+        for entry in entries:
+            if not entry.is_file() or entry.name == RECORD_NAME or entry.name.endswith(".tmp"):
+                continue
+            stat = entry.stat()
+            artifacts[entry.name] = {"name": entry.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    reader = open_record(run_dir)
+    if reader is not None:
+        for name, record_entry in reader.entries.items():
+            artifacts[name] = {"name": name, "size": record_entry.length, "mtime_ns": reader.stat.st_mtime_ns}
+    return [artifacts[name] for name in sorted(artifacts)]
+
+
+def is_plain_name(name: str) -> bool:
+    """A single path component: no separators and not ``.`` or ``..``, so it cannot leave its directory."""
+    return bool(name) and name not in (".", "..") and "/" not in name and "\\" not in name
+
+
+def resolve_artifact(run_dir: Path, name: str) -> Optional[Path]:
+    if not is_plain_name(name):
+        return None
+    path = run_dir / name
+    return path if path.is_file() else None
+
+
+def artifact_etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def record_etag(entry: RecordEntry) -> str:
+    return f'"r{entry.offset:x}-{entry.length:x}-{entry.crc:x}"'
+
+
+def gzip_etag(etag: str) -> str:
+    return etag[:-1] + '-gz"'
+
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or any(etag in candidates for etag in etags)
+
+
+def should_gzip(name: str, size: int, accept_encoding: Optional[str], has_range: bool) -> bool:
+    return (
+        not has_range
+        and size >= GZIP_MIN_BYTES
+        and name.endswith(GZIP_SUFFIXES)
+        and "gzip" in (accept_encoding or "").lower()
+    )
+
+
+def gzip_artifact(key: str, etag: str, load: Callable[[], bytes]) -> bytes:
+    """Compress an artifact once per ETag; later polls are served from a bounded LRU."""
+    global _gzip_cache_bytes
+    cache_key = (key, etag)
+    with _gzip_lock:
+        cached = _gzip_cache.get(cache_key)
+        if cached is not None:
+            _gzip_cache.move_to_end(cache_key)
+            return cached
+    body = gzip.compress(load(), compresslevel=6)
+    with _gzip_lock:
+        if cache_key not in _gzip_cache:
+            _gzip_cache[cache_key] = body
+            _gzip_cache_bytes += len(body)
+        while _gzip_cache_bytes > GZIP_CACHE_BYTES and _gzip_cache:
+            _, evicted = _gzip_cache.popitem(last=False)
+            _gzip_cache_bytes -= len(evicted)
+    return body
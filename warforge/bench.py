@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import math
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from warforge import storage
+from warforge.core import RunContext, Task, hash_files, now_iso, repo_files
+from warforge.manifest import fingerprint_repo
+from warforge.orchestrator import Orchestrator
+from warforge.policy import RESTRICTED_PATHS, evaluate_policy
+from warforge.snapshot import build_snapshot
+from warforge.telemetry import REGISTRY
+
+
+BENCH_VERSION = 1
+BASELINE_PATH = Path(".warforge") / "bench" / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+# Timings closer than this to the baseline are treated as noise whatever the ratio.
+MIN_DELTA_S = 0.005
+MAX_FILE_BYTES = 256 * 1024
+WORDS = ["src", "app", "core", "models", "views", "utils", "handlers", "lib", "api", "services", "jobs", "web"]
+RESTRICTED_SEGMENTS = sorted({segment for segments in RESTRICTED_PATHS.values() for segment in segments} - {".github"})
+
+
+@dataclass(frozen=True)
+class RepoShape:
+    """Shape of a generated repo; the seed makes the same shape produce the same tree."""
+
+    files: int = 500
+    depth: int = 4
+    mean_size: int = 2048
+    restricted_density: float = 0.05
+    diff_kib: int = 256
+    tasks: int = 500
+    seed: int = 7
+
+
+@dataclass
+class BenchResult:
+    name: str
+    seconds: float
+    median_s: float
+    ops: int = 1
+
+    @property
+    def ops_per_s(self) -> float:
+        return self.ops / self.seconds if self.seconds else math.inf
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"seconds": self.seconds, "median_s": self.median_s, "ops": self.ops, "ops_per_s": self.ops_per_s}
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline_s: float
+    current_s: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_s / self.baseline_s if self.baseline_s else math.inf
+
+
+@dataclass
+class BenchReport:
+    shape: RepoShape
+    repeat: int
+    results: Dict[str, BenchResult] = field(default_factory=dict)
+    skipped: Dict[str, str] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "version": BENCH_VERSION,
+            "created_at": now_iso(),
+            "python": platform.python_version(),
+            "shape": asdict(self.shape),
+            "repeat": self.repeat,
+            "results": {name: result.as_dict() for name, result in self.results.items()},
+            "skipped": self.skipped,
+        }
+
+
+def _file_size(rng: random.Random, mean_size: int) -> int:
+    # Log-normal: most files are small, a few are large, like real source trees.
+    sigma = 1.0
+    return min(MAX_FILE_BYTES, max(16, int(rng.lognormvariate(math.log(mean_size) - sigma**2 / 2, sigma))))
+
+
+def generate_repo(root: Path, shape: RepoShape) -> List[Path]:
+    """Write a synthetic Python project under ``root`` and return its source files."""
+    rng = random.Random(shape.seed)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "pyproject.toml").write_text('[project]\nname = "bench"\nversion = "0.0.0"\n')
+    (root / "README.md").write_text("# bench\n")
+    directories = []
+    for _ in range(max(1, shape.files // 20)):
+        parts = [rng.choice(WORDS) for _ in range(rng.randint(1, max(1, shape.depth)))]
+        if rng.random() < shape.restricted_density:
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(RESTRICTED_SEGMENTS))
+        directories.append("/".join(parts))
+    written = []
+    for index in range(shape.files):
+        directory = rng.choice(directories)
+        path = root / directory / f"module_{index}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        line = f"value_{index} = {' + '.join(str(rng.randint(0, 999)) for _ in range(6))}\n"
+        path.write_text(line * max(1, _file_size(rng, shape.mean_size) // len(line)))
+        written.append(path)
+    return written
+
+
+def synthetic_diff(shape: RepoShape) -> str:
+    rng = random.Random(shape.seed)
+    lines = []
+    total = 0
+    while total < shape.diff_kib * 1024:
+        words = [rng.choice(WORDS) for _ in range(8)]
+        if rng.random() < shape.restricted_density:
+            words[rng.randrange(len(words))] = rng.choice(RESTRICTED_SEGMENTS)
+        line = "+    " + " ".join(words)
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> Tuple[float, float]:
+    """Best and median wall time of ``fn`` over ``repeat`` runs; ``setup`` runs untimed before each."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+@contextmanager
+def _workspace() -> Iterator[Path]:
+    """Run inside a throwaway directory so benches never touch the caller's .warforge state."""
+    previous = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="warforge-bench-") as tmp:
+        os.chdir(tmp)
+        try:
+            yield Path(tmp)
+        finally:
+            storage.close_connections()
+            # Orchestrator and queue benches record telemetry; keep it out of the real store.
+            REGISTRY.drain()
+            os.chdir(previous)
+
+
+def _bench_repo(report: BenchReport, repo: Path, paths: List[Path]) -> None:
+    repeat = report.repeat
+    files = len(paths)
+    report.results["walk"] = BenchResult("walk", *measure(lambda: list(repo_files(repo)), repeat), ops=files)
+    report.results["hash_files"] = BenchResult("hash_files", *measure(lambda: hash_files(paths), repeat), ops=files)
+    manifests = Path(".warforge") / "bench-manifests"
+    counter = iter(range(10**6))
+    report.results["fingerprint_cold"] = BenchResult(
+        "fingerprint_cold",
+        *measure(lambda: fingerprint_repo(repo, manifest_dir=manifests / str(next(counter))), repeat),
+        ops=files,
+    )
+    fingerprint_repo(repo, manifest_dir=manifests / "warm")
+    report.results["fingerprint_warm"] = BenchResult(
+        "fingerprint_warm", *measure(lambda: fingerprint_repo(repo, manifest_dir=manifests / "warm"), repeat), ops=files
+    )
+    report.results["ingest"] = BenchResult(
+        "ingest", *measure(lambda: build_snapshot(repo, manifest_dir=manifests / str(next(counter))), repeat), ops=files
+    )
+
+
+def _bench_policy(report: BenchReport, repo: Path, paths: List[Path]) -> None:
+    diff_text = synthetic_diff(report.shape)
+    relative = [path.relative_to(repo) for path in paths]
+    report.results["policy"] = BenchResult(
+        "policy", *measure(lambda: evaluate_policy(relative, diff_text, safe_mode=True), report.repeat), ops=len(paths)
+    )
+
+
+def _bench_orchestrator(report: BenchReport, repo: Path, paths: List[Path]) -> None:
+    counter = iter(range(10**6))
+
+    def run() -> None:
+        index = next(counter)
+        task = Task(task_id=f"bench-{index}", title="bench", description="benchmark run", created_at=now_iso())
+        context = RunContext(
+            run_id=f"run-bench-{index}",
+            task=task,
+            repo_root=repo,
+            run_dir=Path("runs") / f"run-bench-{index}",
+            mode="fast",
+            safe_mode=True,
+            fast_mode=True,
+            dry_run=True,
+        )
+        Orchestrator(context).run()
+
+    report.results["orchestrator"] = BenchResult("orchestrator", *measure(run, report.repeat))
+
+
+def _bench_queue(report: BenchReport, repo: Path, paths: List[Path]) -> None:
+    count = report.shape.tasks
+    items = [(f"task {index}", "benchmark task", "normal") for index in range(count)]
+
+    def drain() -> None:
+        while True:
+            task = storage.claim_task("bench")
+            if task is None:
+                return
+            storage.complete_task(task.task_id, "bench")
+
+    report.results["queue_add"] = BenchResult(
+        "queue_add", *measure(lambda: storage.add_tasks(items), report.repeat, setup=drain), ops=count
+    )
+    report.results["queue_pop"] = BenchResult(
+        "queue_pop", *measure(drain, report.repeat, setup=lambda: storage.add_tasks(items)), ops=count
+    )
+
+
+def _bench_api(report: BenchReport, repo: Path, paths: List[Path]) -> None:
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError as exc:  # TestClient needs httpx, which ships with the test extra
+        report.skipped["api_create_task"] = f"{exc.name or 'httpx'} not installed"
+        return
+    from warforge.api import app
+
+    count = report.shape.tasks
+    client = TestClient(app)
+
+    def create() -> None:
+        for index in range(count):
+            client.post("/tasks", json={"title": f"task {index}", "description": "benchmark task"})
+
+    report.results["api_create_task"] = BenchResult("api_create_task", *measure(create, report.repeat), ops=count)
+
+
+BENCHMARKS: Dict[str, Callable[[BenchReport, Path, List[Path]], None]] = {
+    "repo": _bench_repo,
+    "policy": _bench_policy,
+    "orchestrator": _bench_orchestrator,
+    "queue": _bench_queue,
+    "api": _bench_api,
+}
+
+
+def run_bench(shape: RepoShape, repeat: int = 3, only: Optional[Sequence[str]] = None) -> BenchReport:
+    """Generate a repo of ``shape`` in a temp dir and time each benchmark group on it."""
+    unknown = set(only or ()) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark {sorted(unknown)[0]!r}; expected one of {', '.join(BENCHMARKS)}")
+    report = BenchReport(shape=shape, repeat=repeat)
+    with _workspace() as workspace:
+        repo = workspace / "repo"
+        paths = generate_repo(repo, shape)
+        for name, bench in BENCHMARKS.items():
+            if not only or name in only:
+                bench(report, repo, paths)
+    return report
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_s: float = MIN_DELTA_S,
+) -> List[Regression]:
+    """Benchmarks slower than the baseline by more than ``threshold`` (a fraction) and ``min_delta_s``."""
+    if baseline.get("shape") != current.get("shape"):
+        raise ValueError("Baseline was recorded with a different repo shape; re-record it with --update-baseline")
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        baseline_s, current_s = previous["seconds"], result["seconds"]
+        if current_s > baseline_s * (1 + threshold) and current_s - baseline_s > min_delta_s:
+            regressions.append(Regression(name, baseline_s, current_s))
+    return regressions
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from warforge.core import write_text
+
+
+def stable_hash(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class JsonStore:
+    """Content-addressed JSON files under one directory, bounded by total size.
+
+    Entries are one file per key, written atomically; reads bump the mtime so
+    eviction drops the least recently used entries first.
+    """
+
+    version = 1
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            payload = json.loads(path.read_text())
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if payload.get("version") != self.version:
+            return None
+        return payload
+
+    def write(self, key: str, payload: Dict[str, Any]) -> None:
+        write_text(self._path(key), json.dumps({"version": self.version, **payload}, default=str))
+        self.evict()
+
+    def evict(self) -> int:
+        if not self.cache_dir.exists():
+            return 0
+        entries = []
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -1,39 +1,68 @@
 from __future__ import annotations
 
 import json
-import subprocess
 import sys
-from shutil import which
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 import typer
 
 from warforge.config import load_config, save_config
-from warforge.core import RunContext, Task, ensure_dir, now_iso, write_json, build_repo_map
-from warforge.orchestrator import Orchestrator
-from warforge.policy import evaluate_policy
-from warforge.receipts import render_receipt, write_receipt
-from warforge.storage import add_task, get_task, pop_next_task
-from warforge.verification import detect_verification_commands, run_commands
+from warforge.core import ensure_dir, load_json, now_iso, parse_since, write_json
+from warforge.storage import (
+    DEFAULT_LEASE_S,
+    PRIORITIES,
+    add_task,
+    add_tasks,
+    claim_task,
+    complete_task,
+    get_task,
+    flush_metrics,
+    list_runs,
+    load_metrics,
+    queue_depth,
+    release_task,
+)
+from warforge.telemetry import (
+    AGENT_SECONDS,
+    CACHE_REQUESTS,
+    QUEUE_WAIT_SECONDS,
+    RUN_SECONDS,
+    SNAPSHOT_BYTES_READ,
+    SNAPSHOT_FILES,
+    SNAPSHOT_FILES_HASHED,
+    STAGE_SECONDS,
+    VERIFY_SECONDS,
+    counter_totals,
+    histogram_summary,
+    render,
+)
+
+# Only the queue, config and telemetry modules load with the CLI. Commands import
+# the pipeline (runner, orchestrator and agents, verification, bench) when they run,
+# so `warforge --help` and `warforge queue add` from hooks stay fast.
+# tests/test_cli_startup.py enforces this.
 
 app = typer.Typer(add_completion=False)
 queue_app = typer.Typer()
 bot_app = typer.Typer()
 agent_app = typer.Typer()
 workflow_app = typer.Typer()
+runs_app = typer.Typer()
 
 app.add_typer(queue_app, name="queue")
 app.add_typer(bot_app, name="bot")
 app.add_typer(agent_app, name="agent")
 app.add_typer(workflow_app, name="workflow")
-
-RUNS_DIR = Path("runs")
+app.add_typer(runs_app, name="runs")
 
 
 @app.command()
 def doctor() -> None:
     """Verify environment and dependencies."""
+    from shutil import which
+
     missing = []
     if sys.version_info < (3, 10):
         missing.append("python>=3.10")
@@ -48,161 +77,258 @@ def doctor() -> None:
 @app.command()
 def ingest(repo: Optional[str] = None) -> None:
     """Create a repo index."""
+    from warforge.snapshot import build_snapshot
+
     root = Path(repo) if repo else Path.cwd()
-    stack = "unknown"
-    if (root / "pyproject.toml").exists():
-        stack = "python"
-    if (root / "package.json").exists():
-        stack = "node"
-    repo_map = build_repo_map(root)
-    commands = [" ".join(command) for command in detect_verification_commands(root)]
+    snapshot = build_snapshot(root)
     index = {
         "repo_root": str(root),
         "indexed_at": now_iso(),
-        "stack": stack,
-        "verification_commands": commands,
+        "stack": snapshot.stack,
+        "fingerprint": snapshot.fingerprint,
+        "verification_commands": [" ".join(command) for command in snapshot.verification_commands],
     }
     write_json(Path(".warforge") / "repo_index.json", index)
-    write_json(Path(".warforge") / "repo_map.json", repo_map)
+    write_json(Path(".warforge") / "repo_map.json", snapshot.repo_map())
     typer.echo("Repo ingested")
 
 
 @queue_app.command("add")
-def queue_add(task: str) -> None:
+def queue_add(
+    task: Optional[str] = typer.Argument(None),
+    priority: str = typer.Option("normal", "--priority", "-p", help="high|normal|low"),
+    from_file: Optional[Path] = typer.Option(
+        None, "--from-file", help="JSONL file of tasks: strings or {title, description, priority} objects."
+    ),
+) -> None:
     """Add a task to the queue."""
-    new_task = add_task(task, task)
+    if priority not in PRIORITIES:
+        typer.echo(f"Unknown priority: {priority}")
+        raise typer.Exit(code=1)
+    if from_file is not None:
+        items = []
+        for line_number, line in enumerate(from_file.read_text().splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as exc:
+                typer.echo(f"{from_file}:{line_number}: invalid JSON: {exc}")
+                raise typer.Exit(code=1)
+            if isinstance(entry, str):
+                entry = {"title": entry}
+            if not isinstance(entry, dict):
+                typer.echo(f"{from_file}:{line_number}: expected a string or an object")
+                raise typer.Exit(code=1)
+            if "title" not in entry:
+                typer.echo(f"{from_file}:{line_number}: missing title")
+                raise typer.Exit(code=1)
+            items.append(
+                (entry["title"], entry.get("description", entry["title"]), entry.get("priority", priority))
+            )
+        try:
+            tasks = add_tasks(items)
+        except ValueError as exc:
+            typer.echo(str(exc))
+            raise typer.Exit(code=1)
+        typer.echo(f"Queued {len(tasks)} task(s)")
+        return
+    if task is None:
+        typer.echo("Provide a task or --from-file")
+        raise typer.Exit(code=1)
+    new_task = add_task(task, task, priority=priority)
     typer.echo(f"Queued {new_task.task_id}")
 
 
+def _format_event(event) -> Optional[str]:
+    """One line of live output for a run event (tokens are written inline by the caller)."""
+    data = event.data
+    prefix = f"[{event.stage}]" if event.stage else "[run]"
+    if event.type == "run":
+        return f"{prefix} {data.get('title')}" if data.get("status") == "running" else None
+    if event.type == "stage":
+        status = data.get("status")
+        if status == "started":
+            return f"{prefix} started: {', '.join(data.get('agents', []))}"
+        if status == "cached":
+            return f"{prefix} replayed from {data.get('source')}"
+        if status == "failed":
+            return f"{prefix} gate failed at {event.agent}: {data.get('reason')}"
+        return f"{prefix} finished in {data.get('duration_ms')} ms"
+    if event.type == "agent":
+        return f"{prefix} {event.agent} done in {data.get('duration_ms')} ms"
+    subject = f"{event.agent}: " if event.agent else ""
+    details = data.get("message") or " ".join(f"{key}={value}" for key, value in data.items())
+    return f"{prefix} {subject}{details}"
+
+
+def _follow_run(task, **options):
+    """Run ``task`` on a background thread and print its events as they arrive."""
+    import threading
+
+    from warforge.events import EVENTS_FILE, EventStream
+    from warforge.runner import RUNS_DIR, execute_task
+
+    run_id = f"run-{task.task_id}"
+    events = EventStream(run_id, path=RUNS_DIR / run_id / EVENTS_FILE)
+    cancel_event = threading.Event()
+    result: Dict[str, object] = {}
+
+    def target() -> None:
+        try:
+            result["outcome"] = execute_task(task, cancel_event=cancel_event, events=events, **options)
+        except BaseException as exc:  # noqa: BLE001 - re-raised on the main thread
+            result["error"] = exc
+            events.close()
+
+    thread = threading.Thread(target=target, name="warforge-run", daemon=True)
+    thread.start()
+    inline = False
+    try:
+        for event in events.subscribe(heartbeat_s=None):
+            if event.type == "token":
+                typer.echo(event.data.get("text", ""), nl=False)
+                inline = True
+                continue
+            line = _format_event(event)
+            if line is not None:
+                if inline:
+                    typer.echo()
+                    inline = False
+                typer.echo(line)
+    except KeyboardInterrupt:
+        cancel_event.set()
+        thread.join()
+        raise
+    thread.join()
+    if inline:
+        typer.echo()
+    if "error" in result:
+        raise result["error"]
+    return result["outcome"]
+
+
 @app.command("run")
 def run_task(
     task_id: str = typer.Argument("next"),
     dry_run: bool = typer.Option(False, "--dry-run", help="Plan only, no verification commands."),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Recompute stages and verification even if cached."),
+    resume: bool = typer.Option(False, "--resume", help="Skip stages this run already completed."),
+    shards: Optional[int] = typer.Option(None, "--shards", min=1, help="Split pytest over N processes (fast mode)."),
+    follow: bool = typer.Option(False, "--follow", "-f", help="Print stage progress and agent tokens live."),
 ) -> None:
     """Run a task by id or run the next task in queue."""
-    config = load_config()
+    _run_task(task_id, dry_run=dry_run, no_cache=no_cache, resume=resume, shards=shards, follow=follow)
+
+
+def _run_task(
+    task_id: str,
+    dry_run: bool = False,
+    no_cache: bool = False,
+    resume: bool = False,
+    shards: Optional[int] = None,
+    follow: bool = False,
+) -> None:
+    # Plain defaults: commands call this rather than ``run_task``, whose defaults are typer OptionInfo objects.
+    from warforge.runner import execute_task
+    from warforge.worker import worker_id
+
+    owner = f"cli-{worker_id()}"
     if task_id == "next":
-        task = pop_next_task()
+        task = claim_task(owner)
     else:
         task = get_task(task_id) if task_id else None
     if not task:
         typer.echo("No task found")
         raise typer.Exit(code=1)
-    run_id = f"run-{task.task_id}"
-    run_dir = RUNS_DIR / run_id
-    ensure_dir(run_dir)
-    write_json(run_dir / "task.json", {
-        "task_id": task.task_id,
-        "title": task.title,
-        "description": task.description,
-        "created_at": task.created_at,
-    })
-
-    context = RunContext(
-        run_id=run_id,
-        task=Task(task_id=task.task_id, title=task.title, description=task.description, created_at=task.created_at),
-        repo_root=Path.cwd(),
-        run_dir=run_dir,
-        mode="fast" if config.fast_mode else "safe",
-        safe_mode=config.safe_mode,
-        fast_mode=config.fast_mode,
-        dry_run=dry_run or config.dry_run,
-    )
-    orchestrator = Orchestrator(context)
-    payload = orchestrator.run()
-    orchestrator.write_artifacts(payload)
-
-    verification_commands = detect_verification_commands(context.repo_root)
-    test_results = []
-    if context.dry_run:
-        test_results = []
-    else:
-        test_results = run_commands(verification_commands, parallel=context.fast_mode)
-
-    diff_paths = []
-    diff_text = ""
-    git_root = context.repo_root
-    if (git_root / ".git").exists():
-        diff_paths = (
-            subprocess.run(["git", "diff", "--name-only"], capture_output=True, text=True, check=False)
-            .stdout.strip()
-            .splitlines()
-        )
-        diff_text = subprocess.run(["git", "diff"], capture_output=True, text=True, check=False).stdout
-    policy = evaluate_policy([Path(path) for path in diff_paths], diff_text, context.safe_mode)
-    payload["policy"] = {
-        "restricted_zones": policy.restricted_zones,
-        "requires_approval": policy.requires_approval,
-    }
-    write_json(run_dir / "risk_report.json", payload["policy"])
+    try:
+        options = {"dry_run": dry_run, "use_cache": not no_cache, "shards": shards, "resume": resume}
+        outcome = _follow_run(task, **options) if follow else execute_task(task, **options)
+    except BaseException:
+        if task_id == "next":
+            release_task(task.task_id, owner)
+        raise
+    if task_id == "next":
+        complete_task(task.task_id, owner, state="done" if outcome.exit_code == 0 else "failed")
+    typer.echo(outcome.message)
+    if outcome.exit_code:
+        raise typer.Exit(code=outcome.exit_code)
 
-    if context.dry_run:
-        test_summary = [f\"dry-run: {' '.join(command)}\" for command in verification_commands]
-    else:
-        test_summary = [f\"{' '.join(result.command)} => {result.returncode}\" for result in test_results]
-
-    receipt = render_receipt(
-        run_id=run_id,
-        task_title=task.title,
-        files_touched=[],
-        commands=["warforge run"],
-        tests=test_summary,
-        test_outputs=[result.output for result in test_results] if test_results else [],
-        evals=[payload["verification"]["eval_quality"]],
-        risks=payload["policy"]["restricted_zones"],
-    )
-    write_receipt(run_dir, receipt)
-    commands_log = ["warforge run"]
-    for result in test_results:
-        commands_log.append(f"$ {' '.join(result.command)}")
-        commands_log.append(result.output)
-    (run_dir / "commands.log").write_text("\n".join(commands_log))
-    write_json(run_dir / "patch_summary.json", {"files": diff_paths})
-    failed = any(result.returncode != 0 for result in test_results)
-    write_json(
-        run_dir / "test_report.json",
-        {
-            "commands": [" ".join(command) for command in verification_commands],
-            "results": [
-                {"command": " ".join(result.command), "returncode": result.returncode, "duration_ms": result.duration_ms}
-                for result in test_results
-            ],
-            "status": "failed" if failed else "passed",
-        },
-    )
 
-    if failed and not context.dry_run:
-        typer.echo(f"Verification failed for run: {run_id}")
-        raise typer.Exit(code=1)
+@app.command()
+def worker(
+    concurrency: int = typer.Option(1, "--concurrency", "-c", min=1, help="Tasks to run in parallel."),
+    lease_seconds: float = typer.Option(DEFAULT_LEASE_S, "--lease-seconds", help="Lease length before re-delivery."),
+    drain: bool = typer.Option(False, "--drain", help="Exit once the queue is empty."),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Plan only, no verification commands."),
+) -> None:
+    """Consume the task queue with leased, parallel workers."""
+    from warforge.worker import run_worker
+
+    processed = run_worker(
+        concurrency=concurrency,
+        lease_s=lease_seconds,
+        drain=drain,
+        dry_run=dry_run,
+        on_outcome=lambda task, outcome: typer.echo(outcome.message),
+    )
+    typer.echo(f"Worker processed {processed} task(s)")
 
-    if payload["policy"]["requires_approval"] and not (run_dir / "approval.json").exists():
-        write_json(
-            run_dir / "approval_request.json",
-            {
-                "run_id": run_id,
-                "restricted_zones": payload["policy"]["restricted_zones"],
-                "status": "required",
-                "message": "Approval required before proceeding with restricted changes.",
-            },
-        )
-        typer.echo(f"Approval required for run: {run_id}")
-        raise typer.Exit(code=2)
 
-    typer.echo(f"Run complete: {run_id}")
+@app.command()
+def verify(
+    repo: Optional[str] = None,
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-w", min=1, help="Commands to run concurrently [default: verify_workers from config]."
+    ),
+    timeout: Optional[float] = typer.Option(
+        None, "--timeout", help="Per-command timeout in seconds [default: verify_timeout_s from config]."
+    ),
+    total_timeout: Optional[float] = typer.Option(
+        None, "--total-timeout", help="Timeout for the whole suite in seconds [default: verify_total_timeout_s]."
+    ),
+    fail_fast: Optional[bool] = typer.Option(
+        None, "--fail-fast/--no-fail-fast", help="Kill remaining commands on the first failure [default: config]."
+    ),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Re-run commands even if cached results match."),
+    shards: Optional[int] = typer.Option(
+        None, "--shards", min=1, help="Split pytest over N duration-balanced processes [default: verify_shards]."
+    ),
+) -> None:
+    """Run verification suite; options left unset come from the saved config."""
+    from functools import partial
 
+    from warforge.manifest import fingerprint_repo
+    from warforge.sharding import run_with_shards
+    from warforge.verification import detect_verification_commands
+    from warforge.verification_cache import VerificationCache, run_cached_commands
 
-@app.command()
-def verify(repo: Optional[str] = None) -> None:
-    """Run verification suite."""
+    config = load_config()
     root = Path(repo) if repo else Path.cwd()
     commands = detect_verification_commands(root)
     if not commands:
         typer.echo("No verification commands detected")
         raise typer.Exit(code=1)
-    results = run_commands(commands, parallel=False)
+    results, _ = run_cached_commands(
+        commands,
+        fingerprint_repo(root).repo_hash,
+        cache=None if no_cache else VerificationCache(),
+        execute=partial(run_with_shards, shards=shards or config.verify_shards, repo_key=str(root.resolve())),
+        max_workers=workers or config.verify_workers,
+        timeout_s=config.verify_timeout_s if timeout is None else timeout,
+        total_timeout_s=config.verify_total_timeout_s if total_timeout is None else total_timeout,
+        fail_fast=config.fail_fast if fail_fast is None else fail_fast,
+        cwd=root,
+    )
     for result in results:
-        typer.echo(f"{' '.join(result.command)} => {result.returncode}")
-    if any(result.returncode != 0 for result in results):
+        source = "cached" if result.cached else f"{result.duration_ms} ms"
+        typer.echo(f"{' '.join(result.command)} => {result.returncode} ({result.status}, {source})")
+        for shard in result.shards or []:
+            typer.echo(
+                f"  shard {shard['index']}: {shard['tests']} tests, {shard['duration_ms']} ms "
+                f"(predicted {shard['predicted_ms']} ms) => {shard['returncode']}"
+            )
+    if any(result.status != "passed" for result in results):
         raise typer.Exit(code=1)
 
 
@@ -236,21 +362,221 @@ def dry_run(state: str = typer.Argument(..., help="on|off")) -> None:
 @app.command()
 def receipt(run_id: str) -> None:
     """Print receipt for run."""
-    receipt_path = RUNS_DIR / run_id / "receipt.md"
-    typer.echo(receipt_path.read_text())
+    from warforge.run_record import read_artifact
+    from warforge.runner import RUNS_DIR
+
+    content = read_artifact(RUNS_DIR / run_id, "receipt.md")
+    if content is None:
+        typer.echo(f"No receipt for run {run_id}")
+        raise typer.Exit(code=1)
+    typer.echo(content.decode("utf-8", errors="replace"))
 
 
 @app.command()
 def pr(run_id: str) -> None:
     """Generate PR info for run."""
-    run_dir = RUNS_DIR / run_id
+    from warforge.run_record import read_artifact
+    from warforge.runner import RUNS_DIR
+
+    content = read_artifact(RUNS_DIR / run_id, "receipt.md")
     summary = {
         "title": f"Warforge run {run_id}",
-        "body": (run_dir / "receipt.md").read_text() if (run_dir / "receipt.md").exists() else "",
+        "body": content.decode("utf-8", errors="replace") if content is not None else "",
     }
     typer.echo(json.dumps(summary, indent=2))
 
 
+def _format_seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+@app.command()
+def stats(
+    openmetrics: bool = typer.Option(False, "--openmetrics", help="Print the raw OpenMetrics exposition instead."),
+) -> None:
+    """Show latency percentiles, cache hit ratios and I/O totals across recorded runs."""
+    flush_metrics()
+    series = load_metrics()
+    if openmetrics:
+        gauges = {"warforge_queue_depth": ("Tasks waiting in the queue.", queue_depth())}
+        typer.echo(render(series, gauges=gauges), nl=False)
+        return
+    typer.echo(f"queue depth: {queue_depth()}")
+    for title, metric, label_names in (
+        ("runs", RUN_SECONDS, ("status",)),
+        ("stages", STAGE_SECONDS, ("stage", "source")),
+        ("agents", AGENT_SECONDS, ("stage", "agent")),
+        ("queue wait", QUEUE_WAIT_SECONDS, ("queue",)),
+        ("verification", VERIFY_SECONDS, ("status",)),
+    ):
+        rows = histogram_summary(series, metric)
+        if not rows:
+            continue
+        typer.echo(f"\n{title + ' (seconds)':<44} {'count':>7} {'p50':>8} {'p99':>8} {'mean':>8}")
+        for labels, count, p50, p99, mean in rows:
+            name = "/".join(labels[label] for label in label_names)
+            typer.echo(
+                f"  {name:<42} {int(count):>7} {_format_seconds(p50):>8} {_format_seconds(p99):>8} {mean:>8.3f}"
+            )
+    lookups: Dict[str, Dict[str, float]] = {}
+    for labels, total in counter_totals(series, CACHE_REQUESTS):
+        lookups.setdefault(labels["cache"], {})[labels["result"]] = total
+    if lookups:
+        typer.echo("\ncaches")
+        for cache, results in sorted(lookups.items()):
+            hits, misses = results.get("hit", 0.0), results.get("miss", 0.0)
+            typer.echo(f"  {cache:<16} {int(hits)} hit / {int(misses)} miss ({hits / (hits + misses):.0%})")
+    io_totals = [
+        (label, sum(total for _, total in counter_totals(series, metric)))
+        for label, metric in (
+            ("files walked", SNAPSHOT_FILES),
+            ("files hashed", SNAPSHOT_FILES_HASHED),
+            ("bytes read", SNAPSHOT_BYTES_READ),
+        )
+    ]
+    if any(total for _, total in io_totals):
+        typer.echo("\nsnapshots")
+        for label, total in io_totals:
+            typer.echo(f"  {label:<16} {int(total)}")
+
+
+@app.command()
+def bench(
+    files: int = typer.Option(500, "--files", min=1, help="Files in the synthetic repo."),
+    depth: int = typer.Option(4, "--depth", min=1, help="Maximum directory depth."),
+    mean_size: int = typer.Option(2048, "--mean-size", min=16, help="Mean file size in bytes (log-normal)."),
+    restricted_density: float = typer.Option(
+        0.05, "--restricted-density", min=0.0, max=1.0, help="Share of directories under a restricted path."
+    ),
+    diff_kib: int = typer.Option(256, "--diff-kib", min=1, help="Size of the synthetic diff scanned by policy."),
+    tasks: int = typer.Option(500, "--tasks", min=1, help="Tasks for queue and API throughput."),
+    seed: int = typer.Option(7, "--seed"),
+    repeat: int = typer.Option(3, "--repeat", "-r", min=1, help="Runs per benchmark; the best is reported."),
+    only: Optional[List[str]] = typer.Option(None, "--only", help="Benchmark groups to run (repeatable)."),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write results as JSON."),
+    baseline: Optional[Path] = typer.Option(
+        None, "--baseline", help="Baseline results to compare against (default .warforge/bench/baseline.json)."
+    ),
+    update_baseline: bool = typer.Option(False, "--update-baseline", help="Store these results as the baseline."),
+    threshold: Optional[float] = typer.Option(
+        None, "--threshold", min=0.0, help="Fail when a benchmark is this fraction slower (default 0.25)."
+    ),
+) -> None:
+    """Time ingest, hashing, orchestration, policy, queue and API on a synthetic repo."""
+    from warforge.bench import BASELINE_PATH, DEFAULT_THRESHOLD, RepoShape, compare, run_bench
+
+    threshold = DEFAULT_THRESHOLD if threshold is None else threshold
+    shape = RepoShape(
+        files=files,
+        depth=depth,
+        mean_size=mean_size,
+        restricted_density=restricted_density,
+        diff_kib=diff_kib,
+        tasks=tasks,
+        seed=seed,
+    )
+    baseline = (baseline or BASELINE_PATH).resolve()
+    try:
+        report = run_bench(shape, repeat=repeat, only=only)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--only")
+    results = report.as_dict()
+    if output:
+        write_json(output, results)
+    recorded = {} if update_baseline else load_json(baseline)
+    regressions, mismatch = [], None
+    if recorded:
+        try:
+            regressions = compare(results, recorded, threshold=threshold)
+        except ValueError as exc:
+            recorded, mismatch = {}, str(exc)
+    previous = recorded.get("results", {})
+    typer.echo(f"{'benchmark':<18} {'best ms':>10} {'median ms':>10} {'ops/s':>12} {'baseline ms':>12} {'change':>8}")
+    for name, result in report.results.items():
+        base = previous.get(name, {}).get("seconds")
+        change = f"{(result.seconds / base - 1):+.0%}" if base else "-"
+        typer.echo(
+            f"{name:<18} {result.seconds * 1000:>10.2f} {result.median_s * 1000:>10.2f} {result.ops_per_s:>12.0f} "
+            f"{(f'{base * 1000:.2f}' if base else '-'):>12} {change:>8}"
+        )
+    for name, reason in report.skipped.items():
+        typer.echo(f"{name:<18} skipped: {reason}")
+    if update_baseline:
+        write_json(baseline, results)
+        typer.echo(f"Baseline written to {baseline}")
+        return
+    if mismatch:
+        typer.echo(mismatch)
+        raise typer.Exit(code=2)
+    if not recorded:
+        typer.echo(f"No baseline at {baseline}; record one with --update-baseline")
+        return
+    if regressions:
+        for regression in regressions:
+            typer.echo(
+                f"REGRESSION {regression.name}: {regression.baseline_s * 1000:.2f} ms -> "
+                f"{regression.current_s * 1000:.2f} ms ({regression.ratio:.2f}x)"
+            )
+        raise typer.Exit(code=1)
+    typer.echo(f"No regressions beyond {threshold:.0%}")
+
+
+@runs_app.command("list")
+def runs_list(
+    status: Optional[str] = typer.Option(None, "--status", help="Only runs with this status; failed matches every unsuccessful outcome."),
+    since: Optional[str] = typer.Option(None, "--since", help="Only runs finished within an age (1d, 6h) or after a timestamp."),
+    slowest: Optional[int] = typer.Option(None, "--slowest", min=1, help="Show the N slowest runs instead of the newest."),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Maximum runs to show."),
+) -> None:
+    """List recorded runs from the run history index."""
+    try:
+        since_ts = parse_since(since) if since else None
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--since")
+    runs, _ = list_runs(
+        status=status,
+        since=since_ts,
+        order="slowest" if slowest else "recent",
+        limit=slowest or limit,
+    )
+    if not runs:
+        typer.echo("No runs recorded")
+        return
+    for run in runs:
+        finished = datetime.fromtimestamp(run.finished_at, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        tests = f"{run.tests_passed} passed, {run.tests_failed} failed" if run.tests_status else "no tests"
+        zones = f" zones={','.join(run.restricted_zones)}" if run.restricted_zones else ""
+        cached = " cached" if run.cache_hit else ""
+        typer.echo(
+            f"{run.run_id}  {run.status:<19} {run.total_duration_ms / 1000:>8.2f}s  {finished}Z  {tests}{zones}{cached}"
+        )
+
+
+@runs_app.command("reindex")
+def runs_reindex() -> None:
+    """Backfill the run history index from run directories on disk."""
+    from warforge.runner import RUNS_DIR, reindex_runs
+
+    typer.echo(f"Indexed {reindex_runs(RUNS_DIR)} runs")
+
+
+@runs_app.command("export")
+def runs_export(
+    run_id: str,
+    out: Optional[Path] = typer.Option(None, "--out", "-o", help="Directory to write files to (default: the run dir)"),
+) -> None:
+    """Expand a run record back into one file per artifact."""
+    from warforge.run_record import export_record
+    from warforge.runner import RUNS_DIR
+
+    written = export_record(RUNS_DIR / run_id, out)
+    if not written:
+        typer.echo(f"No run record for run {run_id}")
+        raise typer.Exit(code=1)
+    for path in written:
+        typer.echo(str(path))
+
+
 @bot_app.command("new")
 def bot_new(template: str) -> None:
     """Scaffold a bot template."""
@@ -283,4 +609,4 @@ def run_demo() -> None:
     """Run a demo pipeline."""
     ingest()
     demo_task = add_task("demo", "demo pipeline run")
-    run_task(task_id=demo_task.task_id)
+    _run_task(demo_task.task_id)
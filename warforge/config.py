@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 
 CONFIG_DIR = Path(".warforge")
@@ -14,6 +15,13 @@ class WarforgeConfig:
     fast_mode: bool = True
     safe_mode: bool = True
     dry_run: bool = False
+    verify_workers: int = 4
+    verify_timeout_s: Optional[float] = None
+    verify_total_timeout_s: Optional[float] = None
+    fail_fast: bool = False
+    test_selection: bool = True
+    verify_shards: int = 1
+    run_record: bool = False
 
 
 def load_config() -> WarforgeConfig:
@@ -24,6 +32,13 @@ def load_config() -> WarforgeConfig:
         fast_mode=payload.get("fast_mode", True),
         safe_mode=payload.get("safe_mode", True),
         dry_run=payload.get("dry_run", False),
+        verify_workers=payload.get("verify_workers", 4),
+        verify_timeout_s=payload.get("verify_timeout_s"),
+        verify_total_timeout_s=payload.get("verify_total_timeout_s"),
+        fail_fast=payload.get("fail_fast", False),
+        test_selection=payload.get("test_selection", True),
+        verify_shards=payload.get("verify_shards", 1),
+        run_record=payload.get("run_record", False),
     )
 
 
@@ -35,6 +50,13 @@ def save_config(config: WarforgeConfig) -> None:
                 "fast_mode": config.fast_mode,
                 "safe_mode": config.safe_mode,
                 "dry_run": config.dry_run,
+                "verify_workers": config.verify_workers,
+                "verify_timeout_s": config.verify_timeout_s,
+                "verify_total_timeout_s": config.verify_total_timeout_s,
+                "fail_fast": config.fail_fast,
+                "test_selection": config.test_selection,
+                "verify_shards": config.verify_shards,
+                "run_record": config.run_record,
             },
             indent=2,
         )
@@ -3,11 +3,14 @@ from __future__ import annotations
 import hashlib
 import json
 import os
+import threading
 import time
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from warforge.walker import iter_repo_files
 
 
 @dataclass(frozen=True)
@@ -34,18 +37,44 @@ def now_iso() -> str:
     return datetime.utcnow().isoformat() + "Z"
 
 
+AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_since(value: str, now: Optional[float] = None) -> float:
+    """Epoch seconds for a relative age (``30m``, ``6h``, ``1d``, ``2w``) or an ISO timestamp."""
+    value = value.strip()
+    unit = AGE_UNITS.get(value[-1:].lower())
+    if unit is not None and value[:-1].replace(".", "", 1).isdigit():
+        return (time.time() if now is None else now) - float(value[:-1]) * unit
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid time {value!r}; use an age like 1d or 6h, or an ISO timestamp") from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
 def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
 def write_json(path: Path, payload: Dict[str, Any]) -> None:
-    ensure_dir(path.parent)
-    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+    write_text(path, json.dumps(payload, indent=2, sort_keys=True))
 
 
 def write_text(path: Path, content: str) -> None:
-    ensure_dir(path.parent)
-    path.write_text(content)
+    """Write atomically (temp file + rename) so readers never see a partial file.
+
+    The parent directory is only created when the first attempt finds it missing.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_text(content)
+    except FileNotFoundError:
+        ensure_dir(path.parent)
+        tmp_path.write_text(content)
+    os.replace(tmp_path, path)
 
 
 def hash_files(paths: Iterable[Path]) -> str:
@@ -70,21 +99,25 @@ def human_duration_ms(start_ms: float, end_ms: float) -> float:
     return round(end_ms - start_ms, 2)
 
 
-def repo_files(repo_root: Path) -> Iterable[Path]:
-    for root, _, files in os.walk(repo_root):
-        if "/.git/" in root:
-            continue
-        for file in files:
-            yield Path(root) / file
+def repo_files(repo_root: Path) -> Iterator[Path]:
+    return iter_repo_files(repo_root)
 
 
-def build_repo_map(repo_root: Path) -> Dict[str, Any]:
-    files = [str(path.relative_to(repo_root)) for path in repo_files(repo_root)]
-    entry_points = [path for path in files if path.endswith(("pyproject.toml", "package.json", "README.md"))]
-    workflows = [path for path in files if path.startswith(".github/workflows/")]
+def build_repo_map(repo_root: Path, limit: int = 200) -> Dict[str, Any]:
+    files: List[str] = []
+    entry_points: List[str] = []
+    workflows: List[str] = []
+    for path in repo_files(repo_root):
+        rel_path = path.relative_to(repo_root).as_posix()
+        if len(files) < limit:
+            files.append(rel_path)
+        if rel_path.endswith(("pyproject.toml", "package.json", "README.md")):
+            entry_points.append(rel_path)
+        if rel_path.startswith(".github/workflows/"):
+            workflows.append(rel_path)
     return {
         "repo_root": str(repo_root),
-        "files": files[:200],
+        "files": files,
         "entry_points": entry_points,
         "workflows": workflows,
     }
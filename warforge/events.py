@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Deque, Dict, IO, Iterator, List, Optional, Tuple
+
+from warforge.core import ensure_dir
+
+
+EVENTS_FILE = "events.jsonl"
+# Events kept in memory so reconnecting clients can resume without reading the log.
+EVENT_HISTORY = 4096
+# Events queued per subscriber before emitters start waiting on it.
+SUBSCRIBER_BUFFER = 256
+# How long an emitter waits on a full subscriber before leaving it to catch up from history.
+EMIT_TIMEOUT_S = 1.0
+# How often a waiting emitter re-checks a full subscriber queue.
+BACKPRESSURE_POLL_S = 0.005
+HEARTBEAT_S = 15.0
+
+_CLOSED = object()
+
+
+@dataclass
+class RunEvent:
+    id: int
+    type: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    stage: Optional[str] = None
+    agent: Optional[str] = None
+    ts: float = field(default_factory=time.time)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, "data": self.data, "stage": self.stage, "agent": self.agent, "ts": self.ts}
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.as_dict(), default=str)}\n\n"
+
+
+def read_events(path: Path, after: int = 0) -> Iterator[RunEvent]:
+    """Events recorded in an ``events.jsonl`` log with ids above ``after``; a torn last line is skipped."""
+    try:
+        handle = path.open()
+    except OSError:
+        return
+    with handle:
+        for line in handle:
+            try:
+                event = RunEvent(**json.loads(line))
+            except (TypeError, ValueError):
+                continue
+            if event.id > after:
+                yield event
+
+
+class _Subscriber:
+    def __init__(self, buffer: int, wake: Optional[Callable[[], None]] = None):
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=buffer)
+        # Set when an emitter gave up waiting; the reader re-attaches from history once drained.
+        self.lagged = False
+        # Called after each put; lets an asyncio reader wait on its loop instead of on the queue.
+        self.wake = wake
+
+
+class EventStream:
+    """Ordered, resumable events of one run: tokens, progress, partial results and stage changes.
+
+    Events get increasing ids and go to the in-memory history, to ``path`` (an
+    append-only JSON-lines log, when given) and to every subscriber's bounded
+    queue. A subscriber whose queue is full makes emitters wait up to
+    ``emit_timeout_s`` for it to catch up. That is the backpressure agents see.
+    After the wait the subscriber is detached instead of stalling the run, and
+    its reader replays what it missed from the history (or the log) before
+    following live events again. No reader loses events.
+
+    The wait happens before any lock is taken, so an emit with ``block=False``
+    (what the orchestrator uses on the event loop) never queues up behind an
+    agent thread that is waiting on a slow reader.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        path: Optional[Path] = None,
+        history: int = EVENT_HISTORY,
+        buffer: int = SUBSCRIBER_BUFFER,
+        emit_timeout_s: float = EMIT_TIMEOUT_S,
+    ):
+        self.run_id = run_id
+        self.path = path
+        self.buffer = buffer
+        self.emit_timeout_s = emit_timeout_s
+        self._history: Deque[RunEvent] = deque(maxlen=history)
+        self._subscribers: List[_Subscriber] = []
+        self._next_id = 1
+        self._closed = False
+        self._log: Optional[IO[str]] = None
+        # Held while an event gets its id and is queued, so every subscriber sees ids in order.
+        self._state = threading.Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    def _append_log(self, event: RunEvent) -> None:
+        if self.path is None:
+            return
+        if self._log is None:
+            ensure_dir(self.path.parent)
+            # A re-run of the same run id starts a fresh log; ids restart at 1.
+            self._log = self.path.open("w", buffering=1)
+        self._log.write(json.dumps(event.as_dict(), default=str) + "\n")
+
+    def _wait_for_room(self) -> None:
+        deadline = time.monotonic() + self.emit_timeout_s
+        with self._state:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            while subscriber.queue.full() and not subscriber.lagged and time.monotonic() < deadline:
+                time.sleep(BACKPRESSURE_POLL_S)
+
+    def _deliver(self, item: Any) -> None:
+        """Queue ``item`` for every subscriber without waiting; call with ``_state`` held."""
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(item)
+            except queue.Full:
+                subscriber.lagged = True
+                self._subscribers.remove(subscriber)
+            else:
+                if subscriber.wake is not None:
+                    subscriber.wake()
+
+    def emit(
+        self,
+        type: str,
+        data: Optional[Dict[str, Any]] = None,
+        stage: Optional[str] = None,
+        agent: Optional[str] = None,
+        block: bool = True,
+    ) -> Optional[RunEvent]:
+        """Record and publish one event; with ``block`` waits while a subscriber is behind (see class docs)."""
+        if block:
+            self._wait_for_room()
+        with self._state:
+            if self._closed:
+                return None
+            event = RunEvent(self._next_id, type, data or {}, stage, agent)
+            self._next_id += 1
+            self._history.append(event)
+            self._append_log(event)
+            self._deliver(event)
+        return event
+
+    def bind(self, stage: Optional[str] = None, agent: Optional[str] = None) -> "EventEmitter":
+        return EventEmitter(self, stage, agent)
+
+    def close(self) -> None:
+        with self._state:
+            if self._closed:
+                return
+            self._closed = True
+            if self._log is not None:
+                self._log.close()
+            # A reader whose queue is full drains it, finds itself lagged and sees the stream closed on re-attach.
+            self._deliver(_CLOSED)
+            self._subscribers = []
+
+    def _attach(
+        self, after: int, wake: Optional[Callable[[], None]] = None
+    ) -> Tuple[Optional[_Subscriber], List[RunEvent]]:
+        with self._state:
+            oldest = self._history[0].id if self._history else self._next_id
+            backlog = [event for event in self._history if event.id > after]
+            subscriber = None
+            if not self._closed:
+                subscriber = _Subscriber(self.buffer, wake)
+                self._subscribers.append(subscriber)
+        if after + 1 < oldest and self.path is not None:
+            # Older than the in-memory history: the log has it (already flushed line by line).
+            backlog = [event for event in read_events(self.path, after) if event.id < oldest] + backlog
+        return subscriber, backlog
+
+    def _detach(self, subscriber: _Subscriber) -> None:
+        with self._state:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def subscribe(self, after: int = 0, heartbeat_s: Optional[float] = HEARTBEAT_S) -> Iterator[Optional[RunEvent]]:
+        """Events with ids above ``after``, then live ones until the stream closes.
+
+        Yields ``None`` after ``heartbeat_s`` without an event so callers can send
+        keep-alives or notice a disconnected client.
+        """
+        last = after
+        while True:
+            subscriber, backlog = self._attach(last)
+            try:
+                for event in backlog:
+                    yield event
+                    last = event.id
+                if subscriber is None:
+                    return
+                while not (subscriber.lagged and subscriber.queue.empty()):
+                    try:
+                        item = subscriber.queue.get(timeout=heartbeat_s)
+                    except queue.Empty:
+                        yield None
+                        continue
+                    if item is _CLOSED:
+                        return
+                    if item.id > last:
+                        yield item
+                        last = item.id
+            finally:
+                if subscriber is not None:
+                    self._detach(subscriber)
+
+    async def asubscribe(
+        self, after: int = 0, heartbeat_s: Optional[float] = HEARTBEAT_S
+    ) -> AsyncIterator[Optional[RunEvent]]:
+        """``subscribe`` for asyncio readers: waits on the running loop instead of holding a thread."""
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # the reader's loop is gone
+
+        last = after
+        while True:
+            subscriber, backlog = self._attach(last, wake)
+            try:
+                for event in backlog:
+                    yield event
+                    last = event.id
+                if subscriber is None:
+                    return
+                while not (subscriber.lagged and subscriber.queue.empty()):
+                    try:
+                        item = subscriber.queue.get_nowait()
+                    except queue.Empty:
+                        ready.clear()
+                        if subscriber.queue.empty():
+                            try:
+                                await asyncio.wait_for(ready.wait(), heartbeat_s)
+                            except asyncio.TimeoutError:
+                                yield None
+                        continue
+                    if item is _CLOSED:
+                        return
+                    if item.id > last:
+                        yield item
+                        last = item.id
+            finally:
+                if subscriber is not None:
+                    self._detach(subscriber)
+
+
+class EventEmitter:
+    """``EventStream.emit`` with the stage and agent filled in; what agents hold while they run."""
+
+    def __init__(self, stream: EventStream, stage: Optional[str], agent: Optional[str]):
+        self.stream = stream
+        self.stage = stage
+        self.agent = agent
+
+    def __call__(self, type: str, data: Optional[Dict[str, Any]] = None) -> Optional[RunEvent]:
+        return self.stream.emit(type, data, stage=self.stage, agent=self.agent)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from warforge.core import write_text
+from warforge.manifest import MANIFEST_DIR
+
+
+GRAPH_VERSION = 2
+# Changes to these can affect any test, so they always trigger the full suite.
+FULL_SUITE_NAMES = (
+    "conftest.py",
+    "pyproject.toml",
+    "setup.py",
+    "setup.cfg",
+    "pytest.ini",
+    "tox.ini",
+    "noxfile.py",
+    "requirements.txt",
+    "poetry.lock",
+    "uv.lock",
+)
+# Changes that cannot affect Python test outcomes.
+INERT_SUFFIXES = (".md", ".rst", ".txt", ".png", ".jpg", ".svg")
+SOURCE_ROOTS = ("src/",)
+
+
+@dataclass
+class TestSelection:
+    mode: str
+    tests: List[str] = field(default_factory=list)
+    reasons: Dict[str, List[str]] = field(default_factory=dict)
+    fallback_reason: Optional[str] = None
+
+    __test__ = False
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "mode": self.mode,
+            "tests": self.tests,
+            "reasons": self.reasons,
+            "fallback_reason": self.fallback_reason,
+        }
+
+
+def is_test_file(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def module_names(path: str) -> List[str]:
+    """Importable names for a repo-relative ``.py`` path, including its ``src/``-stripped form."""
+    stem = path[:-3]
+    if stem.endswith("/__init__"):
+        stem = stem[: -len("/__init__")]
+    names = [stem.replace("/", ".")]
+    for root in SOURCE_ROOTS:
+        if path.startswith(root):
+            names.append(stem[len(root):].replace("/", "."))
+    return names
+
+
+def parse_imports(source: str, module: str, is_package: bool) -> Optional[List[str]]:
+    """Absolute names imported by a module; ``from pkg import name`` yields both ``pkg`` and ``pkg.name``.
+
+    Returns None when the source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    package = module if is_package else module.rpartition(".")[0]
+    imported: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = package.split(".") if package else []
+                base_parts = parts[: len(parts) - (node.level - 1)] if node.level > 1 else parts
+                base = ".".join(base_parts + ([node.module] if node.module else []))
+            else:
+                base = node.module or ""
+            if not base:
+                continue
+            imported.add(base)
+            imported.update(f"{base}.{alias.name}" for alias in node.names if alias.name != "*")
+    return sorted(imported)
+
+
+def graph_path(repo_root: Path, cache_dir: Path = MANIFEST_DIR) -> Path:
+    root_key = hashlib.sha1(str(repo_root.resolve()).encode()).hexdigest()[:12]
+    return cache_dir / f"imports-{root_key}.json"
+
+
+def build_import_graph(
+    repo_root: Path,
+    files: Iterable[str],
+    cache_dir: Path = MANIFEST_DIR,
+    unparsable: Optional[Set[str]] = None,
+) -> Dict[str, List[str]]:
+    """Map each Python file to the names it imports, re-parsing only files whose stat changed.
+
+    Files that fail to parse map to no imports and are added to ``unparsable`` when given.
+    """
+    path = graph_path(repo_root, cache_dir)
+    try:
+        payload = json.loads(path.read_text())
+        cached = payload["files"] if payload.get("version") == GRAPH_VERSION else {}
+    except (OSError, ValueError, KeyError):
+        cached = {}
+    entries: Dict[str, Dict[str, object]] = {}
+    dirty = False
+    for rel_path in files:
+        if not rel_path.endswith(".py"):
+            continue
+        try:
+            stat = os.stat(repo_root / rel_path)
+        except OSError:
+            continue
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        previous = cached.get(rel_path)
+        if previous and previous["stamp"] == stamp:
+            entries[rel_path] = previous
+            continue
+        source = (repo_root / rel_path).read_text(errors="replace")
+        module = module_names(rel_path)[0]
+        entries[rel_path] = {"stamp": stamp, "imports": parse_imports(source, module, rel_path.endswith("__init__.py"))}
+        dirty = True
+    if dirty or set(entries) != set(cached):
+        write_text(path, json.dumps({"version": GRAPH_VERSION, "files": entries}, separators=(",", ":")))
+    if unparsable is not None:
+        unparsable.update(rel_path for rel_path, entry in entries.items() if entry["imports"] is None)
+    return {rel_path: list(entry["imports"] or ()) for rel_path, entry in entries.items()}
+
+
+def _resolve(name: str, modules: Dict[str, str]) -> List[str]:
+    """Files executed by importing ``name``: the module itself plus every parent package."""
+    parts = name.split(".")
+    return [modules[prefix] for prefix in (".".join(parts[:i]) for i in range(1, len(parts) + 1)) if prefix in modules]
+
+
+def dependents(graph: Dict[str, List[str]]) -> Dict[str, Set[str]]:
+    modules: Dict[str, str] = {}
+    for rel_path in graph:
+        for name in module_names(rel_path):
+            modules.setdefault(name, rel_path)
+    reverse: Dict[str, Set[str]] = {}
+    for rel_path, imports in graph.items():
+        for name in imports:
+            for target in _resolve(name, modules):
+                if target != rel_path:
+                    reverse.setdefault(target, set()).add(rel_path)
+    return reverse
+
+
+def select_tests(
+    repo_root: Path,
+    files: Iterable[str],
+    changed: Iterable[str],
+    cache_dir: Path = MANIFEST_DIR,
+) -> TestSelection:
+    """Pick the test files that transitively import a changed module.
+
+    Falls back to the full suite (``mode="full"``) when nothing changed or when a
+    change cannot be traced through imports: configs, conftest files,
+    non-Python files other than docs, and Python files that are missing from the
+    graph (deleted, so their importers break) or do not parse. Python changes
+    that select no test at all also run everything rather than nothing.
+    """
+    changed = sorted(set(changed))
+    if not changed:
+        return TestSelection(mode="full", fallback_reason="no changed files")
+    for rel_path in changed:
+        name = rel_path.rsplit("/", 1)[-1]
+        if name in FULL_SUITE_NAMES or name.startswith("requirements"):
+            return TestSelection(mode="full", fallback_reason=f"{rel_path} affects every test")
+        if not rel_path.endswith(".py") and not rel_path.endswith(INERT_SUFFIXES):
+            return TestSelection(mode="full", fallback_reason=f"{rel_path} is not traceable through imports")
+
+    file_list = list(files)
+    unparsable: Set[str] = set()
+    graph = build_import_graph(repo_root, file_list, cache_dir, unparsable)
+    for rel_path in changed:
+        if rel_path.endswith(".py") and rel_path not in graph:
+            return TestSelection(mode="full", fallback_reason=f"{rel_path} was deleted or is not in the repo index")
+        if rel_path in unparsable:
+            return TestSelection(mode="full", fallback_reason=f"{rel_path} does not parse")
+    reverse = dependents(graph)
+    parents: Dict[str, Optional[str]] = {}
+    queue: deque = deque()
+    for rel_path in changed:
+        if rel_path.endswith(".py"):
+            parents[rel_path] = None
+            queue.append(rel_path)
+    while queue:
+        current = queue.popleft()
+        for dependent in sorted(reverse.get(current, ())):
+            if dependent not in parents:
+                parents[dependent] = current
+                queue.append(dependent)
+
+    tests = sorted(path for path in parents if is_test_file(path) and path in graph)
+    if not tests and parents:
+        return TestSelection(mode="full", fallback_reason="changed Python files are not imported by any test")
+    reasons: Dict[str, List[str]] = {}
+    for test in tests:
+        chain: List[str] = []
+        node: Optional[str] = test
+        while node is not None:
+            chain.append(node)
+            node = parents[node]
+        reasons[test] = list(reversed(chain))
+    return TestSelection(mode="selected", tests=tests, reasons=reasons)
+
+
+def apply_selection(commands: List[List[str]], selection: TestSelection) -> Tuple[List[List[str]], bool]:
+    """Narrow ``pytest`` commands to the selected tests; drop them when nothing was selected.
+
+    Returns the new commands and whether any command was narrowed or dropped.
+    """
+    if selection.mode != "selected":
+        return commands, False
+    narrowed: List[List[str]] = []
+    for command in commands:
+        if command and command[0] == "pytest":
+            if selection.tests:
+                narrowed.append(command + selection.tests)
+            continue
+        narrowed.append(command)
+    return narrowed, True
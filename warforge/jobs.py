@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from warforge.core import Task, now_iso
+from warforge.events import EVENTS_FILE, EventStream
+from warforge.orchestrator import STAGE_NAMES
+from warforge.run_record import read_artifact, read_artifact_json
+from warforge.runner import RUNS_DIR, RunOutcome, execute_task
+from warforge.storage import DEFAULT_LEASE_S, complete_task, heartbeat, lease_task, release_task
+from warforge.telemetry import QUEUE_WAIT_SECONDS
+
+
+DEFAULT_RUN_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+ACTIVE_STATES = ("queued", "running", "cancelling")
+# Finished jobs kept for status lookups; older ones fall back to what is on disk.
+MAX_FINISHED_JOBS = 256
+
+
+class RunQueueFull(RuntimeError):
+    pass
+
+
+class TaskLeased(RuntimeError):
+    pass
+
+
+@dataclass
+class RunJob:
+    run_id: str
+    task_id: str
+    dry_run: bool
+    status: str = "queued"
+    submitted_at: str = field(default_factory=now_iso)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    outcome: Optional[RunOutcome] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    enqueued_at: float = field(default_factory=time.monotonic)
+    future: Optional[Future] = None
+    events: Optional[EventStream] = None
+
+
+def stage_progress(run_dir: Path) -> Dict[str, Any]:
+    checkpoint = read_artifact_json(run_dir, "checkpoint.json")
+    completed = checkpoint.get("completed_stages", [])
+    return {
+        "completed_stages": completed,
+        "current_stage": next((stage for stage in STAGE_NAMES if stage not in completed), None),
+        "total_stages": len(STAGE_NAMES),
+        "updated_at": checkpoint.get("updated_at"),
+    }
+
+
+class RunManager:
+    """Runs tasks on a bounded in-process thread pool so API requests return immediately.
+
+    Each task is leased in the queue like a worker would, so ``warforge worker``
+    processes never pick up a task the API is running; the lease is heartbeated
+    while the job is active and completed (or released) when it ends.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_RUN_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        runs_dir: Path = RUNS_DIR,
+        lease_s: float = DEFAULT_LEASE_S,
+    ):
+        self.max_pending = max_pending
+        self.runs_dir = runs_dir
+        self.lease_s = lease_s
+        self.owner = f"api-{socket.gethostname()}-{os.getpid()}"
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warforge-run")
+        self._jobs: Dict[str, RunJob] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._heartbeats: Optional[threading.Thread] = None
+
+    def _active_jobs(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status in ACTIVE_STATES)
+
+    def submit(self, task: Task, dry_run: bool = False) -> RunJob:
+        """Lease ``task`` and queue its run; raises ``TaskLeased`` if a worker already holds it."""
+        run_id = f"run-{task.task_id}"
+        with self._lock:
+            existing = self._jobs.get(run_id)
+            if existing and existing.status in ACTIVE_STATES:
+                return existing
+            if self._active_jobs() >= self.max_pending:
+                raise RunQueueFull(f"{self._active_jobs()} runs already in flight")
+        if lease_task(task.task_id, self.owner, self.lease_s) is None:
+            raise TaskLeased(f"{task.task_id} is already being run")
+        with self._lock:
+            active = self._active_jobs()
+            if active >= self.max_pending:
+                release_task(task.task_id, self.owner)
+                raise RunQueueFull(f"{active} runs already in flight")
+            self._jobs.pop(run_id, None)
+            job = self._jobs[run_id] = RunJob(run_id=run_id, task_id=task.task_id, dry_run=dry_run)
+            job.events = EventStream(run_id, path=self.runs_dir / run_id / EVENTS_FILE)
+            job.future = self._executor.submit(self._execute, job, task)
+            self._evict_finished()
+            if self._heartbeats is None:
+                self._heartbeats = threading.Thread(target=self._heartbeat_leases, name="warforge-leases", daemon=True)
+                self._heartbeats.start()
+        return job
+
+    def _evict_finished(self) -> None:
+        finished = [run_id for run_id, job in self._jobs.items() if job.status not in ACTIVE_STATES]
+        for run_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[run_id]
+
+    def _heartbeat_leases(self) -> None:
+        while not self._stopping.wait(self.lease_s / 3):
+            with self._lock:
+                task_ids = [job.task_id for job in self._jobs.values() if job.status in ACTIVE_STATES]
+            for task_id in task_ids:
+                heartbeat(task_id, self.owner, self.lease_s)
+
+    def _settle_lease(self, job: RunJob) -> None:
+        if job.status == "cancelled" and self._stopping.is_set():
+            # Interrupted by shutdown rather than by a user: hand the task back to the queue.
+            release_task(job.task_id, self.owner)
+        elif job.status == "cancelled":
+            complete_task(job.task_id, self.owner, state="cancelled")
+        else:
+            complete_task(job.task_id, self.owner, state="done" if job.outcome.exit_code == 0 else "failed")
+
+    def _execute(self, job: RunJob, task: Task) -> None:
+        with self._lock:
+            cancelled = job.cancel_event.is_set()
+            if cancelled:
+                job.status = "cancelled"
+                job.finished_at = now_iso()
+                job.events.close()
+            else:
+                job.status = "running"
+                job.started_at = now_iso()
+        if cancelled:
+            self._settle_lease(job)
+            return
+        QUEUE_WAIT_SECONDS.observe(time.monotonic() - job.enqueued_at, queue="runs")
+        try:
+            outcome = execute_task(
+                task, dry_run=job.dry_run, runs_dir=self.runs_dir, cancel_event=job.cancel_event, events=job.events
+            )
+        except Exception as exc:  # noqa: BLE001 - surface crashes through the job status
+            outcome = RunOutcome(job.run_id, "error", f"{type(exc).__name__}: {exc}", 1)
+        with self._lock:
+            job.outcome = outcome
+            job.status = outcome.status
+            job.finished_at = now_iso()
+        self._settle_lease(job)
+
+    def get(self, run_id: str) -> Optional[RunJob]:
+        with self._lock:
+            return self._jobs.get(run_id)
+
+    def active_count(self) -> int:
+        with self._lock:
+            return self._active_jobs()
+
+    def cancel(self, run_id: str) -> Optional[RunJob]:
+        with self._lock:
+            job = self._jobs.get(run_id)
+            if job is None or job.status not in ACTIVE_STATES:
+                return job
+            job.cancel_event.set()
+            if job.status == "queued" and job.future is not None and job.future.cancel():
+                job.status = "cancelled"
+                job.finished_at = now_iso()
+                job.events.close()
+            else:
+                job.status = "cancelling"
+                return job
+        self._settle_lease(job)
+        return job
+
+    def status(self, run_id: str) -> Optional[Dict[str, Any]]:
+        job = self.get(run_id)
+        run_dir = self.runs_dir / run_id
+        if job is None and not run_dir.exists():
+            return None
+        payload: Dict[str, Any] = {"run_id": run_id, "progress": stage_progress(run_dir)}
+        if job is None:
+            payload["status"] = "finished" if read_artifact(run_dir, "receipt.md") is not None else "unknown"
+            return payload
+        payload.update(
+            {
+                "task_id": job.task_id,
+                "status": job.status,
+                "submitted_at": job.submitted_at,
+                "started_at": job.started_at,
+                "finished_at": job.finished_at,
+                "message": job.outcome.message if job.outcome else None,
+            }
+        )
+        return payload
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._stopping.set()
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status in ACTIVE_STATES:
+                    job.cancel_event.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == "queued" and job.future is not None and job.future.cancelled():
+                    # Never started, so execute_task will not close the stream; release its readers.
+                    job.status = "cancelled"
+                    job.finished_at = now_iso()
+                    job.events.close()
+                    release_task(job.task_id, self.owner)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from warforge.core import repo_files, write_text
+
+
+MANIFEST_DIR = Path(".warforge") / "cache"
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 1024 * 1024
+# Files modified this close to the scan cannot be trusted by stat alone: a write
+# landing in the same mtime tick would be invisible next run, so re-hash them.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    digest: str
+    racy: bool = False
+
+    def matches(self, stat: os.stat_result) -> bool:
+        return (
+            not self.racy
+            and self.size == stat.st_size
+            and self.mtime_ns == stat.st_mtime_ns
+            and self.inode == stat.st_ino
+        )
+
+
+@dataclass
+class RepoFingerprint:
+    repo_hash: str
+    entries: Dict[str, FileEntry]
+    directories: Dict[str, str]
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    bytes_read: int = 0
+    files_hashed: int = 0
+
+    @property
+    def changed(self) -> List[str]:
+        return sorted(self.added + self.modified + self.removed)
+
+
+def manifest_path(repo_root: Path, manifest_dir: Path = MANIFEST_DIR) -> Path:
+    root_key = hashlib.sha1(str(repo_root.resolve()).encode()).hexdigest()[:12]
+    return manifest_dir / f"manifest-{root_key}.json"
+
+
+def load_manifest(path: Path) -> Dict[str, FileEntry]:
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if payload.get("version") != MANIFEST_VERSION:
+        return {}
+    return {item["path"]: FileEntry(**item) for item in payload.get("files", [])}
+
+
+def save_manifest(path: Path, fingerprint: RepoFingerprint) -> None:
+    payload = {
+        "version": MANIFEST_VERSION,
+        "repo_hash": fingerprint.repo_hash,
+        "files": [asdict(entry) for _, entry in sorted(fingerprint.entries.items())],
+        "directories": fingerprint.directories,
+    }
+    write_text(path, json.dumps(payload, separators=(",", ":")))
+
+
+def digest_file(path: Path) -> Tuple[str, int]:
+    hasher = hashlib.sha256()
+    size = 0
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+            size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+def rollup_directories(entries: Dict[str, FileEntry]) -> Dict[str, str]:
+    """Merkle roll-up: each directory digest covers its children's names and digests."""
+    children: Dict[str, Dict[str, str]] = {"": {}}
+    for rel_path, entry in entries.items():
+        parent, _, name = rel_path.rpartition("/")
+        children.setdefault(parent, {})[name] = "f" + entry.digest
+        while parent:
+            grandparent, _, dir_name = parent.rpartition("/")
+            siblings = children.setdefault(grandparent, {})
+            if dir_name in siblings:
+                break
+            siblings[dir_name] = ""
+            children.setdefault(parent, {})
+            parent = grandparent
+
+    directories: Dict[str, str] = {}
+    for directory in sorted(children, key=lambda item: item.count("/") + bool(item), reverse=True):
+        hasher = hashlib.sha256()
+        for name, digest in sorted(children[directory].items()):
+            if not digest:
+                child = f"{directory}/{name}" if directory else name
+                digest = "d" + directories[child]
+            hasher.update(f"{name}\0{digest}\n".encode())
+        directories[directory] = hasher.hexdigest()
+    return directories
+
+
+def fingerprint_repo(
+    repo_root: Path,
+    paths: Optional[Iterable[Path]] = None,
+    manifest_dir: Path = MANIFEST_DIR,
+    persist: bool = True,
+) -> RepoFingerprint:
+    path = manifest_path(repo_root, manifest_dir)
+    previous = load_manifest(path)
+    scan_started_ns = time.time_ns()
+    entries: Dict[str, FileEntry] = {}
+    added: List[str] = []
+    modified: List[str] = []
+    bytes_read = 0
+    files_hashed = 0
+
+    for file_path in paths if paths is not None else repo_files(repo_root):
+        try:
+            stat = file_path.stat()
+        except OSError:
+            continue
+        if not file_path.is_file():
+            continue
+        rel_path = file_path.relative_to(repo_root).as_posix()
+        cached = previous.get(rel_path)
+        if cached and cached.matches(stat):
+            entries[rel_path] = cached
+            continue
+        try:
+            digest, size = digest_file(file_path)
+        except OSError:
+            continue
+        bytes_read += size
+        files_hashed += 1
+        entries[rel_path] = FileEntry(
+            path=rel_path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            inode=stat.st_ino,
+            digest=digest,
+            racy=stat.st_mtime_ns >= scan_started_ns - RACY_WINDOW_NS,
+        )
+        if cached is None:
+            added.append(rel_path)
+        elif cached.digest != digest:
+            modified.append(rel_path)
+
+    removed = sorted(set(previous) - set(entries))
+    directories = rollup_directories(entries)
+    fingerprint = RepoFingerprint(
+        repo_hash=directories[""],
+        entries=entries,
+        directories=directories,
+        added=sorted(added),
+        modified=sorted(modified),
+        removed=removed,
+        bytes_read=bytes_read,
+        files_hashed=files_hashed,
+    )
+    if persist:
+        save_manifest(path, fingerprint)
+    return fingerprint
@@ -1,53 +1,85 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import threading
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List
-
-from warforge.agents.ai_integrations import AIIntegrationsAgent
-from warforge.agents.bots_automation import BotsAutomationAgent
-from warforge.agents.eval_quality import EvalQualityAgent
-from warforge.agents.implementer import ImplementerAgent
-from warforge.agents.ops_observability import OpsObservabilityAgent
-from warforge.agents.orchestration_architect import OrchestrationArchitectAgent
-from warforge.agents.planner import PlannerAgent
-from warforge.agents.repo_analyst import RepoAnalystAgent
-from warforge.agents.reviewer import ReviewerAgent
-from warforge.agents.router import RouterAgent
-from warforge.agents.test_engineer import TestEngineerAgent
+from typing import Any, Awaitable, Dict, List, Optional, Tuple, TypeVar
+
+from warforge.agents.base import Agent, AgentResult, result_key
+from warforge.agents.registry import resolve_agent
 from warforge.core import (
     RunContext,
     clock_ms,
-    hash_files,
     human_duration_ms,
     now_iso,
-    repo_files,
-    write_json,
 )
-from warforge.policy import evaluate_policy
-from warforge.verification import detect_verification_commands
+from warforge.events import EventStream
+from warforge.policy import DiffScan, evaluate_policy, scan_chunks
+from warforge.run_record import ArtifactStore, read_artifact_json
+from warforge.scheduler import (
+    DEFAULT_AGENT_TIMEOUT_S,
+    DEFAULT_AGENT_WORKERS,
+    AgentTiming,
+    GateFailed,
+    arun_dag,
+    build_dag,
+    critical_path,
+)
+from warforge.snapshot import RepoSnapshot, build_snapshot
+from warforge.stage_cache import StageCache, stage_key
+from warforge.telemetry import AGENT_SECONDS, STAGE_SECONDS, cache_lookup
+
 
+STAGE_NAMES = ("plan", "implementation", "verification", "review")
+CANCEL_POLL_S = 0.1
 
-AGENT_REGISTRY = {
-    "router": RouterAgent,
-    "repo_analyst": RepoAnalystAgent,
-    "orchestration_architect": OrchestrationArchitectAgent,
-    "planner": PlannerAgent,
-    "implementer": ImplementerAgent,
-    "test_engineer": TestEngineerAgent,
-    "reviewer": ReviewerAgent,
-    "ai_integrations": AIIntegrationsAgent,
-    "bots_automation": BotsAutomationAgent,
-    "eval_quality": EvalQualityAgent,
-    "ops_observability": OpsObservabilityAgent,
-}
+T = TypeVar("T")
+
+
+class RunCancelled(RuntimeError):
+    pass
 
 
 class Orchestrator:
-    def __init__(self, context: RunContext):
+    def __init__(
+        self,
+        context: RunContext,
+        max_workers: Optional[int] = None,
+        agent_timeout_s: Optional[float] = DEFAULT_AGENT_TIMEOUT_S,
+        cancel_event: Optional[threading.Event] = None,
+        stage_cache: Optional[StageCache] = None,
+        resume: bool = False,
+        artifacts: Optional[ArtifactStore] = None,
+        events: Optional[EventStream] = None,
+    ):
         self.context = context
-        self.metrics: Dict[str, Any] = {"stages": {}}
+        self.events = events
+        self.artifact_store = artifacts or ArtifactStore(context.run_dir)
+        self.cancel_event = cancel_event
+        self.stage_cache = stage_cache
+        self.completed_stages: List[str] = []
+        self._checkpoint_stages: Dict[str, Dict[str, Any]] = {}
+        # Stages finished by an earlier attempt of this run, reused when their key still matches.
+        self._resumable: Dict[str, Dict[str, Any]] = (
+            read_artifact_json(context.run_dir, "checkpoint.json").get("stages", {}) if resume else {}
+        )
+        if max_workers is None:
+            max_workers = DEFAULT_AGENT_WORKERS if context.fast_mode else 1
+        self.max_workers = max_workers
+        self.agent_timeout_s = agent_timeout_s
+        self._origin_ms = clock_ms()
+        self.metrics: Dict[str, Any] = {
+            "stages": {},
+            "agents": {},
+            "critical_path": {"agents": [], "duration_ms": 0.0},
+            "retries_count": 0,
+            "timeouts_count": 0,
+        }
         self.artifacts: Dict[str, Any] = {}
+        self._agents: Dict[str, Agent] = {}
+        self._snapshot: Optional[RepoSnapshot] = None
         self.context_data: Dict[str, Any] = {
             "title": context.task.title,
             "description": context.task.description,
@@ -55,28 +87,161 @@ class Orchestrator:
             "safe_mode": context.safe_mode,
         }
 
-    def _write_checkpoint(self, stage: str, payload: Dict[str, Any]) -> None:
-        write_json(self.context.run_dir / "checkpoint.json", {"stage": stage, "payload": payload})
+    def _agent(self, name: str) -> Agent:
+        """One instance per agent for the whole run; classes are resolved on first use."""
+        agent = self._agents.get(name)
+        if agent is None:
+            agent = self._agents[name] = resolve_agent(name)()
+        return agent
 
-    def _run_stage(self, name: str, agent_names: List[str]) -> Dict[str, Any]:
+    def _emit(self, type: str, data: Dict[str, Any], stage: Optional[str] = None, agent: Optional[str] = None) -> None:
+        # Called on the event loop, so never wait on a slow reader; it catches up from history instead.
+        if self.events is not None:
+            self.events.emit(type, data, stage=stage, agent=agent, block=False)
+
+    def _agent_finished(self, stage: str, timings: Dict[str, AgentTiming], agent_name: str, result: AgentResult) -> None:
+        timing = timings.get(agent_name)
+        self._emit(
+            "agent",
+            {
+                "status": "finished",
+                "duration_ms": timing.duration_ms if timing else None,
+                "keys": sorted(result.payload),
+            },
+            stage=stage,
+            agent=agent_name,
+        )
+
+    @property
+    def snapshot(self) -> RepoSnapshot:
+        if self._snapshot is None:
+            self._snapshot = build_snapshot(self.context.repo_root)
+        return self._snapshot
+
+    def _write_checkpoint(self, stage: str, payload: Dict[str, Any], key: str) -> None:
+        self.completed_stages.append(stage)
+        self._checkpoint_stages[stage] = {"key": key, "results": payload}
+        self.artifact_store.write_json(
+            "checkpoint.json",
+            {
+                "stage": stage,
+                "payload": payload,
+                "stages": self._checkpoint_stages,
+                "completed_stages": self.completed_stages,
+                "total_stages": len(STAGE_NAMES),
+                "updated_at": now_iso(),
+            },
+        )
+
+    def check_cancelled(self) -> None:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise RunCancelled(self.context.run_id)
+
+    async def _until_cancelled(self, awaitable: Awaitable[T]) -> T:
+        """Await ``awaitable``, cancelling it if the run's cancel event fires first."""
+        task = asyncio.ensure_future(awaitable)
+        if self.cancel_event is None:
+            return await task
+        while not task.done():
+            if self.cancel_event.is_set():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise RunCancelled(self.context.run_id)
+            await asyncio.wait({task}, timeout=CANCEL_POLL_S)
+        return task.result()
+
+    def _record_timings(self, stage: str, timings: Dict[str, AgentTiming]) -> None:
+        for agent_name, timing in timings.items():
+            self.metrics["agents"][agent_name] = {"stage": stage, **timing.as_dict(self._origin_ms)}
+            AGENT_SECONDS.observe(timing.duration_ms / 1000, stage=stage, agent=agent_name)
+            self.metrics["retries_count"] += timing.retries
+            self.metrics["timeouts_count"] += timing.timeouts
+
+    def _cached_stage(self, name: str, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        resumed = self._resumable.get(name)
+        if resumed is not None and resumed.get("key") == key:
+            return resumed["results"], "checkpoint"
+        if self.stage_cache is not None:
+            cached = self.stage_cache.get(key)
+            cache_lookup("stage", cached is not None)
+            if cached is not None:
+                return cached, "stage_cache"
+        return None, None
+
+    def _apply_stage_results(self, agents: List[Any], results: Dict[str, Any]) -> None:
+        for agent in agents:
+            payload = results[agent.name]
+            self.context_data[result_key(agent.name)] = payload
+            for key in agent.writes:
+                if key in payload:
+                    self.context_data[key] = payload[key]
+
+    async def _arun_stage(self, name: str, agent_names: List[str]) -> Dict[str, Any]:
+        self.check_cancelled()
         stage_start = clock_ms()
-        results = {}
-        for agent_name in agent_names:
-            agent = AGENT_REGISTRY[agent_name]()
-            result = agent.run(self.context_data)
-            results[agent_name] = result.payload
-            self.context_data[f"{agent_name}_result"] = result.payload
-        stage_end = clock_ms()
-        self.metrics["stages"][name] = {
-            "duration_ms": human_duration_ms(stage_start, stage_end),
-            "agents": agent_names,
-        }
-        self._write_checkpoint(name, results)
+        agents = [self._agent(agent_name) for agent_name in agent_names]
+        for agent in agents:
+            agent.events = self.events.bind(stage=name, agent=agent.name) if self.events is not None else None
+        key = stage_key(name, agents, self.context_data)
+        cached, source = self._cached_stage(name, key)
+        if cached is not None:
+            self._apply_stage_results(agents, cached)
+            self.metrics["stages"][name] = {
+                "duration_ms": human_duration_ms(stage_start, clock_ms()),
+                "agents": agent_names,
+                "cached": source,
+            }
+            STAGE_SECONDS.observe(self.metrics["stages"][name]["duration_ms"] / 1000, stage=name, source=source)
+            self._write_checkpoint(name, cached, key)
+            self._emit("stage", {"status": "cached", "source": source, **self.metrics["stages"][name]}, stage=name)
+            return cached
+        self._emit("stage", {"status": "started", "agents": agent_names}, stage=name)
+        timings: Dict[str, AgentTiming] = {}
+        try:
+            agent_results, _ = await self._until_cancelled(
+                arun_dag(
+                    agents,
+                    self.context_data,
+                    max_workers=self.max_workers,
+                    timeout_s=self.agent_timeout_s,
+                    timings=timings,
+                    on_result=partial(self._agent_finished, name, timings),
+                )
+            )
+        except GateFailed as exc:
+            self._record_timings(name, timings)
+            self.metrics["failed_gate"] = {"stage": name, "agent": exc.agent_name, "reason": exc.reason}
+            self._emit("stage", {"status": "failed", "reason": exc.reason}, stage=name, agent=exc.agent_name)
+            self.artifact_store.write_json("metrics.json", self.metrics)
+            raise
+        finally:
+            self.metrics["stages"][name] = {
+                "duration_ms": human_duration_ms(stage_start, clock_ms()),
+                "agents": agent_names,
+            }
+            STAGE_SECONDS.observe(self.metrics["stages"][name]["duration_ms"] / 1000, stage=name, source="computed")
+        self._record_timings(name, timings)
+        results = {agent_name: result.payload for agent_name, result in agent_results.items()}
+        durations = {agent_name: timing.duration_ms for agent_name, timing in timings.items()}
+        path = critical_path(build_dag([type(agent) for agent in agents]), durations)
+        self.metrics["stages"][name]["critical_path"] = path
+        run_path = self.metrics["critical_path"]
+        run_path["agents"].extend(path)
+        run_path["duration_ms"] = round(run_path["duration_ms"] + sum(durations[agent] for agent in path), 2)
+        self._write_checkpoint(name, results, key)
+        if self.stage_cache is not None:
+            self.stage_cache.put(key, name, results)
+        self._emit("stage", {"status": "finished", **self.metrics["stages"][name]}, stage=name)
         return results
 
     def run(self) -> Dict[str, Any]:
-        start = clock_ms()
-        repo_hash = hash_files(repo_files(self.context.repo_root))
+        return asyncio.run(self.arun())
+
+    async def arun(self) -> Dict[str, Any]:
+        start = self._origin_ms = clock_ms()
+        snapshot = self.snapshot
+        self.context_data["repo_snapshot"] = snapshot
+        repo_hash = snapshot.fingerprint
         cache_dir = Path(".warforge") / "cache"
         cache_dir.mkdir(parents=True, exist_ok=True)
         cache_path = cache_dir / "repo_index.json"
@@ -84,23 +249,30 @@ class Orchestrator:
         cache_payload = {"repo_hash": repo_hash, "cached_at": now_iso()}
         cache_path.write_text(f"{json.dumps(cache_payload)}\n{repo_hash}")
         self.metrics["cache_hit"] = cache_hit
-        self.metrics["retries_count"] = 0
-
-        plan_results = self._run_stage("plan", ["router", "repo_analyst", "planner", "orchestration_architect"])
-        repo_scripts = detect_verification_commands(self.context.repo_root)
-        self.context_data["verification_commands"] = [" ".join(command) for command in repo_scripts]
-        implement_results = self._run_stage("implementation", ["implementer", "ai_integrations", "bots_automation"])
-        verify_results = self._run_stage("verification", ["test_engineer", "eval_quality", "ops_observability"])
-        review_results = self._run_stage("review", ["reviewer"])
+        cache_lookup("repo_index", cache_hit)
+        self.metrics["fingerprint"] = {
+            "files": len(snapshot.files),
+            "files_hashed": snapshot.files_hashed,
+            "bytes_read": snapshot.bytes_read,
+            "changed_count": len(snapshot.changed_files),
+            "changed_files": list(snapshot.changed_files[:50]),
+        }
+
+        plan_results = await self._arun_stage("plan", ["router", "repo_analyst", "planner", "orchestration_architect"])
+        self.context_data["verification_commands"] = [" ".join(command) for command in snapshot.verification_commands]
+        implement_results = await self._arun_stage("implementation", ["implementer", "ai_integrations", "bots_automation"])
+        verify_results = await self._arun_stage("verification", ["test_engineer", "eval_quality", "ops_observability"])
+        review_results = await self._arun_stage("review", ["reviewer"])
         end = clock_ms()
 
         self.metrics["total_duration_ms"] = human_duration_ms(start, end)
         self.metrics["mode"] = "fast" if self.context.fast_mode else "safe"
         self.metrics["generated_at"] = now_iso()
 
-        diff_text = "".join(json.dumps(self.context_data, sort_keys=True))
-        repo_paths = [Path(path) for path in plan_results.get("repo_analyst", {}).get("repo_files", [])]
-        policy = evaluate_policy(repo_paths, diff_text, self.context.safe_mode)
+        serializable = {key: value for key, value in self.context_data.items() if key != "repo_snapshot"}
+        # Encode incrementally so agent output is scanned in bounded windows instead of one large string.
+        content_zones = scan_chunks(json.JSONEncoder(sort_keys=True).iterencode(serializable))
+        policy = evaluate_policy(snapshot.paths(), "", self.context.safe_mode, diff_scan=DiffScan(zones=content_zones))
 
         result = {
             "plan": plan_results,
@@ -116,11 +288,11 @@ class Orchestrator:
         return result
 
     def write_artifacts(self, payload: Dict[str, Any]) -> None:
-        run_dir = self.context.run_dir
-        write_json(run_dir / "plan.json", payload["plan"])
-        write_json(run_dir / "repo_map.json", payload["plan"]["repo_analyst"]["repo_map"])
-        write_json(run_dir / "workflow.json", payload["plan"]["orchestration_architect"])
-        write_json(run_dir / "risk_report.json", payload["policy"])
-        write_json(run_dir / "eval_report.json", payload["verification"]["eval_quality"])
-        write_json(run_dir / "review_report.json", payload["review"]["reviewer"])
-        write_json(run_dir / "metrics.json", payload["metrics"])
+        store = self.artifact_store
+        store.write_json("plan.json", payload["plan"])
+        store.write_json("repo_map.json", payload["plan"]["repo_analyst"]["repo_map"])
+        store.write_json("workflow.json", payload["plan"]["orchestration_architect"])
+        store.write_json("risk_report.json", payload["policy"])
+        store.write_json("eval_report.json", payload["verification"]["eval_quality"])
+        store.write_json("review_report.json", payload["review"]["reviewer"])
+        store.write_json("metrics.json", payload["metrics"])
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List
+from typing import AbstractSet, Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Set, Tuple
 
 
 RESTRICTED_PATTERNS = {
@@ -22,26 +22,236 @@ RESTRICTED_PATHS = {
     "migrations": ["migrations", "schema"],
 }
 
+SCAN_CHUNK_CHARS = 64 * 1024
+# Longest match the diff patterns can produce; carried across chunk boundaries.
+SCAN_OVERLAP_CHARS = 64
+MAX_TRIGGERS_PER_ZONE = 20
+EXCERPT_CHARS = 120
+
 
 @dataclass
 class PolicyResult:
     restricted_zones: List[str]
     requires_approval: bool
     safe_mode: bool
+    triggers: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+
+
+class ZoneMatcher:
+    """Zone tables compiled once into a single alternation regex.
+
+    Two forms are compiled per set of zones: a flat alternation used to find the
+    next hit (group-free, so ``re`` can use its fast literal prefix search) and
+    one with a named group per zone that is matched only at hit offsets to name
+    the zone. ``scan`` stops as soon as every zone has matched, and rescans the
+    remaining zones from the same offset so overlapping matches are not lost.
+    Case-insensitive tables written in lowercase run case-sensitively against
+    ``text.lower()``, which is far cheaper than ``IGNORECASE``.
+    """
+
+    def __init__(self, alternatives: Dict[str, str], flags: int = 0):
+        self.alternatives = alternatives
+        self.fold_case = bool(flags & re.IGNORECASE) and all(
+            alternative == alternative.lower() for alternative in alternatives.values()
+        )
+        self.flags = flags & ~re.IGNORECASE if self.fold_case else flags
+        self._compiled: Dict[FrozenSet[str], Tuple[Pattern[str], Pattern[str]]] = {}
+
+    def _regexes(self, zones: FrozenSet[str]) -> Tuple[Pattern[str], Pattern[str]]:
+        compiled = self._compiled.get(zones)
+        if compiled is None:
+            ordered = sorted(zones)
+            locator = re.compile("|".join(self.alternatives[zone] for zone in ordered), self.flags)
+            named = re.compile("|".join(f"(?P<{zone}>{self.alternatives[zone]})" for zone in ordered), self.flags)
+            compiled = self._compiled[zones] = (locator, named)
+        return compiled
+
+    def hits(self, text: str, skip: AbstractSet[str] = frozenset()) -> Dict[str, int]:
+        """Offset of the first match of each zone not in ``skip``."""
+        remaining = frozenset(self.alternatives) - skip
+        if self.fold_case:
+            text = text.lower()
+        found: Dict[str, int] = {}
+        position = 0
+        while remaining:
+            locator, named = self._regexes(remaining)
+            hit = locator.search(text, position)
+            if hit is None:
+                break
+            zone = named.match(text, hit.start()).lastgroup
+            found[zone] = hit.start()
+            remaining = remaining - {zone}
+            position = hit.start()
+        return found
+
+    def scan(self, text: str, skip: AbstractSet[str] = frozenset()) -> Set[str]:
+        return set(self.hits(text, skip))
+
+
+PATH_MATCHER = ZoneMatcher(
+    {zone: "|".join(re.escape(part) for part in parts) for zone, parts in RESTRICTED_PATHS.items()}
+)
+DIFF_MATCHER = ZoneMatcher({zone: pattern.pattern for zone, pattern in RESTRICTED_PATTERNS.items()}, re.IGNORECASE)
+
+
+def detect_path_zones(paths: Iterable[Path]) -> Set[str]:
+    # Path parts contain no newline, so one pass over the joined list matches each path independently.
+    return PATH_MATCHER.scan("\n".join(map(str, paths)).lower())
+
+
+def path_triggers(paths: Iterable[Path]) -> Dict[str, List[Dict[str, Any]]]:
+    """First path that put each zone in scope."""
+    names = [str(path) for path in paths]
+    text = "\n".join(names).lower()
+    return {
+        zone: [{"source": "path", "file": names[text.count("\n", 0, offset)]}]
+        for zone, offset in PATH_MATCHER.hits(text).items()
+    }
 
 
 def detect_restricted_zones(paths: Iterable[Path], diff_text: str) -> List[str]:
-    zones: List[str] = []
-    for zone, patterns in RESTRICTED_PATHS.items():
-        if any(part in str(path).lower() for path in paths for part in patterns):
-            zones.append(zone)
-    for zone, pattern in RESTRICTED_PATTERNS.items():
-        if pattern.search(diff_text):
-            zones.append(zone)
-    return sorted(set(zones))
-
-
-def evaluate_policy(paths: Iterable[Path], diff_text: str, safe_mode: bool) -> PolicyResult:
-    restricted = detect_restricted_zones(paths, diff_text)
+    zones = detect_path_zones(paths)
+    zones |= DIFF_MATCHER.scan(diff_text, skip=zones)
+    return sorted(zones)
+
+
+def scan_chunks(chunks: Iterable[str], chunk_chars: int = SCAN_CHUNK_CHARS) -> Set[str]:
+    """Diff zones over a stream of text pieces, holding at most ``chunk_chars`` plus an overlap.
+
+    The tail of each window is carried into the next so matches spanning a chunk
+    boundary are still found. Stops consuming once every zone has matched.
+    """
+    zones: Set[str] = set()
+    buffer: List[str] = []
+    size = 0
+    carry = ""
+    all_zones = set(RESTRICTED_PATTERNS)
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size < chunk_chars:
+            continue
+        window = carry + "".join(buffer)
+        zones |= DIFF_MATCHER.scan(window, skip=zones)
+        if zones >= all_zones:
+            return zones
+        carry = window[-SCAN_OVERLAP_CHARS:]
+        buffer, size = [], 0
+    return zones | DIFF_MATCHER.scan(carry + "".join(buffer), skip=zones)
+
+
+@dataclass
+class DiffScan:
+    zones: Set[str] = field(default_factory=set)
+    triggers: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    files: List[str] = field(default_factory=list)
+    bytes_scanned: int = 0
+
+
+class _HunkBuffer:
+    """Changed lines of the current hunk, flushed to the matcher in bounded windows."""
+
+    def __init__(self, scan: DiffScan):
+        self.scan = scan
+        self.file: Optional[str] = None
+        self.hunk: Optional[str] = None
+        self.lines: List[str] = []
+        self.line_numbers: List[int] = []
+        self.chars = 0
+        self.file_zones: Set[str] = set()
+
+    def add(self, text: str, line_number: int) -> None:
+        self.lines.append(text)
+        self.line_numbers.append(line_number)
+        self.chars += len(text) + 1
+        if self.chars >= SCAN_CHUNK_CHARS:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.lines:
+            return
+        saturated = {zone for zone, items in self.scan.triggers.items() if len(items) >= MAX_TRIGGERS_PER_ZONE}
+        text = "\n".join(self.lines)
+        for zone, offset in DIFF_MATCHER.hits(text, skip=self.file_zones | saturated).items():
+            index = text.count("\n", 0, offset)
+            self.scan.zones.add(zone)
+            self.file_zones.add(zone)
+            self.scan.triggers.setdefault(zone, []).append(
+                {
+                    "source": "diff",
+                    "file": self.file,
+                    "hunk": self.hunk,
+                    "line": self.line_numbers[index],
+                    "excerpt": self.lines[index][:EXCERPT_CHARS],
+                }
+            )
+        self.lines, self.line_numbers, self.chars = [], [], 0
+
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+
+def scan_diff(lines: Iterable[str]) -> DiffScan:
+    """Scan unified diff output line by line, attributing zone hits to file, hunk and line.
+
+    Only added and removed lines are matched; file headers are covered by the
+    path rules. Memory is bounded by ``SCAN_CHUNK_CHARS`` regardless of diff size,
+    and each zone keeps at most ``MAX_TRIGGERS_PER_ZONE`` locations (one per file).
+    """
+    scan = DiffScan()
+    buffer = _HunkBuffer(scan)
+    new_line = 0
+    in_hunk = False
+    for raw in lines:
+        scan.bytes_scanned += len(raw)
+        line = raw.rstrip("\n")
+        if line.startswith("diff --git "):
+            buffer.flush()
+            in_hunk = False
+            buffer.file = line.split(" b/", 1)[-1] if " b/" in line else line[len("diff --git "):]
+            buffer.hunk = None
+            buffer.file_zones = set()
+            scan.files.append(buffer.file)
+            continue
+        header = _HUNK_HEADER.match(line)
+        if header:
+            buffer.flush()
+            in_hunk = True
+            buffer.hunk = line
+            new_line = int(header.group(1))
+            continue
+        if not in_hunk:
+            continue
+        marker = line[:1]
+        if marker == "+":
+            buffer.add(line[1:], new_line)
+            new_line += 1
+        elif marker == "-":
+            buffer.add(line[1:], new_line)
+        elif marker == " ":
+            new_line += 1
+    buffer.flush()
+    return scan
+
+
+def evaluate_policy(
+    paths: Iterable[Path],
+    diff_text: str,
+    safe_mode: bool,
+    diff_scan: Optional[DiffScan] = None,
+) -> PolicyResult:
+    """Evaluate restricted zones from paths plus either ``diff_text`` or a streamed ``diff_scan``."""
+    paths = list(paths)
+    restricted = set(detect_restricted_zones(paths, diff_text))
+    triggers = path_triggers(paths)
+    if diff_scan is not None:
+        restricted |= diff_scan.zones
+        for zone, items in diff_scan.triggers.items():
+            triggers.setdefault(zone, []).extend(items)
     requires_approval = bool(restricted) and safe_mode
-    return PolicyResult(restricted_zones=restricted, requires_approval=requires_approval, safe_mode=safe_mode)
+    return PolicyResult(
+        restricted_zones=sorted(restricted),
+        requires_approval=requires_approval,
+        safe_mode=safe_mode,
+        triggers=triggers,
+    )
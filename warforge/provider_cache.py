@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from warforge.cache_store import JsonStore, stable_hash
+from warforge.manifest import MANIFEST_DIR
+from warforge.providers import Provider
+from warforge.telemetry import cache_lookup
+
+
+PROVIDER_CACHE_VERSION = 2
+PROVIDER_CACHE_DIR = MANIFEST_DIR / "providers"
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+DEFAULT_TTL_S = 7 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 256
+
+
+def provider_cache_key(
+    provider: str, model: str, kind: str, request: Any, params: Dict[str, Any], base_url: str = ""
+) -> str:
+    """Key a provider call by endpoint identity, request body and sampling parameters."""
+    return stable_hash(
+        {
+            "version": PROVIDER_CACHE_VERSION,
+            "provider": provider,
+            "base_url": base_url,
+            "model": model,
+            "kind": kind,
+            "request": request,
+            "params": params,
+        }
+    )
+
+
+class ProviderResponseStore(JsonStore):
+    """Recorded provider responses keyed by ``provider_cache_key``; entries older than ``ttl_s`` are dropped."""
+
+    version = PROVIDER_CACHE_VERSION
+
+    def __init__(
+        self,
+        cache_dir: Path = PROVIDER_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_s: float = DEFAULT_TTL_S,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(cache_dir, max_bytes)
+        self.ttl_s = ttl_s
+        self.clock = clock
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = self.read(key)
+        if payload is None:
+            return None
+        if self.clock() - payload.get("created_at", 0) > self.ttl_s:
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+            return None
+        return payload
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self.write(key, {**entry, "created_at": self.clock()})
+
+
+class CachingProvider:
+    """Wrap a ``Provider`` so identical calls are answered from cache.
+
+    Lookups go to a bounded in-memory LRU first and then to ``store`` on disk,
+    which also feeds the memory tier. A stream replays the recorded chunks in
+    order. Only complete calls are recorded: a stream that raises or is closed
+    early is not. Each entry keeps what the original call cost (the change in
+    the wrapped provider's ``cost()`` amount) and how long it took. ``cost()``
+    adds those up per hit as ``saved_amount`` and ``saved_ms``.
+
+    When the wrapped provider can build its request body (``stream_request`` /
+    ``tool_call_request``, as ``HTTPProvider`` does) the key covers that body, so
+    every field actually sent is part of it. Tool results are handed out as
+    copies, so callers can modify them without changing the cache.
+    """
+
+    def __init__(
+        self,
+        provider: Provider,
+        store: Optional[ProviderResponseStore] = None,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        params: Optional[Dict[str, Any]] = None,
+    ):
+        self.provider = provider
+        self.name = provider.name
+        self.store = store if store is not None else ProviderResponseStore()
+        self.memory_entries = memory_entries
+        config = getattr(provider, "config", None)
+        self.model = getattr(config, "model", "")
+        self.base_url = getattr(config, "base_url", "")
+        self.params = params or {}
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._totals = {"cache_hits": 0, "cache_misses": 0, "saved_amount": 0.0, "saved_ms": 0.0}
+
+    def _key(self, kind: str, request: Any, *args: Any) -> str:
+        build = getattr(self.provider, f"{kind}_request", None)
+        if build is not None:
+            request = build(*args)
+        return provider_cache_key(self.name, self.model, kind, request, self.params, self.base_url)
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = (entry["created_at"], entry)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = None
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                created_at, entry = cached
+                if self.store.clock() - created_at > self.store.ttl_s:
+                    del self._memory[key]
+                    entry = None
+                else:
+                    self._memory.move_to_end(key)
+        if entry is None:
+            entry = self.store.get(key)
+            if entry is not None:
+                self._remember(key, entry)
+        cache_lookup("provider", entry is not None)
+        with self._lock:
+            if entry is None:
+                self._totals["cache_misses"] += 1
+            else:
+                self._totals["cache_hits"] += 1
+                self._totals["saved_amount"] += entry.get("cost", 0.0)
+                self._totals["saved_ms"] += entry.get("latency_ms", 0.0)
+        return entry
+
+    def _amount(self) -> float:
+        return float(self.provider.cost().get("amount", 0.0))
+
+    def _record(self, key: str, started: float, amount_before: float, entry: Dict[str, Any]) -> None:
+        entry = {
+            **entry,
+            "provider": self.name,
+            "model": self.model,
+            "cost": max(0.0, self._amount() - amount_before),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        self.store.put(key, entry)
+        self._remember(key, {**entry, "created_at": self.store.clock()})
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        key = self._key("stream", prompt, prompt)
+        entry = self._lookup(key)
+        if entry is not None:
+            yield from entry["chunks"]
+            return
+        amount_before = self._amount()
+        started = time.perf_counter()
+        chunks: List[str] = []
+        for chunk in self.provider.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self._record(key, started, amount_before, {"kind": "stream", "chunks": chunks})
+
+    def tool_call(self, tool_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        key = self._key("tool_call", {"tool": tool_name, "payload": payload}, tool_name, payload)
+        entry = self._lookup(key)
+        if entry is not None:
+            return copy.deepcopy(entry["result"])
+        amount_before = self._amount()
+        started = time.perf_counter()
+        result = self.provider.tool_call(tool_name, payload)
+        self._record(key, started, amount_before, {"kind": "tool_call", "result": copy.deepcopy(result)})
+        return result
+
+    def cost(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = dict(self._totals)
+        totals["saved_amount"] = round(totals["saved_amount"], 6)
+        totals["saved_ms"] = round(totals["saved_ms"], 2)
+        return {**self.provider.cost(), **totals}
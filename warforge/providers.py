@@ -1,7 +1,28 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Protocol
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Protocol
+
+import httpx
+
+from warforge.telemetry import PROVIDER_RETRIES, PROVIDER_SECONDS, PROVIDER_TTFT_SECONDS
+
+
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+# One keep-alive pool per process, shared by every HTTP provider.
+POOL_MAX_CONNECTIONS = 64
+POOL_MAX_KEEPALIVE = 16
+POOL_KEEPALIVE_EXPIRY_S = 30.0
+CONNECT_TIMEOUT_S = 10.0
+# Per-call stats kept for ``HTTPProvider.stats``.
+MAX_CALL_HISTORY = 1000
 
 
 class Provider(Protocol):
@@ -22,6 +43,41 @@ class ProviderConfig:
     name: str
     base_url: str
     api_key_env: str
+    model: str = ""
+    # Calls (including open streams) allowed in flight at once for this provider name.
+    max_concurrency: int = 4
+    timeout_s: float = 60.0
+    max_retries: int = 4
+    backoff_base_s: float = 0.5
+    backoff_max_s: float = 30.0
+    input_cost_per_mtok: float = 0.0
+    output_cost_per_mtok: float = 0.0
+
+
+# OpenAI-compatible endpoints for the adapters AIIntegrationsAgent advertises.
+PROVIDER_DEFAULTS = {
+    "openai": ProviderConfig("openai", "https://api.openai.com/v1", "OPENAI_API_KEY", model="gpt-4o-mini"),
+    "openrouter": ProviderConfig("openrouter", "https://openrouter.ai/api/v1", "OPENROUTER_API_KEY"),
+    "local": ProviderConfig("local", "http://127.0.0.1:11434/v1", "", max_concurrency=1),
+}
+
+
+class ProviderError(RuntimeError):
+    def __init__(self, message: str, status: Optional[int] = None, attempts: int = 1):
+        super().__init__(message)
+        self.status = status
+        self.attempts = attempts
+
+
+@dataclass
+class CallStats:
+    kind: str
+    status: str = "ok"
+    latency_ms: float = 0.0
+    ttft_ms: Optional[float] = None
+    retries: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
 
 
 class StubProvider:
@@ -35,3 +91,274 @@ class StubProvider:
 
     def cost(self) -> Dict[str, Any]:
         return {"currency": "usd", "amount": 0}
+
+
+_client: Optional[httpx.Client] = None
+_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_client() -> httpx.Client:
+    global _client
+    with _shared_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=POOL_KEEPALIVE_EXPIRY_S,
+                ),
+            )
+        return _client
+
+
+def provider_semaphore(name: str, limit: int) -> threading.BoundedSemaphore:
+    """Semaphore shared by every provider instance with this name (first caller sets the limit)."""
+    with _shared_lock:
+        semaphore = _semaphores.get(name)
+        if semaphore is None:
+            semaphore = _semaphores[name] = threading.BoundedSemaphore(max(1, limit))
+        return semaphore
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+def _sse_data(lines: Iterable[str]) -> Iterator[str]:
+    """``data:`` payloads of a Server-Sent Events stream, multi-line events joined."""
+    buffer: List[str] = []
+    for line in lines:
+        if not line:
+            if buffer:
+                yield "\n".join(buffer)
+                buffer = []
+            continue
+        if line.startswith("data:"):
+            buffer.append(line[5:].lstrip())
+    if buffer:
+        yield "\n".join(buffer)
+
+
+class HTTPProvider:
+    """Provider for OpenAI-compatible ``/chat/completions`` endpoints.
+
+    Calls share one keep-alive connection pool and are bounded per provider
+    name by a semaphore; a stream holds its slot until it is exhausted or
+    closed. Throttling (429), transient server errors and connection failures
+    are retried with full-jitter exponential backoff, waiting exactly as long
+    as ``Retry-After`` says when the server sends it. Failures after the first
+    streamed token are not retried, since the caller already has partial output.
+    """
+
+    def __init__(
+        self,
+        config: ProviderConfig,
+        client: Optional[httpx.Client] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+    ):
+        self.config = config
+        self.name = config.name
+        self.client = client or shared_client()
+        self.semaphore = provider_semaphore(config.name, config.max_concurrency)
+        self.calls: Deque[CallStats] = deque(maxlen=MAX_CALL_HISTORY)
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._totals = {"calls": 0, "retries": 0, "input_tokens": 0, "output_tokens": 0}
+
+    def _headers(self) -> Dict[str, str]:
+        api_key = os.environ.get(self.config.api_key_env) if self.config.api_key_env else None
+        return {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    def backoff_s(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return retry_after
+        ceiling = min(self.config.backoff_max_s, self.config.backoff_base_s * (2**attempt))
+        return self._rng.uniform(0, ceiling)
+
+    def _send(self, body: Dict[str, Any], stats: CallStats, stream: bool) -> httpx.Response:
+        url = f"{self.config.base_url.rstrip('/')}/chat/completions"
+        timeout = httpx.Timeout(self.config.timeout_s, connect=CONNECT_TIMEOUT_S)
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                request = self.client.build_request("POST", url, json=body, headers=self._headers(), timeout=timeout)
+                response = self.client.send(request, stream=stream)
+            except httpx.TransportError as exc:
+                if attempt >= self.config.max_retries:
+                    raise ProviderError(f"{self.name}: {type(exc).__name__}: {exc}", attempts=attempt + 1) from exc
+            else:
+                if response.status_code < 400:
+                    return response
+                response.read()
+                response.close()
+                status = response.status_code
+                if status not in RETRY_STATUSES or attempt >= self.config.max_retries:
+                    raise ProviderError(
+                        f"{self.name} returned HTTP {status}: {response.text[:200]}", status=status, attempts=attempt + 1
+                    )
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                if retry_after is not None and retry_after > self.config.backoff_max_s:
+                    raise ProviderError(
+                        f"{self.name} asked to retry after {retry_after:.0f}s", status=status, attempts=attempt + 1
+                    )
+            delay = self.backoff_s(attempt, retry_after)
+            attempt += 1
+            stats.retries += 1
+            PROVIDER_RETRIES.inc(provider=self.name)
+            self._sleep(delay)
+
+    def _finish(self, stats: CallStats, started: float) -> None:
+        stats.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        PROVIDER_SECONDS.observe(stats.latency_ms / 1000, provider=self.name, status=stats.status)
+        if stats.ttft_ms is not None:
+            PROVIDER_TTFT_SECONDS.observe(stats.ttft_ms / 1000, provider=self.name)
+        with self._lock:
+            self.calls.append(stats)
+            self._totals["calls"] += 1
+            self._totals["retries"] += stats.retries
+            self._totals["input_tokens"] += stats.input_tokens
+            self._totals["output_tokens"] += stats.output_tokens
+
+    @staticmethod
+    def _record_usage(stats: CallStats, usage: Optional[Dict[str, Any]]) -> None:
+        if usage:
+            stats.input_tokens = usage.get("prompt_tokens", stats.input_tokens)
+            stats.output_tokens = usage.get("completion_tokens", stats.output_tokens)
+
+    def stream_request(self, prompt: str) -> Dict[str, Any]:
+        """The JSON body ``stream`` posts for ``prompt``."""
+        return {
+            "model": self.config.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+
+    def tool_call_request(self, tool_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """The JSON body ``tool_call`` posts."""
+        messages = payload.get("messages") or [{"role": "user", "content": payload.get("prompt", json.dumps(payload))}]
+        return {
+            "model": self.config.model,
+            "messages": messages,
+            "tools": [
+                {
+                    "type": "function",
+                    "function": {"name": tool_name, "parameters": payload.get("schema", {"type": "object"})},
+                }
+            ],
+            "tool_choice": {"type": "function", "function": {"name": tool_name}},
+        }
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        body = self.stream_request(prompt)
+        stats = CallStats(kind="stream")
+        started = time.perf_counter()
+        with self.semaphore:
+            try:
+                response = self._send(body, stats, stream=True)
+                try:
+                    for data in _sse_data(response.iter_lines()):
+                        if data == "[DONE]":
+                            # Keep reading to the end of the body so the connection returns to the pool.
+                            continue
+                        event = json.loads(data)
+                        self._record_usage(stats, event.get("usage"))
+                        for choice in event.get("choices") or []:
+                            text = (choice.get("delta") or {}).get("content")
+                            if text:
+                                if stats.ttft_ms is None:
+                                    stats.ttft_ms = round((time.perf_counter() - started) * 1000, 2)
+                                yield text
+                finally:
+                    response.close()
+            except httpx.TransportError as exc:
+                stats.status = "error"
+                raise ProviderError(f"{self.name}: stream interrupted: {exc}", attempts=stats.retries + 1) from exc
+            except BaseException:
+                stats.status = "error"
+                raise
+            finally:
+                self._finish(stats, started)
+
+    def tool_call(self, tool_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Force a call to ``tool_name``; ``payload`` carries ``messages`` (or ``prompt``) and an optional JSON ``schema``."""
+        body = self.tool_call_request(tool_name, payload)
+        stats = CallStats(kind="tool_call")
+        started = time.perf_counter()
+        with self.semaphore:
+            try:
+                response = self._send(body, stats, stream=False)
+                result = response.json()
+                self._record_usage(stats, result.get("usage"))
+            except BaseException:
+                stats.status = "error"
+                raise
+            finally:
+                self._finish(stats, started)
+        message = (result.get("choices") or [{}])[0].get("message") or {}
+        calls = message.get("tool_calls") or []
+        arguments = calls[0].get("function", {}).get("arguments", "{}") if calls else "{}"
+        return {"tool": tool_name, "arguments": json.loads(arguments or "{}"), "status": "ok"}
+
+    def cost(self) -> Dict[str, Any]:
+        with self._lock:
+            totals = dict(self._totals)
+        amount = (
+            totals["input_tokens"] * self.config.input_cost_per_mtok
+            + totals["output_tokens"] * self.config.output_cost_per_mtok
+        ) / 1_000_000
+        return {"currency": "usd", "amount": round(amount, 6), **totals}
+
+    def stats(self) -> Dict[str, Any]:
+        """Latency, time-to-first-token and retry figures over the recent call history."""
+        with self._lock:
+            calls = list(self.calls)
+        latencies = sorted(call.latency_ms for call in calls)
+        ttfts = sorted(call.ttft_ms for call in calls if call.ttft_ms is not None)
+
+        def percentile(values: List[float], quantile: float) -> Optional[float]:
+            return values[min(len(values) - 1, int(quantile * len(values)))] if values else None
+
+        return {
+            "calls": len(calls),
+            "errors": sum(1 for call in calls if call.status != "ok"),
+            "retries": sum(call.retries for call in calls),
+            "latency_ms": {"p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99)},
+            "ttft_ms": {"p50": percentile(ttfts, 0.5), "p99": percentile(ttfts, 0.99)},
+            "last": asdict(calls[-1]) if calls else None,
+        }
+
+
+def get_provider(name: str, cached: bool = False, **overrides: Any) -> Provider:
+    """Provider by adapter name (``stub``, ``openai``, ``openrouter``, ``local``).
+
+    ``cached`` wraps it in a ``CachingProvider`` backed by ``.warforge/cache/providers``.
+    """
+    if name == "stub":
+        provider: Provider = StubProvider()
+    elif name in PROVIDER_DEFAULTS:
+        defaults = asdict(PROVIDER_DEFAULTS[name])
+        provider = HTTPProvider(ProviderConfig(**{**defaults, **overrides}))
+    else:
+        raise KeyError(f"Unknown provider {name!r}; expected stub or one of {', '.join(PROVIDER_DEFAULTS)}")
+    if cached:
+        from warforge.provider_cache import CachingProvider
+
+        provider = CachingProvider(provider)
+    return provider
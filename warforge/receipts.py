@@ -1,10 +1,7 @@
 from __future__ import annotations
 
-from pathlib import Path
 from typing import List
 
-from warforge.core import write_text
-
 
 def render_receipt(
     run_id: str,
@@ -36,7 +33,3 @@ def render_receipt(
         "## Rollback\n- Revert the git commit for this run.\n\n"
         "## Not Done\n- Deployment not performed.\n"
     )
-
-
-def write_receipt(run_dir: Path, receipt: str) -> None:
-    write_text(run_dir / "receipt.md", receipt)
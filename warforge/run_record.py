@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from warforge.core import write_json, write_text
+
+
+RECORD_NAME = "run.wfr"
+FRAME_MAGIC = b"WFRE"
+TRAILER_MAGIC = b"WFRI"
+INDEX_NAME = "__index__"
+KIND_JSON = 0
+KIND_TEXT = 1
+# magic, kind, name length, payload length, crc32 of name + payload
+FRAME = struct.Struct("<4sBHII")
+# index frame offset, crc32 of the index frame header, magic
+TRAILER = struct.Struct("<QI4s")
+
+
+@dataclass(frozen=True)
+class RecordEntry:
+    name: str
+    kind: int
+    offset: int
+    length: int
+    crc: int
+
+    @property
+    def payload_offset(self) -> int:
+        return self.offset + FRAME.size + len(self.name.encode())
+
+
+def _crc(name: bytes, payload: bytes) -> int:
+    return zlib.crc32(payload, zlib.crc32(name))
+
+
+def _read_frame_header(handle: BinaryIO, offset: int, end: int) -> Optional[Tuple[RecordEntry, int]]:
+    """Entry at ``offset`` and the offset just past it, or None if the frame is incomplete."""
+    if offset + FRAME.size > end:
+        return None
+    handle.seek(offset)
+    magic, kind, name_length, length, crc = FRAME.unpack(handle.read(FRAME.size))
+    frame_end = offset + FRAME.size + name_length + length
+    if magic != FRAME_MAGIC or frame_end > end:
+        return None
+    name = handle.read(name_length).decode("utf-8", errors="replace")
+    return RecordEntry(name, kind, offset, length, crc), frame_end
+
+
+def _verify(handle: BinaryIO, entry: RecordEntry) -> bool:
+    handle.seek(entry.payload_offset)
+    return _crc(entry.name.encode(), handle.read(entry.length)) == entry.crc
+
+
+def _load_index(handle: BinaryIO, end: int) -> Optional[Dict[str, RecordEntry]]:
+    """Index from the trailer, if the record was closed cleanly and nothing was appended since."""
+    if end < TRAILER.size:
+        return None
+    handle.seek(end - TRAILER.size)
+    index_offset, header_crc, magic = TRAILER.unpack(handle.read(TRAILER.size))
+    if magic != TRAILER_MAGIC or index_offset >= end:
+        return None
+    parsed = _read_frame_header(handle, index_offset, end - TRAILER.size)
+    if parsed is None:
+        return None
+    entry, frame_end = parsed
+    if entry.name != INDEX_NAME or frame_end != end - TRAILER.size or entry.crc != header_crc:
+        return None
+    if not _verify(handle, entry):
+        return None
+    handle.seek(entry.payload_offset)
+    rows = json.loads(handle.read(entry.length))
+    return {row[0]: RecordEntry(*row) for row in rows}
+
+
+def _scan(handle: BinaryIO, end: int) -> Tuple[Dict[str, RecordEntry], int]:
+    """Walk frames from the start; stops at the first torn or corrupt frame (a crash mid-append)."""
+    entries: Dict[str, RecordEntry] = {}
+    offset = 0
+    while offset < end:
+        handle.seek(offset)
+        head = handle.read(TRAILER.size)
+        if not head.startswith(FRAME_MAGIC):
+            # A trailer left by an earlier close; frames appended after it follow directly.
+            if len(head) == TRAILER.size and head[-4:] == TRAILER_MAGIC:
+                offset += TRAILER.size
+                continue
+            break
+        parsed = _read_frame_header(handle, offset, end)
+        if parsed is None:
+            break
+        entry, frame_end = parsed
+        if not _verify(handle, entry):
+            break
+        if entry.name != INDEX_NAME:
+            entries[entry.name] = entry
+        offset = frame_end
+    return entries, offset
+
+
+def read_entries(handle: BinaryIO) -> Tuple[Dict[str, RecordEntry], int]:
+    end = handle.seek(0, os.SEEK_END)
+    index = _load_index(handle, end)
+    if index is not None:
+        return index, end
+    return _scan(handle, end)
+
+
+class RunRecord:
+    """Append-only, checksummed container for one run's artifacts.
+
+    Every artifact is a frame ``header | name | payload`` written with a single
+    ``write`` call, so a crash leaves at most one torn frame at the tail, which
+    readers ignore and the next writer truncates. Re-writing a name appends a
+    newer frame; the latest one wins. ``close`` appends an offset index and a
+    fixed-size trailer so readers can jump straight to any section.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(path, "a+b")
+        self.entries, valid_end = read_entries(self._handle)
+        if valid_end < self._handle.seek(0, os.SEEK_END):
+            self._handle.truncate(valid_end)
+        self._dirty = False
+
+    def append(self, name: str, payload: bytes, kind: int = KIND_TEXT) -> RecordEntry:
+        encoded = name.encode()
+        offset = self._handle.seek(0, os.SEEK_END)
+        crc = _crc(encoded, payload)
+        self._handle.write(FRAME.pack(FRAME_MAGIC, kind, len(encoded), len(payload), crc) + encoded + payload)
+        self._handle.flush()
+        entry = RecordEntry(name, kind, offset, len(payload), crc)
+        if name != INDEX_NAME:
+            self.entries[name] = entry
+            self._dirty = True
+        return entry
+
+    def write_json(self, name: str, payload: Dict[str, Any]) -> None:
+        self.append(name, json.dumps(payload, sort_keys=True, separators=(",", ":")).encode(), KIND_JSON)
+
+    def write_text(self, name: str, content: str) -> None:
+        self.append(name, content.encode(), KIND_TEXT)
+
+    def close(self) -> None:
+        if self._handle.closed:
+            return
+        if self._dirty:
+            rows = [[entry.name, entry.kind, entry.offset, entry.length, entry.crc] for entry in self.entries.values()]
+            index = self.append(INDEX_NAME, json.dumps(rows, separators=(",", ":")).encode(), KIND_JSON)
+            self._handle.write(TRAILER.pack(index.offset, index.crc, TRAILER_MAGIC))
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        self._handle.close()
+
+    def __enter__(self) -> "RunRecord":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class RecordReader:
+    """Lazy reader: only the index (or frame headers) is read until a section is requested."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as handle:
+            self.entries, _ = read_entries(handle)
+        self.stat = path.stat()
+
+    def names(self) -> List[str]:
+        return sorted(self.entries)
+
+    def read(self, name: str) -> Optional[bytes]:
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        with open(self.path, "rb") as handle:
+            handle.seek(entry.payload_offset)
+            return handle.read(entry.length)
+
+    def read_json(self, name: str) -> Dict[str, Any]:
+        data = self.read(name)
+        return json.loads(data) if data else {}
+
+    def read_text(self, name: str) -> Optional[str]:
+        data = self.read(name)
+        return None if data is None else data.decode("utf-8", errors="replace")
+
+
+class ArtifactStore:
+    """Where a run's artifacts go: one file each (the default) or a single run record."""
+
+    def __init__(self, run_dir: Path, use_record: bool = False):
+        self.run_dir = run_dir
+        self.record = RunRecord(run_dir / RECORD_NAME) if use_record else None
+
+    def write_json(self, name: str, payload: Dict[str, Any]) -> None:
+        if self.record is not None:
+            self.record.write_json(name, payload)
+        else:
+            write_json(self.run_dir / name, payload)
+
+    def write_text(self, name: str, content: str) -> None:
+        if self.record is not None:
+            self.record.write_text(name, content)
+        else:
+            write_text(self.run_dir / name, content)
+
+    def close(self) -> None:
+        if self.record is not None:
+            self.record.close()
+
+
+def open_record(run_dir: Path) -> Optional[RecordReader]:
+    path = run_dir / RECORD_NAME
+    return RecordReader(path) if path.exists() else None
+
+
+def read_artifact(run_dir: Path, name: str) -> Optional[bytes]:
+    """Artifact bytes from the run record when one exists, else from the legacy file."""
+    reader = open_record(run_dir)
+    if reader is not None and name in reader.entries:
+        return reader.read(name)
+    path = run_dir / name
+    try:
+        return path.read_bytes()
+    except OSError:
+        return None
+
+
+def read_artifact_json(run_dir: Path, name: str) -> Dict[str, Any]:
+    data = read_artifact(run_dir, name)
+    return json.loads(data) if data else {}
+
+
+def iter_export(reader: RecordReader) -> Iterator[Tuple[str, bytes]]:
+    for name in reader.names():
+        entry = reader.entries[name]
+        data = reader.read(name) or b""
+        if entry.kind == KIND_JSON:
+            data = json.dumps(json.loads(data), indent=2, sort_keys=True).encode()
+        yield name, data
+
+
+def export_record(run_dir: Path, out_dir: Optional[Path] = None) -> List[Path]:
+    """Write the record's sections back out as the legacy per-artifact files."""
+    reader = open_record(run_dir)
+    if reader is None:
+        return []
+    out_dir = out_dir or run_dir
+    written = []
+    for name, data in iter_export(reader):
+        path = out_dir / name
+        write_text(path, data.decode("utf-8", errors="replace"))
+        written.append(path)
+    return written
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from warforge.config import WarforgeConfig, load_config
+from warforge.core import RunContext, Task, ensure_dir
+from warforge.events import EVENTS_FILE, EventStream
+from warforge.impact import TestSelection, apply_selection, select_tests
+from warforge.orchestrator import Orchestrator, RunCancelled
+from warforge.policy import DiffScan, evaluate_policy, scan_diff
+from warforge.receipts import render_receipt
+from warforge.run_record import ArtifactStore, read_artifact, read_artifact_json
+from warforge.scheduler import GateFailed
+from warforge.sharding import run_with_shards
+from warforge.stage_cache import StageCache
+from warforge.storage import RunSummary, flush_metrics, record_run, record_runs
+from warforge.telemetry import RUN_SECONDS, VERIFY_SECONDS
+from warforge.verification_cache import VerificationCache, run_cached_commands
+
+
+RUNS_DIR = Path("runs")
+
+
+@dataclass
+class RunOutcome:
+    run_id: str
+    status: str
+    message: str
+    exit_code: int
+
+
+def stream_diff_scan(git_root: Path) -> DiffScan:
+    """Scan ``git diff`` straight off the pipe so memory stays flat however large the diff is."""
+    proc = subprocess.Popen(
+        ["git", "diff", "--no-color", "--no-ext-diff"],
+        cwd=git_root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        errors="replace",
+    )
+    try:
+        return scan_diff(proc.stdout)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def summarize_run(
+    run_id: str,
+    task_id: str,
+    status: str,
+    started_at: float,
+    finished_at: float,
+    history: Dict[str, Any],
+) -> RunSummary:
+    """Condense what a run produced into its row in the run history index."""
+    metrics = history.get("metrics", {})
+    stages = metrics.get("stages", {})
+    report = history.get("test_report", {})
+    results = report.get("results", [])
+    return RunSummary(
+        run_id=run_id,
+        task_id=task_id,
+        status=status,
+        started_at=started_at,
+        finished_at=finished_at,
+        total_duration_ms=round((finished_at - started_at) * 1000, 2),
+        stage_durations={name: stage.get("duration_ms", 0.0) for name, stage in stages.items()},
+        cache_hit=bool(
+            metrics.get("cache_hit")
+            or any(stage.get("cached") for stage in stages.values())
+            or report.get("cache_hits")
+        ),
+        restricted_zones=list(history.get("policy", {}).get("restricted_zones", [])),
+        tests_status=report.get("status") if results else None,
+        tests_passed=sum(1 for result in results if result.get("status") == "passed"),
+        tests_failed=sum(1 for result in results if result.get("status") != "passed"),
+    )
+
+
+def index_run_dir(run_dir: Path) -> Optional[RunSummary]:
+    """Rebuild a history row from the artifacts of a run that predates the index."""
+    task = read_artifact_json(run_dir, "task.json")
+    if not task:
+        return None
+    metrics = read_artifact_json(run_dir, "metrics.json")
+    report = read_artifact_json(run_dir, "test_report.json")
+    if read_artifact(run_dir, "approval_request.json") is not None and read_artifact(run_dir, "approval.json") is None:
+        status = "approval_required"
+    elif report.get("status") == "failed":
+        status = "verification_failed"
+    elif "failed_gate" in metrics:
+        status = "gate_failed"
+    elif read_artifact(run_dir, "receipt.md") is not None:
+        status = "complete"
+    else:
+        status = "unknown"
+    finished_at = run_dir.stat().st_mtime
+    duration_s = metrics.get("total_duration_ms", 0.0) / 1000 + sum(
+        result.get("duration_ms", 0.0) for result in report.get("results", [])
+    ) / 1000
+    history = {"metrics": metrics, "test_report": report, "policy": read_artifact_json(run_dir, "risk_report.json")}
+    return summarize_run(run_dir.name, task["task_id"], status, finished_at - duration_s, finished_at, history)
+
+
+def reindex_runs(runs_dir: Path = RUNS_DIR) -> int:
+    """Backfill the run history index from run directories on disk (one-off; runs index themselves)."""
+    if not runs_dir.is_dir():
+        return 0
+    summaries = []
+    for run_dir in runs_dir.iterdir():
+        summary = index_run_dir(run_dir) if run_dir.is_dir() else None
+        if summary is not None:
+            summaries.append(summary)
+    record_runs(summaries)
+    return len(summaries)
+
+
+def execute_task(
+    task: Task,
+    dry_run: bool = False,
+    config: Optional[WarforgeConfig] = None,
+    repo_root: Optional[Path] = None,
+    runs_dir: Path = RUNS_DIR,
+    cancel_event: Optional[threading.Event] = None,
+    use_cache: bool = True,
+    shards: Optional[int] = None,
+    resume: bool = False,
+    events: Optional[EventStream] = None,
+) -> RunOutcome:
+    """Run the full pipeline for one task and write its artifacts under ``runs_dir``.
+
+    Setting ``cancel_event`` stops the run at the next stage boundary (or mid-stage,
+    cancelling in-flight agents) and before verification commands start.
+    Stage outputs and verification results are replayed from content-addressed
+    caches when their inputs are unchanged, unless ``use_cache`` is false;
+    ``resume`` also reuses stages recorded in this run's checkpoint. In fast mode
+    pytest is split over ``shards`` processes (``verify_shards`` by default).
+    Every run, whatever its outcome, is recorded in the run history index.
+    Progress is published on ``events`` (a new stream logging to
+    ``events.jsonl`` in the run directory by default), which is closed when
+    the run ends.
+    """
+    run_id = f"run-{task.task_id}"
+    started_at = time.time()
+    history: Dict[str, Any] = {}
+    status = "error"
+    message = ""
+    if events is None:
+        events = EventStream(run_id, path=runs_dir / run_id / EVENTS_FILE)
+    events.emit("run", {"status": "running", "task_id": task.task_id, "title": task.title})
+    try:
+        outcome = _execute_task(
+            task, dry_run, config, repo_root, runs_dir, cancel_event, use_cache, shards, resume, history, events
+        )
+        status, message = outcome.status, outcome.message
+        return outcome
+    finally:
+        summary = summarize_run(run_id, task.task_id, status, started_at, time.time(), history)
+        record_run(summary)
+        RUN_SECONDS.observe(summary.total_duration_ms / 1000, status=status)
+        flush_metrics()
+        events.emit("run", {"status": status, "message": message, "duration_ms": summary.total_duration_ms})
+        events.close()
+
+
+def _execute_task(
+    task: Task,
+    dry_run: bool,
+    config: Optional[WarforgeConfig],
+    repo_root: Optional[Path],
+    runs_dir: Path,
+    cancel_event: Optional[threading.Event],
+    use_cache: bool,
+    shards: Optional[int],
+    resume: bool,
+    history: Dict[str, Any],
+    events: EventStream,
+) -> RunOutcome:
+    config = config or load_config()
+    run_id = f"run-{task.task_id}"
+    run_dir = runs_dir / run_id
+    ensure_dir(run_dir)
+    store = ArtifactStore(run_dir, use_record=config.run_record)
+    store.write_json("task.json", {
+        "task_id": task.task_id,
+        "title": task.title,
+        "description": task.description,
+        "created_at": task.created_at,
+    })
+    try:
+        context = RunContext(
+            run_id=run_id,
+            task=Task(task_id=task.task_id, title=task.title, description=task.description, created_at=task.created_at),
+            repo_root=repo_root or Path.cwd(),
+            run_dir=run_dir,
+            mode="fast" if config.fast_mode else "safe",
+            safe_mode=config.safe_mode,
+            fast_mode=config.fast_mode,
+            dry_run=dry_run or config.dry_run,
+        )
+        orchestrator = Orchestrator(
+            context,
+            cancel_event=cancel_event,
+            stage_cache=StageCache() if use_cache else None,
+            resume=resume,
+            artifacts=store,
+            events=events,
+        )
+        history["metrics"] = orchestrator.metrics
+        try:
+            payload = orchestrator.run()
+            orchestrator.write_artifacts(payload)
+            orchestrator.check_cancelled()
+        except GateFailed as exc:
+            return RunOutcome(run_id, "gate_failed", f"Gate failed for run {run_id}: {exc}", 1)
+        except RunCancelled:
+            return RunOutcome(run_id, "cancelled", f"Run cancelled: {run_id}", 130)
+
+        diff_paths = []
+        git_root = context.repo_root
+        if (git_root / ".git").exists():
+            diff_paths = (
+                subprocess.run(["git", "diff", "--name-only"], cwd=git_root, capture_output=True, text=True, check=False)
+                .stdout.strip()
+                .splitlines()
+            )
+
+        verification_commands = orchestrator.snapshot.commands()
+        selection = TestSelection(mode="full", fallback_reason="test selection disabled")
+        if config.test_selection:
+            selection = select_tests(context.repo_root, orchestrator.snapshot.files, diff_paths)
+            verification_commands, _ = apply_selection(verification_commands, selection)
+        shard_count = (shards or config.verify_shards) if context.fast_mode else 1
+        test_results = []
+        cache_hits = 0
+        if not context.dry_run:
+            events.emit("progress", {"phase": "verification", "commands": len(verification_commands)})
+            test_results, cache_hits = run_cached_commands(
+                verification_commands,
+                orchestrator.snapshot.fingerprint,
+                cache=VerificationCache() if use_cache else None,
+                execute=partial(run_with_shards, shards=shard_count, repo_key=str(context.repo_root.resolve())),
+                max_workers=config.verify_workers if context.fast_mode else 1,
+                timeout_s=config.verify_timeout_s,
+                total_timeout_s=config.verify_total_timeout_s,
+                fail_fast=config.fail_fast,
+                cwd=context.repo_root,
+            )
+
+        for result in test_results:
+            if not result.cached:
+                VERIFY_SECONDS.observe(result.duration_ms / 1000, status=result.status)
+            events.emit(
+                "partial",
+                {
+                    "command": " ".join(result.command),
+                    "status": result.status,
+                    "duration_ms": result.duration_ms,
+                    "cached": result.cached,
+                },
+                stage="verification",
+            )
+
+        diff_scan = stream_diff_scan(git_root) if (git_root / ".git").exists() else DiffScan()
+        policy = evaluate_policy([Path(path) for path in diff_paths], "", context.safe_mode, diff_scan=diff_scan)
+        payload["policy"] = {
+            "restricted_zones": policy.restricted_zones,
+            "requires_approval": policy.requires_approval,
+            "triggers": policy.triggers,
+            "diff_bytes_scanned": diff_scan.bytes_scanned,
+        }
+        store.write_json("risk_report.json", payload["policy"])
+        history["policy"] = payload["policy"]
+
+        if context.dry_run:
+            test_summary = [f"dry-run: {' '.join(command)}" for command in verification_commands]
+        else:
+            test_summary = [
+                f"{' '.join(result.command)} => {result.returncode} ({result.status}{', cached' if result.cached else ''})"
+                for result in test_results
+            ]
+
+        receipt = render_receipt(
+            run_id=run_id,
+            task_title=task.title,
+            files_touched=[],
+            commands=["warforge run"],
+            tests=test_summary,
+            test_outputs=[result.output for result in test_results] if test_results else [],
+            evals=[payload["verification"]["eval_quality"]],
+            risks=payload["policy"]["restricted_zones"],
+        )
+        store.write_text("receipt.md", receipt)
+        commands_log = ["warforge run"]
+        for result in test_results:
+            commands_log.append(f"$ {' '.join(result.command)}")
+            commands_log.append(result.output)
+        store.write_text("commands.log", "\n".join(commands_log))
+        store.write_json("patch_summary.json", {"files": diff_paths})
+        failed = any(result.status != "passed" for result in test_results)
+        history["test_report"] = test_report = {
+            "commands": [" ".join(command) for command in verification_commands],
+            "results": [
+                {
+                    "command": " ".join(result.command),
+                    "returncode": result.returncode,
+                    "status": result.status,
+                    "duration_ms": result.duration_ms,
+                    "cpu_ms": result.cpu_ms,
+                    "cached": result.cached,
+                    **({"shards": result.shards} if result.shards else {}),
+                }
+                for result in test_results
+            ],
+            "settings": {
+                "workers": config.verify_workers if context.fast_mode else 1,
+                "timeout_s": config.verify_timeout_s,
+                "total_timeout_s": config.verify_total_timeout_s,
+                "fail_fast": config.fail_fast,
+                "cache": use_cache,
+                "shards": shard_count,
+            },
+            "cache_hits": cache_hits,
+            "selection": selection.as_dict(),
+            "status": "failed" if failed else "passed",
+        }
+        store.write_json("test_report.json", test_report)
+
+        if failed and not context.dry_run:
+            return RunOutcome(run_id, "verification_failed", f"Verification failed for run: {run_id}", 1)
+
+        if payload["policy"]["requires_approval"] and not (run_dir / "approval.json").exists():
+            store.write_json(
+                "approval_request.json",
+                {
+                    "run_id": run_id,
+                    "restricted_zones": payload["policy"]["restricted_zones"],
+                    "status": "required",
+                    "message": "Approval required before proceeding with restricted changes.",
+                },
+            )
+            return RunOutcome(run_id, "approval_required", f"Approval required for run: {run_id}", 2)
+
+        return RunOutcome(run_id, "complete", f"Run complete: {run_id}", 0)
+    finally:
+        store.close()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Type
+
+from warforge.agents.base import CANCEL_TOKEN, Agent, AgentResult, result_key
+from warforge.core import clock_ms, human_duration_ms
+
+
+DEFAULT_AGENT_WORKERS = 4
+DEFAULT_AGENT_TIMEOUT_S = 120.0
+
+
+class GateFailed(RuntimeError):
+    def __init__(self, agent_name: str, reason: str):
+        super().__init__(f"{agent_name}: {reason}")
+        self.agent_name = agent_name
+        self.reason = reason
+
+
+@dataclass
+class AgentTiming:
+    name: str
+    start_ms: float
+    end_ms: float = 0.0
+    depends_on: List[str] = field(default_factory=list)
+    attempts: int = 0
+    timeouts: int = 0
+
+    @property
+    def duration_ms(self) -> float:
+        return human_duration_ms(self.start_ms, self.end_ms)
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+    def as_dict(self, origin_ms: float) -> Dict[str, Any]:
+        return {
+            "start_ms": human_duration_ms(origin_ms, self.start_ms),
+            "end_ms": human_duration_ms(origin_ms, self.end_ms),
+            "duration_ms": self.duration_ms,
+            "depends_on": self.depends_on,
+            "attempts": self.attempts,
+            "timeouts": self.timeouts,
+        }
+
+
+def build_dag(agents: Sequence[Type[Agent]]) -> Dict[str, List[str]]:
+    """Map each agent to the earlier agents it must wait for.
+
+    Declaration order is the tie-breaker: an agent depends on the latest earlier
+    writer of every key it reads, and on earlier readers/writers of the keys it
+    writes, so running the DAG is equivalent to running the list in order.
+    """
+    dag: Dict[str, List[str]] = {}
+    last_writer: Dict[str, str] = {}
+    readers: Dict[str, List[str]] = {}
+    for agent in agents:
+        deps: Set[str] = set()
+        for key in agent.reads:
+            if key in last_writer:
+                deps.add(last_writer[key])
+        for key in agent.output_keys():
+            if key in last_writer:
+                deps.add(last_writer[key])
+            deps.update(readers.get(key, []))
+        deps.discard(agent.name)
+        dag[agent.name] = sorted(deps)
+        for key in agent.reads:
+            readers.setdefault(key, []).append(agent.name)
+        for key in agent.output_keys():
+            last_writer[key] = agent.name
+            readers[key] = []
+    return dag
+
+
+def critical_path(dag: Dict[str, List[str]], durations: Dict[str, float]) -> List[str]:
+    finish: Dict[str, float] = {}
+    previous: Dict[str, str] = {}
+    for name in dag:
+        start = 0.0
+        for dep in dag[name]:
+            if finish[dep] >= start:
+                start = finish[dep]
+                previous[name] = dep
+        finish[name] = start + durations.get(name, 0.0)
+    if not finish:
+        return []
+    node = max(finish, key=lambda item: finish[item])
+    path = [node]
+    while node in previous:
+        node = previous[node]
+        path.append(node)
+    return list(reversed(path))
+
+
+async def _attempt(
+    agent: Agent, context_data: Dict[str, Any], timing: AgentTiming, timeout_s: Optional[float]
+) -> AgentResult:
+    while True:
+        timing.attempts += 1
+        # A fresh token per attempt: the previous one stays set for its (possibly still running) thread.
+        token = agent.cancel_event = threading.Event()
+        scope = CANCEL_TOKEN.set(token)
+        try:
+            return await asyncio.wait_for(agent.arun(context_data), timeout_s)
+        except asyncio.TimeoutError:
+            token.set()
+            timing.timeouts += 1
+            reason = f"timed out after {timeout_s}s"
+        except Exception as exc:  # noqa: BLE001 - any agent error counts against its retries
+            reason = f"{type(exc).__name__}: {exc}"
+        finally:
+            CANCEL_TOKEN.reset(scope)
+        if timing.attempts > agent.retries:
+            raise GateFailed(agent.name, reason)
+
+
+async def arun_dag(
+    agents: Sequence[Agent],
+    context_data: Dict[str, Any],
+    max_workers: int = DEFAULT_AGENT_WORKERS,
+    timeout_s: Optional[float] = DEFAULT_AGENT_TIMEOUT_S,
+    timings: Optional[Dict[str, AgentTiming]] = None,
+    on_result: Optional[Callable[[str, AgentResult], None]] = None,
+) -> Tuple[Dict[str, AgentResult], Dict[str, AgentTiming]]:
+    """Run agents on the current event loop as soon as their dependencies finish.
+
+    At most ``max_workers`` agents are in flight; sync agents go through
+    ``Agent.arun``'s thread adapter. When an agent exhausts its retries the
+    stage gate fails: running siblings are cancelled and ``GateFailed`` raised.
+    Only this coroutine writes to ``context_data``. ``on_result`` is called as
+    each agent finishes, before its dependents start.
+    """
+    by_name = {agent.name: agent for agent in agents}
+    dag = build_dag([type(agent) for agent in agents])
+    waiting = {name: set(deps) for name, deps in dag.items()}
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    results: Dict[str, AgentResult] = {}
+    timings = {} if timings is None else timings
+    running: Dict[asyncio.Task, str] = {}
+
+    async def execute(agent: Agent) -> AgentResult:
+        async with semaphore:
+            timing = timings[agent.name] = AgentTiming(agent.name, clock_ms(), depends_on=dag[agent.name])
+            try:
+                return await _attempt(agent, context_data, timing, agent.timeout_s or timeout_s)
+            finally:
+                timing.end_ms = clock_ms()
+
+    def submit_ready() -> None:
+        for name in [name for name, deps in waiting.items() if not deps]:
+            del waiting[name]
+            running[asyncio.ensure_future(execute(by_name[name]))] = name
+
+    submit_ready()
+    try:
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                result = task.result()
+                results[name] = result
+                context_data[result_key(name)] = result.payload
+                for key in by_name[name].writes:
+                    if key in result.payload:
+                        context_data[key] = result.payload[key]
+                if on_result is not None:
+                    on_result(name, result)
+                for deps in waiting.values():
+                    deps.discard(name)
+            submit_ready()
+    except BaseException:
+        for task, name in running.items():
+            by_name[name].cancel_event.set()
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        raise
+    return {agent.name: results[agent.name] for agent in agents}, timings
+
+
+def run_dag(
+    agents: Sequence[Agent],
+    context_data: Dict[str, Any],
+    max_workers: int = DEFAULT_AGENT_WORKERS,
+    timeout_s: Optional[float] = DEFAULT_AGENT_TIMEOUT_S,
+) -> Tuple[Dict[str, AgentResult], Dict[str, AgentTiming]]:
+    return asyncio.run(arun_dag(agents, context_data, max_workers=max_workers, timeout_s=timeout_s))
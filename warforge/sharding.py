@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import heapq
+import statistics
+import subprocess
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from warforge.storage import get_test_timings, record_test_timings
+from warforge.verification import CommandResult, run_commands
+
+
+DEFAULT_TEST_MS = 100.0
+COLLECT_TIMEOUT_S = 300.0
+# pytest options whose value is the next argument (so it is not a test path).
+PYTEST_VALUE_OPTIONS = frozenset(
+    "-k -m -p -c -o -W -r --ignore --ignore-glob --deselect --rootdir --basetemp --confcutdir --maxfail --tb "
+    "--durations --junitxml --import-mode --log-level --override-ini --config-file".split()
+)
+
+
+@dataclass
+class Shard:
+    index: int
+    tests: List[str] = field(default_factory=list)
+    predicted_ms: float = 0.0
+
+
+def is_pytest(command: List[str]) -> bool:
+    return bool(command) and (command[0] == "pytest" or command[:3][1:] == ["-m", "pytest"])
+
+
+def strip_test_args(command: List[str]) -> List[str]:
+    """``command`` without positional test paths or node ids, keeping options and their values."""
+    prefix = 1 if command[0] == "pytest" else 3
+    kept = command[:prefix]
+    takes_value = False
+    for arg in command[prefix:]:
+        if takes_value or arg.startswith("-"):
+            kept.append(arg)
+            takes_value = not takes_value and arg in PYTEST_VALUE_OPTIONS
+    return kept
+
+
+def collect_node_ids(command: List[str], cwd: Optional[Path] = None) -> Optional[List[str]]:
+    """Node ids ``command`` would run, or None when collection fails or times out (run unsharded then)."""
+    try:
+        completed = subprocess.run(
+            command + ["--collect-only", "-q"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=COLLECT_TIMEOUT_S,
+        )
+    except subprocess.TimeoutExpired:
+        return None
+    if completed.returncode != 0:
+        return None
+    return [line.strip() for line in completed.stdout.splitlines() if "::" in line and not line.startswith(" ")]
+
+
+def plan_shards(node_ids: List[str], timings: Dict[str, float], count: int) -> List[Shard]:
+    """Longest-processing-time-first: place each test, slowest first, on the least loaded shard.
+
+    Tests without history are assumed to take the median known duration.
+    """
+    count = max(1, min(count, len(node_ids)))
+    default_ms = statistics.median(timings.values()) if timings else DEFAULT_TEST_MS
+    shards = [Shard(index) for index in range(count)]
+    heap = [(0.0, index) for index in range(count)]
+    for node_id in sorted(node_ids, key=lambda node: (-timings.get(node, default_ms), node)):
+        load, index = heapq.heappop(heap)
+        shard = shards[index]
+        shard.tests.append(node_id)
+        shard.predicted_ms = load + timings.get(node_id, default_ms)
+        heapq.heappush(heap, (shard.predicted_ms, index))
+    return shards
+
+
+def junit_key(node_id: str) -> str:
+    """The ``classname::name`` pytest writes to junit XML for a node id."""
+    parts = node_id.split("::")
+    module = parts[0][:-3] if parts[0].endswith(".py") else parts[0]
+    classname = ".".join([module.replace("/", ".")] + parts[1:-1])
+    return f"{classname}::{parts[-1]}"
+
+
+def parse_junit(path: Path, node_ids: List[str]) -> Dict[str, float]:
+    by_key = {junit_key(node_id): node_id for node_id in node_ids}
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return {}
+    durations: Dict[str, float] = {}
+    for case in root.iter("testcase"):
+        node_id = by_key.get(f"{case.get('classname', '')}::{case.get('name', '')}")
+        if node_id is not None:
+            durations[node_id] = round(float(case.get("time", 0) or 0) * 1000, 2)
+    return durations
+
+
+def run_sharded(
+    command: List[str],
+    shards: int,
+    repo_key: str,
+    cwd: Optional[Path] = None,
+    **run_options: Any,
+) -> CommandResult:
+    """Split one pytest command into ``shards`` balanced processes and merge the outcome.
+
+    Per-test durations from each shard's junit XML are folded into the timing
+    database so the next run balances on fresher data. The merged result carries
+    a ``shards`` breakdown with predicted and actual time per shard. Test paths
+    already on ``command`` (from test selection) scope the collection; each shard
+    then gets only its own node ids.
+    """
+    node_ids = collect_node_ids(command, cwd)
+    if node_ids is None or len(node_ids) < 2 or shards < 2:
+        return run_commands([command], cwd=cwd, **run_options)[0]
+    plan = plan_shards(node_ids, get_test_timings(repo_key, node_ids), shards)
+    base = strip_test_args(command)
+    with tempfile.TemporaryDirectory(prefix="warforge-shards-") as tmp_dir:
+        reports = [Path(tmp_dir) / f"shard-{shard.index}.xml" for shard in plan]
+        commands = [
+            base + ["-q", f"--junitxml={report}", *shard.tests] for shard, report in zip(plan, reports)
+        ]
+        started = time.monotonic()
+        results = run_commands(commands, max_workers=len(plan), cwd=cwd, **run_options)
+        wall_ms = round((time.monotonic() - started) * 1000, 2)
+        durations: Dict[str, float] = {}
+        for shard, report in zip(plan, reports):
+            durations.update(parse_junit(report, shard.tests))
+    if durations:
+        record_test_timings(repo_key, durations)
+
+    failed = next((result for result in results if result.status != "passed"), None)
+    breakdown = [
+        {
+            "index": shard.index,
+            "tests": len(shard.tests),
+            "predicted_ms": round(shard.predicted_ms, 2),
+            "duration_ms": result.duration_ms,
+            "cpu_ms": result.cpu_ms,
+            "returncode": result.returncode,
+            "status": result.status,
+        }
+        for shard, result in zip(plan, results)
+    ]
+    output = "\n".join(
+        f"--- shard {shard.index} ({len(shard.tests)} tests) ---\n{result.output}" for shard, result in zip(plan, results)
+    )
+    return CommandResult(
+        command,
+        failed.returncode if failed else 0,
+        wall_ms,
+        output,
+        cpu_ms=round(sum(result.cpu_ms for result in results), 2),
+        status=failed.status if failed else "passed",
+        shards=breakdown,
+    )
+
+
+def run_with_shards(
+    commands: List[List[str]],
+    shards: int,
+    repo_key: str,
+    cwd: Optional[Path] = None,
+    **run_options: Any,
+) -> List[CommandResult]:
+    """Like ``run_commands`` but fans each pytest command out over ``shards`` processes."""
+    if shards < 2:
+        return run_commands(commands, cwd=cwd, **run_options)
+    results: List[CommandResult] = []
+    for command in commands:
+        if is_pytest(command):
+            options = {key: value for key, value in run_options.items() if key not in ("parallel", "max_workers")}
+            results.append(run_sharded(command, shards, repo_key, cwd=cwd, **options))
+        else:
+            results.extend(run_commands([command], cwd=cwd, **run_options))
+    return results
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from warforge.core import repo_files
+from warforge.manifest import MANIFEST_DIR, fingerprint_repo
+from warforge.telemetry import SNAPSHOT_BYTES_READ, SNAPSHOT_FILES, SNAPSHOT_FILES_HASHED
+from warforge.verification import detect_verification_commands
+
+
+ENTRY_POINT_SUFFIXES = ("pyproject.toml", "package.json", "README.md")
+WORKFLOW_PREFIX = ".github/workflows/"
+
+
+@dataclass(frozen=True)
+class RepoSnapshot:
+    repo_root: Path
+    files: Tuple[str, ...]
+    stack: str
+    entry_points: Tuple[str, ...]
+    workflows: Tuple[str, ...]
+    verification_commands: Tuple[Tuple[str, ...], ...]
+    fingerprint: str
+    changed_files: Tuple[str, ...] = ()
+    files_hashed: int = 0
+    bytes_read: int = 0
+
+    def paths(self) -> List[Path]:
+        return [Path(path) for path in self.files]
+
+    def commands(self) -> List[List[str]]:
+        return [list(command) for command in self.verification_commands]
+
+    def repo_map(self, limit: int = 200) -> Dict[str, Any]:
+        return {
+            "repo_root": str(self.repo_root),
+            "files": list(self.files[:limit]),
+            "entry_points": list(self.entry_points),
+            "workflows": list(self.workflows),
+        }
+
+
+def detect_stack(files: Tuple[str, ...]) -> str:
+    names = set(files)
+    if "package.json" in names:
+        return "node"
+    if "pyproject.toml" in names:
+        return "python"
+    return "unknown"
+
+
+def build_snapshot(repo_root: Path, manifest_dir: Path = MANIFEST_DIR) -> RepoSnapshot:
+    """Walk the repo once and derive everything agents and policy need from that walk."""
+    paths = sorted(repo_files(repo_root))
+    fingerprint = fingerprint_repo(repo_root, paths, manifest_dir=manifest_dir)
+    files = tuple(sorted(fingerprint.entries))
+    SNAPSHOT_FILES.inc(len(files))
+    SNAPSHOT_FILES_HASHED.inc(fingerprint.files_hashed)
+    SNAPSHOT_BYTES_READ.inc(fingerprint.bytes_read)
+    return RepoSnapshot(
+        repo_root=repo_root,
+        files=files,
+        stack=detect_stack(files),
+        entry_points=tuple(path for path in files if path.endswith(ENTRY_POINT_SUFFIXES)),
+        workflows=tuple(path for path in files if path.startswith(WORKFLOW_PREFIX)),
+        verification_commands=tuple(
+            tuple(command) for command in detect_verification_commands(repo_root, files=files)
+        ),
+        fingerprint=fingerprint.repo_hash,
+        changed_files=tuple(fingerprint.changed),
+        files_hashed=fingerprint.files_hashed,
+        bytes_read=fingerprint.bytes_read,
+    )
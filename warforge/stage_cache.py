@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from warforge.agents.base import Agent
+from warforge.cache_store import JsonStore, stable_hash
+from warforge.manifest import MANIFEST_DIR
+from warforge.snapshot import RepoSnapshot
+
+
+STAGE_CACHE_VERSION = 1
+STAGE_CACHE_DIR = MANIFEST_DIR / "stages"
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def consumed_keys(agents: Sequence[Agent]) -> Sequence[str]:
+    """context_data keys a stage reads from outside itself."""
+    produced = {key for agent in agents for key in agent.output_keys()}
+    return sorted({key for agent in agents for key in agent.reads} - produced)
+
+
+def _input_digest(value: Any) -> str:
+    if isinstance(value, RepoSnapshot):
+        # The fingerprint covers every file the snapshot was derived from.
+        return stable_hash({"repo_root": str(value.repo_root), "fingerprint": value.fingerprint})
+    return stable_hash(value)
+
+
+def stage_key(stage: str, agents: Sequence[Agent], context_data: Dict[str, Any]) -> str:
+    """Key a stage by name, agent versions and the hash of the inputs it consumes.
+
+    Task ids are deliberately left out: two tasks whose agents see the same inputs
+    share the cached stage.
+    """
+    return stable_hash(
+        {
+            "version": STAGE_CACHE_VERSION,
+            "stage": stage,
+            "agents": [(agent.name, agent.version) for agent in agents],
+            "inputs": {key: _input_digest(context_data.get(key)) for key in consumed_keys(agents)},
+        }
+    )
+
+
+class StageCache(JsonStore):
+    """Stage outputs (agent name -> payload) keyed by ``stage_key``."""
+
+    version = STAGE_CACHE_VERSION
+
+    def __init__(self, cache_dir: Path = STAGE_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = self.read(key)
+        return None if payload is None else payload["results"]
+
+    def put(self, key: str, stage: str, results: Dict[str, Any]) -> None:
+        self.write(key, {"stage": stage, "results": results})
@@ -1,22 +1,174 @@
 from __future__ import annotations
 
 import json
+import os
+import secrets
 import sqlite3
+import threading
 import time
-from dataclasses import asdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from warforge.core import Task, ensure_dir, now_iso
+from warforge.telemetry import QUEUE_WAIT_SECONDS, REGISTRY, Registry, SeriesValues, group_samples
 
 
 DB_PATH = Path(".warforge") / "warforge.db"
+# Legacy JSON-file queue; init_db() imports anything left here into the tasks table.
 QUEUE_DIR = Path(".warforge") / "queue"
+DEFAULT_LEASE_S = 60.0
+MAX_DELIVERY_ATTEMPTS = 3
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+# Aging: a task gains one priority class for every AGING_S seconds it waits.
+AGING_S = 300.0
+BUSY_TIMEOUT_S = 30.0
+# SQLite caps bound parameters per statement; chunk IN (...) lookups below it.
+MAX_IN_PARAMS = 500
 
+TASK_COLUMNS = "task_id, title, description, created_at"
 
-def init_db() -> None:
-    ensure_dir(DB_PATH.parent)
-    with sqlite3.connect(DB_PATH) as conn:
+# Statements are module constants so sqlite3's per-connection statement cache
+# reuses the prepared form instead of re-parsing on every call.
+INSERT_TASK_SQL = (
+    f"INSERT INTO tasks ({TASK_COLUMNS}, status, priority, enqueued_at, dequeue_score) "
+    "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)"
+)
+SELECT_TASK_SQL = f"SELECT {TASK_COLUMNS} FROM tasks WHERE task_id = ?"
+SELECT_TASK_STATUS_SQL = f"SELECT {TASK_COLUMNS}, status FROM tasks WHERE task_id = ?"
+SELECT_QUEUE_SQL = f"SELECT {TASK_COLUMNS} FROM tasks WHERE status = 'queued' ORDER BY dequeue_score LIMIT ?"
+QUEUE_DEPTH_SQL = "SELECT COUNT(*) FROM tasks WHERE status = 'queued'"
+SELECT_EXPIRED_SQL = "SELECT task_id, attempts FROM leases WHERE state = 'leased' AND expires_at < ?"
+SET_LEASE_STATE_SQL = "UPDATE leases SET state = ? WHERE task_id = ?"
+SET_TASK_STATUS_SQL = "UPDATE tasks SET status = ? WHERE task_id = ?"
+UPSERT_LEASE_SQL = """
+    INSERT INTO leases (task_id, worker_id, state, attempts, leased_at, heartbeat_at, expires_at)
+    VALUES (?, ?, 'leased', 1, ?, ?, ?)
+    ON CONFLICT (task_id) DO UPDATE SET
+        worker_id = excluded.worker_id,
+        state = 'leased',
+        attempts = leases.attempts + 1,
+        leased_at = excluded.leased_at,
+        heartbeat_at = excluded.heartbeat_at,
+        expires_at = excluded.expires_at
+"""
+HEARTBEAT_SQL = (
+    "UPDATE leases SET heartbeat_at = ?, expires_at = ? WHERE task_id = ? AND worker_id = ? AND state = 'leased'"
+)
+RELEASE_SQL = "UPDATE leases SET expires_at = 0 WHERE task_id = ? AND worker_id = ? AND state = 'leased'"
+COMPLETE_LEASE_SQL = (
+    "UPDATE leases SET state = ?, heartbeat_at = ? WHERE task_id = ? AND worker_id = ? AND state = 'leased'"
+)
+UPSERT_TIMING_SQL = """
+    INSERT INTO test_timings (repo, node_id, duration_ms, samples, updated_at)
+    VALUES (?, ?, ?, 1, ?)
+    ON CONFLICT (repo, node_id) DO UPDATE SET
+        duration_ms = test_timings.duration_ms * (1 - ?) + excluded.duration_ms * ?,
+        samples = test_timings.samples + 1,
+        updated_at = excluded.updated_at
+"""
+# Weight of the newest sample in the per-test duration moving average.
+TIMING_EMA_WEIGHT = 0.5
+RUN_COLUMNS = (
+    "run_id, task_id, status, started_at, finished_at, total_duration_ms, stage_durations, "
+    "cache_hit, restricted_zones, tests_status, tests_passed, tests_failed"
+)
+UPSERT_RUN_SQL = f"""
+    INSERT INTO runs ({RUN_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (run_id) DO UPDATE SET
+        task_id = excluded.task_id,
+        status = excluded.status,
+        started_at = excluded.started_at,
+        finished_at = excluded.finished_at,
+        total_duration_ms = excluded.total_duration_ms,
+        stage_durations = excluded.stage_durations,
+        cache_hit = excluded.cache_hit,
+        restricted_zones = excluded.restricted_zones,
+        tests_status = excluded.tests_status,
+        tests_passed = excluded.tests_passed,
+        tests_failed = excluded.tests_failed
+"""
+UPSERT_METRIC_SQL = """
+    INSERT INTO metric_values (name, labels, field, value) VALUES (?, ?, ?, ?)
+    ON CONFLICT (name, labels, field) DO UPDATE SET value = metric_values.value + excluded.value
+"""
+CLAIM_QUEUE_SQL = (
+    f"SELECT {TASK_COLUMNS}, enqueued_at FROM tasks WHERE status = 'queued' ORDER BY dequeue_score LIMIT 1"
+)
+# list_runs orderings: each is backed by an index and doubles as the keyset cursor column.
+RUN_ORDERINGS = {"recent": "finished_at", "slowest": "total_duration_ms"}
+DEFAULT_RUNS_PAGE = 50
+# ``status="failed"`` in list_runs matches every unsuccessful outcome.
+FAILED_RUN_STATUSES = ("gate_failed", "verification_failed", "error")
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized: set = set()
+
+
+def dequeue_score(priority: str, enqueued_at: float) -> float:
+    """Lower pops first. Folding the class into the enqueue time gives aging for free:
+    a low-priority task that has waited 2 * AGING_S ties with a fresh high-priority one,
+    and one index on (status, dequeue_score) serves every pop."""
+    return enqueued_at + PRIORITIES[priority] * AGING_S
+
+
+def _db_key() -> Tuple[int, str]:
+    return os.getpid(), os.path.abspath(DB_PATH)
+
+
+def _open(path: str) -> sqlite3.Connection:
+    ensure_dir(Path(path).parent)
+    conn = sqlite3.connect(path, isolation_level=None, timeout=BUSY_TIMEOUT_S, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def connection() -> sqlite3.Connection:
+    """Return this thread's connection to DB_PATH, creating the schema once per process.
+
+    Connections are keyed by pid as well as path so forked workers never reuse
+    their parent's handle.
+    """
+    key = _db_key()
+    connections: Dict[Tuple[int, str], sqlite3.Connection] = _local.__dict__.setdefault("connections", {})
+    conn = connections.get(key)
+    if conn is None:
+        conn = connections[key] = _open(key[1])
+    if key not in _initialized:
+        with _init_lock:
+            if key not in _initialized:
+                _create_schema(conn)
+                _initialized.add(key)
+    return conn
+
+
+@contextmanager
+def transaction(immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    conn = connection()
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def close_connections() -> None:
+    for conn in _local.__dict__.pop("connections", {}).values():
+        conn.close()
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS tasks (
@@ -27,47 +179,397 @@ def init_db() -> None:
             )
             """
         )
-        conn.commit()
+        existing = _columns(conn, "tasks")
+        # Rows that predate the queue columns were already popped from the file queue.
+        for column, ddl in (
+            ("status", "TEXT NOT NULL DEFAULT 'done'"),
+            ("priority", "TEXT NOT NULL DEFAULT 'normal'"),
+            ("enqueued_at", "REAL NOT NULL DEFAULT 0"),
+            ("dequeue_score", "REAL NOT NULL DEFAULT 0"),
+        ):
+            if column not in existing:
+                conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {ddl}")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+                task_id TEXT PRIMARY KEY,
+                worker_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                leased_at REAL NOT NULL,
+                heartbeat_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS test_timings (
+                repo TEXT NOT NULL,
+                node_id TEXT NOT NULL,
+                duration_ms REAL NOT NULL,
+                samples INTEGER NOT NULL DEFAULT 1,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (repo, node_id)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                task_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL NOT NULL,
+                total_duration_ms REAL NOT NULL,
+                stage_durations TEXT NOT NULL DEFAULT '{}',
+                cache_hit INTEGER NOT NULL DEFAULT 0,
+                restricted_zones TEXT NOT NULL DEFAULT '[]',
+                tests_status TEXT,
+                tests_passed INTEGER NOT NULL DEFAULT 0,
+                tests_failed INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS metric_values (
+                name TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (name, labels, field)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_finished ON runs (finished_at, run_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_status ON runs (status, finished_at, run_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_duration ON runs (total_duration_ms, run_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_queue ON tasks (status, dequeue_score)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_leases_expiry ON leases (state, expires_at)")
+        imported = migrate_queue_dir(conn)
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+    for task_path in imported:
+        task_path.unlink(missing_ok=True)
+    try:
+        QUEUE_DIR.rmdir()
+    except OSError:
+        pass
+
+
+def init_db() -> None:
+    connection()
+
 
+def migrate_queue_dir(conn: sqlite3.Connection) -> List[Path]:
+    """Import tasks still sitting in the legacy ``.warforge/queue/*.json`` directory.
 
-def add_task(title: str, description: str) -> Task:
-    init_db()
-    task_id = f"task-{int(time.time_ns())}"
-    task = Task(task_id=task_id, title=title, description=description, created_at=now_iso())
-    with sqlite3.connect(DB_PATH) as conn:
+    Returns the imported files; the caller removes them once the import commits.
+    """
+    if not QUEUE_DIR.is_dir():
+        return []
+    imported: List[Path] = []
+    for task_path in sorted(QUEUE_DIR.glob("*.json")):
+        try:
+            payload = json.loads(task_path.read_text())
+            enqueued_at = task_path.stat().st_mtime
+        except (OSError, ValueError):
+            continue
         conn.execute(
-            "INSERT INTO tasks (task_id, title, description, created_at) VALUES (?, ?, ?, ?)",
-            (task.task_id, task.title, task.description, task.created_at),
+            f"INSERT OR IGNORE INTO tasks ({TASK_COLUMNS}) VALUES (?, ?, ?, ?)",
+            (payload["task_id"], payload["title"], payload["description"], payload["created_at"]),
         )
-        conn.commit()
-    ensure_dir(QUEUE_DIR)
-    queue_path = QUEUE_DIR / f"{task.task_id}.json"
-    queue_path.write_text(json.dumps(asdict(task), indent=2))
-    return task
+        # A file still on disk was never completed; keep any live or dead lease state.
+        conn.execute(
+            """
+            UPDATE tasks SET
+                status = COALESCE(
+                    (SELECT state FROM leases WHERE leases.task_id = tasks.task_id AND state IN ('leased', 'dead')),
+                    'queued'
+                ),
+                priority = 'normal',
+                enqueued_at = ?,
+                dequeue_score = ?
+            WHERE task_id = ?
+            """,
+            (enqueued_at, dequeue_score("normal", enqueued_at), payload["task_id"]),
+        )
+        imported.append(task_path)
+    return imported
 
 
-def list_queue() -> Iterable[Path]:
-    ensure_dir(QUEUE_DIR)
-    return sorted(QUEUE_DIR.glob("*.json"))
+def add_tasks(items: Iterable[Tuple[str, str, str]]) -> List[Task]:
+    """Insert many ``(title, description, priority)`` tasks in one transaction."""
+    base_ns = time.time_ns()
+    created_at = now_iso()
+    enqueued_at = time.time()
+    tasks: List[Task] = []
+    rows = []
+    for index, (title, description, priority) in enumerate(items):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITIES)}")
+        # The random suffix keeps ids unique across batches inserted in the same nanosecond by other processes.
+        task_id = f"task-{base_ns + index}-{secrets.token_hex(4)}"
+        task = Task(task_id=task_id, title=title, description=description, created_at=created_at)
+        tasks.append(task)
+        rows.append(
+            (
+                task.task_id,
+                task.title,
+                task.description,
+                task.created_at,
+                priority,
+                enqueued_at,
+                dequeue_score(priority, enqueued_at),
+            )
+        )
+    with transaction() as conn:
+        conn.executemany(INSERT_TASK_SQL, rows)
+    return tasks
+
+
+def add_task(title: str, description: str, priority: str = "normal") -> Task:
+    return add_tasks([(title, description, priority)])[0]
+
+
+def list_queue(limit: Optional[int] = None) -> List[Task]:
+    rows = connection().execute(SELECT_QUEUE_SQL, (-1 if limit is None else limit,)).fetchall()
+    return [Task(*row) for row in rows]
+
+
+def queue_depth() -> int:
+    return connection().execute(QUEUE_DEPTH_SQL).fetchone()[0]
+
+
+def _reap_expired(conn: sqlite3.Connection, now: float) -> None:
+    for task_id, attempts in conn.execute(SELECT_EXPIRED_SQL, (now,)).fetchall():
+        if attempts >= MAX_DELIVERY_ATTEMPTS:
+            lease_state, task_status = "dead", "dead"
+        else:
+            lease_state, task_status = "expired", "queued"
+        conn.execute(SET_LEASE_STATE_SQL, (lease_state, task_id))
+        conn.execute(SET_TASK_STATUS_SQL, (task_status, task_id))
+
+
+def claim_task(worker_id: str, lease_s: float = DEFAULT_LEASE_S) -> Optional[Task]:
+    """Atomically lease the best queued task; it is re-delivered if the lease expires."""
+    now = time.time()
+    with transaction(immediate=True) as conn:
+        _reap_expired(conn, now)
+        row = conn.execute(CLAIM_QUEUE_SQL).fetchone()
+        if row is None:
+            return None
+        conn.execute(SET_TASK_STATUS_SQL, ("leased", row[0]))
+        conn.execute(UPSERT_LEASE_SQL, (row[0], worker_id, now, now, now + lease_s))
+    QUEUE_WAIT_SECONDS.observe(max(0.0, now - row[-1]), queue="tasks")
+    return Task(*row[:-1])
+
+
+def lease_task(task_id: str, worker_id: str, lease_s: float = DEFAULT_LEASE_S) -> Optional[Task]:
+    """Lease one specific task unless another worker holds it; finished tasks can be leased again to re-run."""
+    now = time.time()
+    with transaction(immediate=True) as conn:
+        _reap_expired(conn, now)
+        row = conn.execute(SELECT_TASK_STATUS_SQL, (task_id,)).fetchone()
+        if row is None or row[-1] == "leased":
+            return None
+        conn.execute(SET_TASK_STATUS_SQL, ("leased", task_id))
+        conn.execute(UPSERT_LEASE_SQL, (task_id, worker_id, now, now, now + lease_s))
+    return Task(*row[:-1])
+
+
+def heartbeat(task_id: str, worker_id: str, lease_s: float = DEFAULT_LEASE_S) -> bool:
+    now = time.time()
+    cursor = connection().execute(HEARTBEAT_SQL, (now, now + lease_s, task_id, worker_id))
+    return cursor.rowcount == 1
+
+
+def release_task(task_id: str, worker_id: str) -> None:
+    """Give a lease back so the task is re-delivered on the next claim."""
+    connection().execute(RELEASE_SQL, (task_id, worker_id))
+
+
+def complete_task(task_id: str, worker_id: str, state: str = "done") -> None:
+    with transaction() as conn:
+        cursor = conn.execute(COMPLETE_LEASE_SQL, (state, time.time(), task_id, worker_id))
+        if cursor.rowcount:
+            conn.execute(SET_TASK_STATUS_SQL, (state, task_id))
 
 
 def pop_next_task() -> Optional[Task]:
-    queue = list_queue()
-    if not queue:
-        return None
-    task_path = queue[0]
-    payload = json.loads(task_path.read_text())
-    task_path.unlink()
-    return Task(**payload)
+    worker_id = f"pop-{os.getpid()}"
+    task = claim_task(worker_id)
+    if task:
+        complete_task(task.task_id, worker_id)
+    return task
 
 
 def get_task(task_id: str) -> Optional[Task]:
-    init_db()
-    with sqlite3.connect(DB_PATH) as conn:
-        row = conn.execute(
-            "SELECT task_id, title, description, created_at FROM tasks WHERE task_id = ?",
-            (task_id,),
-        ).fetchone()
+    row = connection().execute(SELECT_TASK_SQL, (task_id,)).fetchone()
     if not row:
         return None
     return Task(*row)
+
+
+def get_tasks(task_ids: Sequence[str]) -> List[Task]:
+    """Fetch many tasks with chunked ``IN`` lookups, preserving the requested order."""
+    found: Dict[str, Task] = {}
+    conn = connection()
+    for start in range(0, len(task_ids), MAX_IN_PARAMS):
+        chunk = task_ids[start : start + MAX_IN_PARAMS]
+        placeholders = ", ".join("?" * len(chunk))
+        for row in conn.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE task_id IN ({placeholders})", chunk):
+            found[row[0]] = Task(*row)
+    return [found[task_id] for task_id in task_ids if task_id in found]
+
+
+def record_test_timings(repo: str, durations: Dict[str, float]) -> None:
+    """Fold per-test durations (ms) into the moving averages used to balance shards."""
+    now = time.time()
+    weight = TIMING_EMA_WEIGHT
+    with transaction(immediate=True) as conn:
+        conn.executemany(
+            UPSERT_TIMING_SQL,
+            ((repo, node_id, duration_ms, now, weight, weight) for node_id, duration_ms in durations.items()),
+        )
+
+
+def get_test_timings(repo: str, node_ids: Optional[Sequence[str]] = None) -> Dict[str, float]:
+    conn = connection()
+    if node_ids is None:
+        rows = conn.execute("SELECT node_id, duration_ms FROM test_timings WHERE repo = ?", (repo,))
+        return dict(rows)
+    timings: Dict[str, float] = {}
+    for start in range(0, len(node_ids), MAX_IN_PARAMS):
+        chunk = list(node_ids[start : start + MAX_IN_PARAMS])
+        placeholders = ", ".join("?" * len(chunk))
+        timings.update(
+            conn.execute(
+                f"SELECT node_id, duration_ms FROM test_timings WHERE repo = ? AND node_id IN ({placeholders})",
+                [repo, *chunk],
+            )
+        )
+    return timings
+
+
+@dataclass
+class RunSummary:
+    """One row of the run history index."""
+
+    run_id: str
+    task_id: str
+    status: str
+    started_at: float
+    finished_at: float
+    total_duration_ms: float
+    stage_durations: Dict[str, float] = field(default_factory=dict)
+    cache_hit: bool = False
+    restricted_zones: List[str] = field(default_factory=list)
+    tests_status: Optional[str] = None
+    tests_passed: int = 0
+    tests_failed: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _run_row(summary: RunSummary) -> Tuple[Any, ...]:
+    return (
+        summary.run_id,
+        summary.task_id,
+        summary.status,
+        summary.started_at,
+        summary.finished_at,
+        summary.total_duration_ms,
+        json.dumps(summary.stage_durations, sort_keys=True),
+        int(summary.cache_hit),
+        json.dumps(summary.restricted_zones),
+        summary.tests_status,
+        summary.tests_passed,
+        summary.tests_failed,
+    )
+
+
+def _run_summary(row: Sequence[Any]) -> RunSummary:
+    values = list(row)
+    values[6] = json.loads(values[6])
+    values[7] = bool(values[7])
+    values[8] = json.loads(values[8])
+    return RunSummary(*values)
+
+
+def record_runs(summaries: Iterable[RunSummary]) -> None:
+    with transaction(immediate=True) as conn:
+        conn.executemany(UPSERT_RUN_SQL, (_run_row(summary) for summary in summaries))
+
+
+def record_run(summary: RunSummary) -> None:
+    record_runs([summary])
+
+
+def list_runs(
+    status: Optional[str] = None,
+    since: Optional[float] = None,
+    order: str = "recent",
+    limit: int = DEFAULT_RUNS_PAGE,
+    cursor: Optional[str] = None,
+) -> Tuple[List[RunSummary], Optional[str]]:
+    """One page of run history, newest (or slowest) first, plus the cursor for the next page.
+
+    Pages are keyset-paginated on ``(order column, run_id)`` so deep pages cost the
+    same as the first one.
+    """
+    if order not in RUN_ORDERINGS:
+        raise ValueError(f"Unknown order {order!r}; expected one of {', '.join(RUN_ORDERINGS)}")
+    column = RUN_ORDERINGS[order]
+    clauses: List[str] = []
+    params: List[Any] = []
+    if status == "failed":
+        clauses.append(f"status IN ({', '.join('?' * len(FAILED_RUN_STATUSES))})")
+        params.extend(FAILED_RUN_STATUSES)
+    elif status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if since is not None:
+        clauses.append("finished_at >= ?")
+        params.append(since)
+    if cursor:
+        value, _, run_id = cursor.partition(":")
+        try:
+            params.extend([float(value), run_id])
+        except ValueError:
+            raise ValueError(f"Invalid cursor {cursor!r}") from None
+        clauses.append(f"({column}, run_id) < (?, ?)")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = connection().execute(
+        f"SELECT {RUN_COLUMNS} FROM runs {where} ORDER BY {column} DESC, run_id DESC LIMIT ?",
+        [*params, limit + 1],
+    ).fetchall()
+    runs = [_run_summary(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and runs:
+        last = runs[-1]
+        next_cursor = f"{getattr(last, column)!r}:{last.run_id}"
+    return runs, next_cursor
+
+
+def flush_metrics(registry: Registry = REGISTRY) -> int:
+    """Add this process's pending metric deltas to the shared totals; returns samples written."""
+    samples = registry.drain()
+    if not samples:
+        return 0
+    try:
+        with transaction(immediate=True) as conn:
+            conn.executemany(UPSERT_METRIC_SQL, samples)
+    except BaseException:
+        registry.restore(samples)
+        raise
+    return len(samples)
+
+
+def load_metrics() -> SeriesValues:
+    return group_samples(connection().execute("SELECT name, labels, field, value FROM metric_values"))
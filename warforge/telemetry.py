@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Seconds; spans a cached stage (sub-ms) to a full test suite (minutes).
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (metric name, canonical label JSON, field) -> value. Counters use field "total";
+# histograms use "count", "sum" and one cumulative field per bucket bound.
+Sample = Tuple[str, str, str, float]
+SeriesValues = Dict[Tuple[str, str], Dict[str, float]]
+
+
+def _label_key(labelnames: Sequence[str], labels: Dict[str, str]) -> str:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {sorted(labelnames)}, got {sorted(labels)}")
+    return json.dumps([[name, str(labels[name])] for name in labelnames], separators=(",", ":"))
+
+
+def _bound(value: float) -> str:
+    return "+Inf" if math.isinf(value) else repr(float(value))
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    help: str
+    labelnames: Tuple[str, ...]
+    registry: "Registry"
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount:
+            self.registry.add(self.name, _label_key(self.labelnames, labels), {"total": amount})
+
+
+@dataclass(frozen=True)
+class Histogram(Metric):
+    buckets: Tuple[float, ...] = LATENCY_BUCKETS
+
+    kind = "histogram"
+
+    def bounds(self) -> List[str]:
+        return [_bound(bound) for bound in (*self.buckets, math.inf)]
+
+    def observe(self, value: float, **labels: str) -> None:
+        fields = {"count": 1.0, "sum": value}
+        for bound in (*self.buckets, math.inf):
+            if value <= bound:
+                fields[_bound(bound)] = 1.0
+        self.registry.add(self.name, _label_key(self.labelnames, labels), fields)
+
+
+class Registry:
+    """Process-local metric deltas, drained into the shared store by ``storage.flush_metrics``.
+
+    Observations only touch an in-memory dict, so instrumenting a hot path costs a
+    lock and a few additions; aggregation across runs and processes happens in SQLite.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+        self._pending: Dict[Tuple[str, str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = self.metrics[name] = Counter(name, help, tuple(labelnames), self)
+        return metric
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        metric = self.metrics[name] = Histogram(name, help, tuple(labelnames), self, tuple(buckets))
+        return metric
+
+    def add(self, name: str, labels: str, fields: Dict[str, float]) -> None:
+        with self._lock:
+            for field_name, value in fields.items():
+                key = (name, labels, field_name)
+                self._pending[key] = self._pending.get(key, 0.0) + value
+
+    def drain(self) -> List[Sample]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return [(name, labels, field_name, value) for (name, labels, field_name), value in pending.items()]
+
+    def restore(self, samples: Iterable[Sample]) -> None:
+        for name, labels, field_name, value in samples:
+            self.add(name, labels, {field_name: value})
+
+
+REGISTRY = Registry()
+
+AGENT_SECONDS = REGISTRY.histogram(
+    "warforge_agent_duration_seconds", "Wall time of one agent call.", ("stage", "agent")
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "warforge_stage_duration_seconds", "Wall time of one orchestrator stage.", ("stage", "source")
+)
+RUN_SECONDS = REGISTRY.histogram("warforge_run_duration_seconds", "Wall time of one run by outcome.", ("status",))
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "warforge_queue_wait_seconds", "Time from enqueue to start of execution.", ("queue",)
+)
+VERIFY_SECONDS = REGISTRY.histogram(
+    "warforge_verification_duration_seconds", "Wall time of one executed verification command.", ("status",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "warforge_cache_requests", "Cache lookups by cache and result (hit or miss).", ("cache", "result")
+)
+SNAPSHOT_FILES = REGISTRY.counter("warforge_snapshot_files", "Files walked while fingerprinting a repo.")
+SNAPSHOT_FILES_HASHED = REGISTRY.counter("warforge_snapshot_files_hashed", "Files re-hashed while fingerprinting.")
+SNAPSHOT_BYTES_READ = REGISTRY.counter("warforge_snapshot_bytes_read", "Bytes read while fingerprinting a repo.")
+PROVIDER_SECONDS = REGISTRY.histogram(
+    "warforge_provider_duration_seconds", "Wall time of one provider call, retries included.", ("provider", "status")
+)
+PROVIDER_TTFT_SECONDS = REGISTRY.histogram(
+    "warforge_provider_ttft_seconds", "Time from sending a streamed provider call to its first token.", ("provider",)
+)
+PROVIDER_RETRIES = REGISTRY.counter("warforge_provider_retries", "Provider call attempts that were retried.", ("provider",))
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def group_samples(samples: Iterable[Sample]) -> SeriesValues:
+    series: SeriesValues = {}
+    for name, labels, field_name, value in samples:
+        series.setdefault((name, labels), {})[field_name] = value
+    return series
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: str, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [tuple(pair) for pair in json.loads(labels)]
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render(
+    series: SeriesValues,
+    gauges: Optional[Dict[str, Tuple[str, float]]] = None,
+    registry: Registry = REGISTRY,
+    openmetrics: bool = True,
+) -> str:
+    """Text exposition of ``series`` (from ``storage.load_metrics``) plus point-in-time ``gauges``."""
+    by_name: Dict[str, List[Tuple[str, Dict[str, float]]]] = {}
+    for (name, labels), fields in sorted(series.items()):
+        by_name.setdefault(name, []).append((labels, fields))
+    lines: List[str] = []
+    for name, (help_text, value) in sorted((gauges or {}).items()):
+        lines += [f"# TYPE {name} gauge", f"# HELP {name} {help_text}", f"{name} {_number(value)}"]
+    for name, metric in registry.metrics.items():
+        # OpenMetrics names the counter family without the _total suffix; the 0.0.4 text format includes it.
+        family = name if openmetrics or isinstance(metric, Histogram) else f"{name}_total"
+        lines += [f"# TYPE {family} {metric.kind}", f"# HELP {family} {metric.help}"]
+        for labels, fields in by_name.get(name, []):
+            if isinstance(metric, Histogram):
+                for bound in metric.bounds():
+                    lines.append(f"{name}_bucket{_labels(labels, ('le', bound))} {_number(fields.get(bound, 0.0))}")
+                lines.append(f"{name}_count{_labels(labels)} {_number(fields.get('count', 0.0))}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(fields.get('sum', 0.0))}")
+            else:
+                lines.append(f"{name}_total{_labels(labels)} {_number(fields.get('total', 0.0))}")
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def histogram_quantile(quantile: float, metric: Histogram, fields: Dict[str, float]) -> Optional[float]:
+    """Estimate a quantile from cumulative buckets, interpolating linearly like Prometheus."""
+    count = fields.get("count", 0.0)
+    if not count:
+        return None
+    rank = quantile * count
+    lower, below = 0.0, 0.0
+    for bound in (*metric.buckets, math.inf):
+        cumulative = fields.get(_bound(bound), 0.0)
+        if cumulative >= rank:
+            if math.isinf(bound):
+                return lower
+            if cumulative == below:
+                return bound
+            return lower + (bound - lower) * (rank - below) / (cumulative - below)
+        lower, below = bound, cumulative
+    return lower
+
+
+def labels_dict(labels: str) -> Dict[str, str]:
+    return {name: value for name, value in json.loads(labels)}
+
+
+HistogramRow = Tuple[Dict[str, str], float, Optional[float], Optional[float], float]
+
+
+def histogram_summary(series: SeriesValues, metric: Histogram) -> List[HistogramRow]:
+    """``(labels, count, p50, p99, mean)`` for each series of ``metric``."""
+    rows = []
+    for (name, labels), fields in sorted(series.items()):
+        if name != metric.name or not fields.get("count"):
+            continue
+        count = fields["count"]
+        rows.append(
+            (
+                labels_dict(labels),
+                count,
+                histogram_quantile(0.5, metric, fields),
+                histogram_quantile(0.99, metric, fields),
+                fields.get("sum", 0.0) / count,
+            )
+        )
+    return rows
+
+
+def counter_totals(series: SeriesValues, metric: Counter) -> List[Tuple[Dict[str, str], float]]:
+    return [
+        (labels_dict(labels), fields.get("total", 0.0))
+        for (name, labels), fields in sorted(series.items())
+        if name == metric.name
+    ]
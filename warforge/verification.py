@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import os
+import signal
 import subprocess
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional
+
+MARKER_FILES = ("pyproject.toml", "package.json")
+DEFAULT_VERIFY_WORKERS = 4
+KILL_GRACE_S = 2.0
+POLL_S = 0.01
 
 
 @dataclass
@@ -13,35 +22,152 @@ class CommandResult:
     returncode: int
     duration_ms: float
     output: str
+    cpu_ms: float = 0.0
+    status: str = ""
+    cached: bool = False
+    shards: Optional[List[Dict[str, Any]]] = None
+
+    def __post_init__(self) -> None:
+        if not self.status:
+            self.status = "passed" if self.returncode == 0 else "failed"
 
 
-def detect_verification_commands(repo_root: Path) -> List[List[str]]:
+def detect_verification_commands(repo_root: Path, files: Optional[Iterable[str]] = None) -> List[List[str]]:
+    if files is None:
+        present = {name for name in MARKER_FILES if (repo_root / name).exists()}
+    else:
+        present = set(files)
     commands: List[List[str]] = []
-    if (repo_root / "pyproject.toml").exists():
+    if "pyproject.toml" in present:
         commands.append(["pytest"])
-    if (repo_root / "package.json").exists():
+    if "package.json" in present:
         commands.append(["npm", "test"])
     return commands
 
 
-def run_commands(commands: List[List[str]], parallel: bool) -> List[CommandResult]:
-    results: List[CommandResult] = []
-    if parallel and len(commands) > 1:
-        processes = []
-        for command in commands:
-            start = time.perf_counter()
-            proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-            processes.append((command, proc, start))
-        for command, proc, start in processes:
-            output, _ = proc.communicate()
-            duration_ms = round((time.perf_counter() - start) * 1000, 2)
-            results.append(CommandResult(command, proc.returncode, duration_ms, output))
-        return results
-
-    for command in commands:
-        start = time.perf_counter()
-        completed = subprocess.run(command, capture_output=True, text=True, check=False)
-        duration_ms = round((time.perf_counter() - start) * 1000, 2)
-        output = (completed.stdout or "") + (completed.stderr or "")
-        results.append(CommandResult(command, completed.returncode, duration_ms, output))
-    return results
+def _read_stream(stream, chunks: List[bytes]) -> None:
+    for chunk in iter(lambda: stream.read1(65536), b""):
+        chunks.append(chunk)
+    stream.close()
+
+
+def _signal_group(proc: subprocess.Popen, sig: int) -> None:
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, sig)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _reap(proc: subprocess.Popen) -> Optional[float]:
+    """Non-blocking reap. Returns CPU ms of the child (0.0 when unavailable) once it has exited."""
+    if not hasattr(os, "wait4"):
+        return 0.0 if proc.poll() is not None else None
+    try:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+    except ChildProcessError:
+        proc.poll()
+        return 0.0
+    if pid == 0:
+        return None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return round((usage.ru_utime + usage.ru_stime) * 1000, 2)
+
+
+@dataclass
+class _Running:
+    index: int
+    proc: subprocess.Popen
+    started: float
+    chunks: List[bytes]
+    reader: threading.Thread
+    status: str = ""
+    signalled_at: Optional[float] = None
+
+
+def run_commands(
+    commands: List[List[str]],
+    parallel: bool = False,
+    max_workers: Optional[int] = None,
+    timeout_s: Optional[float] = None,
+    total_timeout_s: Optional[float] = None,
+    fail_fast: bool = False,
+    cwd: Optional[Path] = None,
+) -> List[CommandResult]:
+    """Run verification commands with at most ``max_workers`` in flight.
+
+    Output is drained by one reader thread per process so a chatty command never
+    blocks on a full pipe. Each command runs in its own process group; timeouts
+    and fail-fast terminate the whole group (SIGTERM, then SIGKILL after
+    ``KILL_GRACE_S``). Commands that never started are reported as ``skipped``.
+    Results are returned in input order.
+    """
+    workers = max(1, max_workers or (DEFAULT_VERIFY_WORKERS if parallel else 1))
+    results: List[Optional[CommandResult]] = [None] * len(commands)
+    pending = deque(enumerate(commands))
+    running: List[_Running] = []
+    deadline = time.monotonic() + total_timeout_s if total_timeout_s else None
+    aborted = ""
+
+    def stop(job: _Running, status: str) -> None:
+        if job.signalled_at is None:
+            job.status = status
+            job.signalled_at = time.monotonic()
+            _signal_group(job.proc, signal.SIGTERM)
+
+    while running or (pending and not aborted):
+        while pending and not aborted and len(running) < workers:
+            index, command = pending.popleft()
+            started = time.monotonic()
+            try:
+                proc = subprocess.Popen(
+                    command,
+                    cwd=cwd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                )
+            except OSError as exc:
+                results[index] = CommandResult(command, 127, 0.0, f"{type(exc).__name__}: {exc}", status="failed")
+                aborted = aborted or ("fail_fast" if fail_fast else "")
+                continue
+            chunks: List[bytes] = []
+            reader = threading.Thread(target=_read_stream, args=(proc.stdout, chunks), daemon=True)
+            reader.start()
+            running.append(_Running(index, proc, started, chunks, reader))
+
+        now = time.monotonic()
+        if deadline is not None and now >= deadline and not aborted:
+            aborted = "timeout"
+        for job in list(running):
+            cpu_ms = _reap(job.proc)
+            if cpu_ms is None:
+                if aborted:
+                    stop(job, "timeout" if aborted == "timeout" else "cancelled")
+                elif timeout_s is not None and now - job.started >= timeout_s:
+                    stop(job, "timeout")
+                if job.signalled_at is not None and now - job.signalled_at >= KILL_GRACE_S:
+                    _signal_group(job.proc, signal.SIGKILL)
+                continue
+            running.remove(job)
+            job.reader.join(timeout=KILL_GRACE_S)
+            returncode = job.proc.returncode
+            status = job.status or ("passed" if returncode == 0 else "failed")
+            results[job.index] = CommandResult(
+                commands[job.index],
+                returncode,
+                round((time.monotonic() - job.started) * 1000, 2),
+                b"".join(job.chunks).decode("utf-8", errors="replace"),
+                cpu_ms=cpu_ms,
+                status=status,
+            )
+            if fail_fast and status != "passed" and not aborted:
+                aborted = "fail_fast"
+        if running:
+            time.sleep(POLL_S)
+
+    for index, command in pending:
+        results[index] = CommandResult(command, -1, 0.0, f"skipped ({aborted})", status="skipped")
+    return [result for result in results if result is not None]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from warforge.cache_store import JsonStore, stable_hash
+from warforge.manifest import MANIFEST_DIR
+from warforge.telemetry import cache_lookup
+from warforge.verification import CommandResult, run_commands
+
+
+CACHE_VERSION = 2
+VERIFICATION_CACHE_DIR = MANIFEST_DIR / "verification"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Environment that changes what a test run does without changing repo content.
+ENV_KEYS = (
+    "PATH",
+    "PYTHONPATH",
+    "VIRTUAL_ENV",
+    "CONDA_PREFIX",
+    "NODE_ENV",
+    "NODE_OPTIONS",
+    "PYTEST_ADDOPTS",
+    "CI",
+    "LANG",
+    "TZ",
+)
+# Where installers put packages relative to an interpreter's prefix (``<prefix>/bin/python``).
+SITE_PACKAGES_GLOBS = ("lib/python*/site-packages", "lib/python*/dist-packages", "Lib/site-packages")
+MAX_SHEBANG_BYTES = 256
+
+
+def _stat_identity(path: str) -> Dict[str, Any]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {"path": path}
+    return {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def tool_identity(executable: str) -> Dict[str, Any]:
+    """Identify the tool binary by resolved path and stat, without spawning ``--version``."""
+    resolved = shutil.which(executable)
+    if resolved is None:
+        return {"path": None}
+    return _stat_identity(os.path.realpath(resolved))
+
+
+def shebang_interpreter(script: str) -> Optional[str]:
+    """The interpreter named by a script's ``#!`` line; ``/usr/bin/env name`` is looked up on ``PATH``."""
+    try:
+        with open(script, "rb") as handle:
+            line = handle.readline(MAX_SHEBANG_BYTES)
+    except OSError:
+        return None
+    if not line.startswith(b"#!"):
+        return None
+    parts = line[2:].decode(errors="replace").split()
+    if parts and os.path.basename(parts[0]) == "env":
+        parts = [part for part in parts[1:] if not part.startswith("-")]
+        return shutil.which(parts[0]) if parts else None
+    return parts[0] if parts else None
+
+
+def dependency_identity(executable: str, cwd: Path) -> Dict[str, Any]:
+    """What the tool will import: its interpreter and the mtimes of the package directories installs touch.
+
+    Console scripts such as ``pytest`` run under their shebang interpreter, and a
+    binary is its own. Paths are left unresolved so a venv's ``bin/python``
+    symlink still maps to the venv's site-packages rather than the base install.
+    Installing, upgrading or removing a package adds or renames entries in
+    site-packages (or ``node_modules``), which bumps the directory mtime.
+    """
+    resolved = shutil.which(executable)
+    interpreter = (shebang_interpreter(resolved) or resolved) if resolved else None
+    prefixes = {Path(path).parent.parent for path in (resolved, interpreter) if path}
+    manifests = [match for prefix in prefixes for pattern in SITE_PACKAGES_GLOBS for match in prefix.glob(pattern)]
+    manifests += [cwd / "node_modules", cwd / "node_modules" / ".package-lock.json"]
+    return {
+        "interpreter": _stat_identity(os.path.realpath(interpreter)) if interpreter else None,
+        "manifests": {str(path): _mtime_ns(path) for path in sorted(manifests)},
+    }
+
+
+def cache_key(repo_hash: str, command: List[str], cwd: Optional[Path] = None) -> str:
+    cwd = Path(cwd or Path.cwd()).resolve()
+    return stable_hash(
+        {
+            "version": CACHE_VERSION,
+            "repo_hash": repo_hash,
+            "command": command,
+            "cwd": str(cwd),
+            "python": sys.version,
+            "tool": tool_identity(command[0]) if command else {},
+            "dependencies": dependency_identity(command[0], cwd) if command else {},
+            "env": {key: os.environ.get(key) for key in ENV_KEYS},
+        }
+    )
+
+
+class VerificationCache(JsonStore):
+    """Passing verification results keyed by ``cache_key``."""
+
+    version = CACHE_VERSION
+
+    def __init__(self, cache_dir: Path = VERIFICATION_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+
+    def get(self, key: str) -> Optional[CommandResult]:
+        payload = self.read(key)
+        if payload is None:
+            return None
+        result = CommandResult(**payload["result"])
+        result.cached = True
+        return result
+
+    def put(self, key: str, result: CommandResult) -> None:
+        self.write(key, {"result": asdict(result)})
+
+
+def run_cached_commands(
+    commands: List[List[str]],
+    repo_hash: str,
+    cache: Optional[VerificationCache] = None,
+    cwd: Optional[Path] = None,
+    execute: Callable[..., List[CommandResult]] = run_commands,
+    **run_options: Any,
+) -> Tuple[List[CommandResult], int]:
+    """Replay cached results for commands whose inputs are unchanged and run the rest.
+
+    Only passing results are stored: a failure may be a flake or a timeout and
+    should always be retried. Misses go through ``execute`` (``run_commands`` by
+    default). Returns the results in input order and the hit count.
+    """
+    if cache is None:
+        return execute(commands, cwd=cwd, **run_options), 0
+    keys = [cache_key(repo_hash, command, cwd) for command in commands]
+    results: List[Optional[CommandResult]] = [cache.get(key) for key in keys]
+    misses = [index for index, result in enumerate(results) if result is None]
+    for result in results:
+        cache_lookup("verification", result is not None)
+    if misses:
+        fresh = execute([commands[index] for index in misses], cwd=cwd, **run_options)
+        for index, result in zip(misses, fresh):
+            results[index] = result
+            if result.status == "passed":
+                cache.put(keys[index], result)
+    return [result for result in results if result is not None], len(commands) - len(misses)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from typing import Callable, Dict, Optional
+
+from warforge.core import Task
+from warforge.runner import RunOutcome, execute_task
+from warforge.storage import DEFAULT_LEASE_S, claim_task, complete_task, flush_metrics, heartbeat, release_task
+from warforge.telemetry import REGISTRY
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _discard_inherited_metrics() -> None:
+    # A forked child starts with a copy of the parent's unflushed samples; only the parent may write those.
+    REGISTRY.drain()
+
+
+def _execute(payload: Dict[str, str], dry_run: bool) -> RunOutcome:
+    return execute_task(Task(**payload), dry_run=dry_run)
+
+
+def run_worker(
+    concurrency: int = 1,
+    lease_s: float = DEFAULT_LEASE_S,
+    poll_s: float = 1.0,
+    drain: bool = False,
+    dry_run: bool = False,
+    max_tasks: Optional[int] = None,
+    on_outcome: Callable[[Task, RunOutcome], None] = lambda task, outcome: None,
+) -> int:
+    """Claim queued tasks under a lease and run them on a process pool.
+
+    Leases are renewed from this process while children run. If this process
+    dies, the leases lapse and another worker picks the tasks up again.
+    Returns the number of tasks processed.
+    """
+    owner = worker_id()
+    processed = 0
+    pool = ProcessPoolExecutor(max_workers=concurrency, initializer=_discard_inherited_metrics)
+    in_flight: Dict[Future, Task] = {}
+    try:
+        while True:
+            while len(in_flight) < concurrency and (max_tasks is None or processed + len(in_flight) < max_tasks):
+                task = claim_task(owner, lease_s)
+                if task is None:
+                    break
+                in_flight[pool.submit(_execute, asdict(task), dry_run)] = task
+            flush_metrics()
+            if not in_flight:
+                if drain or (max_tasks is not None and processed >= max_tasks):
+                    return processed
+                time.sleep(poll_s)
+                continue
+
+            done, _ = wait(in_flight, timeout=lease_s / 3, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                task = in_flight.pop(future)
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool:
+                    release_task(task.task_id, owner)
+                    broken = True
+                    continue
+                except Exception as exc:  # noqa: BLE001 - a crashed run must not stop the worker
+                    outcome = RunOutcome(f"run-{task.task_id}", "error", f"{type(exc).__name__}: {exc}", 1)
+                complete_task(task.task_id, owner, state="done" if outcome.exit_code == 0 else "failed")
+                on_outcome(task, outcome)
+                processed += 1
+            if broken:
+                # A child died hard; every in-flight future on this pool is lost.
+                pool.shutdown(wait=False, cancel_futures=True)
+                for task in in_flight.values():
+                    release_task(task.task_id, owner)
+                in_flight.clear()
+                pool = ProcessPoolExecutor(max_workers=concurrency, initializer=_discard_inherited_metrics)
+            for task in in_flight.values():
+                heartbeat(task.task_id, owner, lease_s)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        for task in in_flight.values():
+            release_task(task.task_id, owner)
+        flush_metrics()